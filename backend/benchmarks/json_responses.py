@@ -0,0 +1,83 @@
+"""
+JSON Response Benchmark - FastAPI's default encoding versus FastJSONResponse
+
+Compares jsonable_encoder + JSONResponse.render (what FastAPI does with a
+plain return value) against FastJSONResponse.render on payloads shaped like
+the API's: a catalog page, a full catalog, and orders carrying datetimes and
+Decimals.
+
+Usage:
+    python benchmarks/json_responses.py
+"""
+
+import os
+import sys
+import timeit
+from datetime import datetime
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.responses import FastJSONResponse, orjson
+
+
+def product(i: int) -> dict:
+    """A product dict as served by the catalog."""
+    return {
+        "id": str(i),
+        "name": f"Toy {i}",
+        "brand": f"Brand {i % 50}",
+        "price": 10.0 + i % 500,
+        "quantity": i % 40,
+        "description": "A synthetic product used for benchmarking serialization.",
+        "image": f"/images/{i}.png",
+        "category": "Plush Toys",
+        "categoryAttributes": {"material": "Polyester", "size": "Medium"},
+        "in_stock": i % 40 > 0,
+        "created_at": "2024-01-01T00:00:00",
+        "updated_at": "2024-01-01T00:00:00",
+    }
+
+
+def order(i: int) -> dict:
+    """An order with native datetime and Decimal values."""
+    return {
+        "id": i,
+        "orderNumber": f"ORD-{i:08d}",
+        "items": [{"productId": j, "quantity": 2, "price": Decimal("499.99")} for j in range(3)],
+        "totalAmount": Decimal("2999.94"),
+        "status": "pending",
+        "createdAt": datetime(2024, 1, 1, 12, 30),
+        "updatedAt": datetime(2024, 1, 2, 8, 15),
+    }
+
+
+PAYLOADS = {
+    "catalog page (100)": [product(i) for i in range(100)],
+    "full catalog (10k)": [product(i) for i in range(10_000)],
+    "orders (1k)": [order(i) for i in range(1_000)],
+}
+
+
+def default_render(content) -> bytes:
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def fast_render(content) -> bytes:
+    return FastJSONResponse(content).body
+
+
+def main() -> None:
+    print(f"encoder: {'orjson ' + orjson.__version__ if orjson else 'stdlib json'}")
+    print(f"{'payload':<22} {'default ms':>11} {'fast ms':>9} {'speedup':>8}")
+    for name, content in PAYLOADS.items():
+        number = max(1, 2000 // len(content))
+        default = min(timeit.repeat(lambda: default_render(content), number=number, repeat=5)) / number
+        fast = min(timeit.repeat(lambda: fast_render(content), number=number, repeat=5)) / number
+        print(f"{name:<22} {default * 1000:>11.3f} {fast * 1000:>9.3f} {default / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
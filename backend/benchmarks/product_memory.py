@@ -0,0 +1,148 @@
+"""
+Product Memory Benchmark - __slots__ models versus per-instance __dict__
+
+Loads a synthetic catalog of Product, ElectronicToy, PlushToy and BoardGame
+instances and reports bytes per instance and construction throughput for
+the slotted models, against the same hierarchy rebuilt without __slots__
+(every method and property identical, attributes stored in a __dict__).
+
+Usage:
+    python benchmarks/product_memory.py [size]
+"""
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from types import CellType, FunctionType
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models import BoardGame, ElectronicToy, PlushToy, Product
+
+
+DEFAULT_SIZE = 200_000
+REPEATS = 3
+
+
+def without_slots(cls, base=object):
+    """
+    Rebuild a model class with the same namespace but no __slots__.
+
+    Methods calling super() close over their defining class, so they are
+    copied with that cell pointing at the rebuilt class.
+    """
+    namespace = {
+        name: value for name, value in vars(cls).items()
+        if name not in ("__slots__", "__dict__", "__weakref__")
+        and name not in cls.__dict__.get("__slots__", ())
+    }
+    rebuilt = type(cls.__name__, (base,), namespace)
+    for name, value in namespace.items():
+        if isinstance(value, FunctionType) and "__class__" in value.__code__.co_freevars:
+            closure = tuple(
+                CellType(rebuilt) if free == "__class__" else cell
+                for free, cell in zip(value.__code__.co_freevars, value.__closure__)
+            )
+            function = FunctionType(value.__code__, value.__globals__, name, value.__defaults__, closure)
+            function.__kwdefaults__ = value.__kwdefaults__
+            setattr(rebuilt, name, function)
+    return rebuilt
+
+
+DictProduct = without_slots(Product)
+HIERARCHIES = {
+    "slots": (Product, ElectronicToy, PlushToy, BoardGame),
+    "dict": (
+        DictProduct,
+        without_slots(ElectronicToy, DictProduct),
+        without_slots(PlushToy, DictProduct),
+        without_slots(BoardGame, DictProduct),
+    ),
+}
+
+
+def build_catalog(classes, size: int) -> list:
+    """Create size products, cycling through the four model classes."""
+    product, electronic, plush, board_game = classes
+    now = datetime.now()
+    catalog = []
+    for i in range(size):
+        common = {
+            "id": i,
+            "name": f"Toy {i}",
+            "brand": f"Brand {i % 50}",
+            "price": 100.0 + i % 5_000,
+            "quantity": i % 200,
+            "description": "Synthetic product",
+            "image_url": "",
+            "created_at": now,
+            "updated_at": now,
+        }
+        kind = i % 4
+        if kind == 0:
+            catalog.append(product(category="Misc", **common))
+        elif kind == 1:
+            catalog.append(electronic(battery_type="AA", voltage="3V", **common))
+        elif kind == 2:
+            catalog.append(plush(material="Cotton", size="Medium", **common))
+        else:
+            catalog.append(board_game(age_range="8+", number_of_players="2-4", **common))
+    return catalog
+
+
+def instance_bytes(product) -> int:
+    """Size of the instance itself plus its attribute dict, if it has one."""
+    size = sys.getsizeof(product)
+    if hasattr(product, "__dict__"):
+        size += sys.getsizeof(product.__dict__)
+    return size
+
+
+def measure(classes, size: int) -> dict:
+    """Construction time and memory for one catalog load."""
+    timings = []
+    gc.disable()  # keep cyclic collections of earlier catalogs out of the timings
+    try:
+        for _ in range(REPEATS):
+            gc.collect()
+            started = time.perf_counter()
+            catalog = build_catalog(classes, size)
+            timings.append(time.perf_counter() - started)
+            del catalog
+    finally:
+        gc.enable()
+
+    gc.collect()
+    tracemalloc.start()
+    catalog = build_catalog(classes, size)
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "per_second": size / min(timings),
+        "traced_per_product": traced / size,
+        "instance_bytes": {type(product).__name__: instance_bytes(product) for product in catalog[:4]},
+    }
+
+
+def main(size: int) -> None:
+    print(f"{size:,} products, equal parts Product/ElectronicToy/PlushToy/BoardGame\n")
+    results = {name: measure(classes, size) for name, classes in HIERARCHIES.items()}
+
+    print(f"{'class':<15} {'dict B':>8} {'slots B':>8} {'saved':>7}")
+    for name, slotted in results["slots"]["instance_bytes"].items():
+        dict_backed = results["dict"]["instance_bytes"][name]
+        print(f"{name:<15} {dict_backed:>8} {slotted:>8} {1 - slotted / dict_backed:>6.0%}")
+
+    print(f"\n{'layout':<8} {'products/s':>12} {'traced B/product':>17}")
+    for name, result in results.items():
+        print(f"{name:<8} {result['per_second']:>12,.0f} {result['traced_per_product']:>17,.0f}")
+    print(f"\nconstruction speedup: {results['slots']['per_second'] / results['dict']['per_second']:.2f}x, "
+          f"catalog memory: {results['slots']['traced_per_product'] / results['dict']['traced_per_product']:.0%} "
+          f"of the dict layout")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE)
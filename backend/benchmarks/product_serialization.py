@@ -0,0 +1,91 @@
+"""
+Product Serialization Benchmark - ORM to_dict() versus projected column rows
+
+Builds a throwaway SQLite catalog of each size and compares reading every
+product through ORM instances plus DBProduct.to_dict() with selecting
+PRODUCT_LISTING_COLUMNS and mapping rows through product_row_to_dict.
+
+Usage:
+    python benchmarks/product_serialization.py [size ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import Base
+from db_models.product import DBProduct, PRODUCT_LISTING_COLUMNS, product_row_to_dict
+import db_models  # noqa: F401 - registers every mapper so relationships resolve
+
+
+DEFAULT_SIZES = (10_000, 100_000)
+REPEATS = 3
+
+
+def populate(engine, size: int) -> None:
+    """Insert size synthetic products."""
+    now = datetime.utcnow()
+    rows = [
+        {
+            "name": f"Toy {i}",
+            "brand": f"Brand {i % 50}",
+            "price": 10.0 + i % 500,
+            "quantity": i % 40,
+            "description": "A synthetic product used for benchmarking serialization.",
+            "image_url": f"/images/{i}.png",
+            "category": ("Electronic Toys", "Plush Toys", "Board Games")[i % 3],
+            "category_attributes": {"material": "Polyester", "size": "Medium"},
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(size)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(DBProduct), rows)
+
+
+def orm_path(engine) -> int:
+    """Serialize through ORM instances and DBProduct.to_dict()."""
+    with Session(engine) as db:
+        products = db.query(DBProduct).order_by(DBProduct.id).all()
+        return len([product.to_dict() for product in products])
+
+
+def projected_path(engine) -> int:
+    """Serialize through projected column rows."""
+    with Session(engine) as db:
+        result = db.execute(select(*PRODUCT_LISTING_COLUMNS).order_by(PRODUCT_LISTING_COLUMNS[0]))
+        return len(list(map(product_row_to_dict, result)))
+
+
+def best_of(fn, engine) -> float:
+    """Best wall time of REPEATS runs."""
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        fn(engine)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(sizes) -> None:
+    print(f"{'products':>10} {'to_dict rows/s':>16} {'projected rows/s':>18} {'speedup':>8}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+            Base.metadata.create_all(bind=engine)
+            populate(engine, size)
+            orm = best_of(orm_path, engine)
+            projected = best_of(projected_path, engine)
+            engine.dispose()
+        print(f"{size:>10} {size / orm:>16,.0f} {size / projected:>18,.0f} {orm / projected:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
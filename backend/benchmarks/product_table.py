@@ -0,0 +1,100 @@
+"""
+ProductTable Benchmark - per-object Product loops versus columnar queries
+
+Builds a synthetic catalog of Product instances and times the same bulk
+inventory queries (low stock, restock quantities, price range, discounts,
+stock percentages) as a loop over the objects' methods and as one
+vectorized ProductTable call, checking that both give the same answer.
+
+Usage:
+    python benchmarks/product_table.py [size]
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models import Product, ProductTable
+
+
+DEFAULT_SIZE = 1_000_000
+REPEATS = 3
+CATEGORIES = ("Electronic", "Plush", "BoardGame")
+
+
+def build_products(size: int):
+    """Create size synthetic products."""
+    rng = random.Random(42)
+    now = datetime.now()
+    return [
+        Product(
+            id=i,
+            name=f"Toy {i}",
+            brand=f"Brand {i % 50}",
+            price=round(rng.uniform(100, 20_000), 2),
+            quantity=rng.randint(0, 200),
+            description="Synthetic product",
+            image_url="",
+            category=CATEGORIES[i % 3],
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(size)
+    ]
+
+
+def best_of(fn) -> tuple:
+    """Best wall time of REPEATS runs, and the last result."""
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main(size: int) -> None:
+    started = time.perf_counter()
+    products = build_products(size)
+    print(f"built {size:,} Product objects in {time.perf_counter() - started:.2f}s")
+    build, table = best_of(lambda: ProductTable.from_products(products))
+    print(f"ProductTable.from_products: {build:.2f}s\n")
+
+    queries = {
+        "low stock (< 10)": (
+            lambda: [p.id for p in products if p.is_low_stock(10)],
+            lambda: table.low_stock(10),
+        ),
+        "restock to 150": (
+            lambda: [p.calculate_restock_quantity(150) for p in products],
+            lambda: table.restock_quantities(150),
+        ),
+        "price 1k-5k": (
+            lambda: [p.id for p in products if p.is_within_price_range(1_000, 5_000)],
+            lambda: table.within_price_range(1_000, 5_000),
+        ),
+        "15% discount": (
+            lambda: [p.apply_discount(15) for p in products],
+            lambda: table.apply_discount(15),
+        ),
+        "stock % of 200": (
+            lambda: [p.get_stock_percentage(200) for p in products],
+            lambda: table.stock_percentages(200),
+        ),
+    }
+
+    print(f"{'query':<18} {'loop s':>9} {'table s':>9} {'speedup':>9}  match")
+    for name, (loop, vectorized) in queries.items():
+        loop_time, expected = best_of(loop)
+        table_time, actual = best_of(vectorized)
+        match = len(expected) == len(actual) and all(
+            abs(a - b) < 1e-6 for a, b in zip(expected, actual.tolist())
+        )
+        print(f"{name:<18} {loop_time:>9.3f} {table_time:>9.4f} {loop_time / table_time:>8.0f}x  {match}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE)
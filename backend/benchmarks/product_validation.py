@@ -0,0 +1,106 @@
+"""
+Product Validation Benchmark - model constructors versus the validation service
+
+Validates a synthetic feed of category products (with some invalid rows)
+by constructing ElectronicToy/PlushToy/BoardGame instances and calling
+validate_product, as a row-by-row import would, and with
+services.validation inline and across a process pool. Also checks that
+both approaches accept and reject the same rows.
+
+Usage:
+    python benchmarks/product_validation.py [size] [workers]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models import BoardGame, ElectronicToy, PlushToy
+from services.validation import iter_validated, spec_cache_info
+
+
+DEFAULT_SIZE = 200_000
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+SPECS = {
+    "Electronic": (ElectronicToy, ("battery_type", "voltage"), (("AA", "6V"), ("Rechargeable", "7.4V"), ("Plutonium", "6V"))),
+    "Plush": (PlushToy, ("material", "size"), (("Cotton", "Small"), ("Fleece", "Large"), ("Silk", "Huge"))),
+    "BoardGame": (BoardGame, ("age_range", "number_of_players"), (("8+", "2-4"), ("5+", "2-6"), ("7+", ""))),
+}
+
+
+def build_feed(size: int) -> list:
+    """Synthetic records; roughly one in ten has an invalid spec."""
+    rng = random.Random(42)
+    categories = list(SPECS)
+    feed = []
+    for i in range(size):
+        category = categories[i % 3]
+        _, fields, choices = SPECS[category]
+        values = choices[2] if rng.random() < 0.1 else choices[rng.randrange(2)]
+        feed.append({
+            "name": f"Toy {i}",
+            "brand": f"Brand {i % 50}",
+            "price": round(rng.uniform(1, 500), 2),
+            "quantity": rng.randint(0, 100),
+            "category": category,
+            **dict(zip(fields, values)),
+        })
+    return feed
+
+
+def validate_with_models(feed: list) -> list:
+    """Verdict per record from the model constructors and validate_product."""
+    verdicts = []
+    for record in feed:
+        model, fields, _ = SPECS[record["category"]]
+        try:
+            model(
+                id=0, name=record["name"], brand=record["brand"], price=record["price"],
+                quantity=record["quantity"], description="", image_url="",
+                **{field: record[field] for field in fields},
+            ).validate_product()
+            verdicts.append(True)
+        except ValueError:
+            verdicts.append(False)
+    return verdicts
+
+
+def validate_with_service(feed: list, workers: int) -> list:
+    return [result.valid for chunk in iter_validated(feed, workers) for result in chunk]
+
+
+def main(size: int, workers: int) -> None:
+    feed = build_feed(size)
+    print(f"{size:,} records, {workers} worker processes\n")
+
+    runs = [
+        ("models", lambda: validate_with_models(feed)),
+        ("service inline", lambda: validate_with_service(feed, 1)),
+    ]
+    if workers > 1:
+        runs.append((f"service x{workers}", lambda: validate_with_service(feed, workers)))
+
+    print(f"{'path':<16} {'seconds':>8} {'records/s':>11} {'valid':>8}  match")
+    expected = None
+    for name, run in runs:
+        started = time.perf_counter()
+        verdicts = run()
+        elapsed = time.perf_counter() - started
+        expected = verdicts if expected is None else expected
+        print(f"{name:<16} {elapsed:>8.2f} {size / elapsed:>11,.0f} {sum(verdicts):>8,}  {verdicts == expected}")
+
+    info = spec_cache_info()
+    print("\nspec cache (this process): " + ", ".join(
+        f"{name} {stats['hits']:,} hits / {stats['misses']:,} misses" for name, stats in info.items()
+    ))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else DEFAULT_SIZE,
+        int(args[1]) if len(args) > 1 else DEFAULT_WORKERS,
+    )
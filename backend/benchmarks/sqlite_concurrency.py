@@ -0,0 +1,167 @@
+"""
+SQLite Concurrency Benchmark - stock SQLite versus the production profile
+
+Runs the same mixed workload from many threads against a throwaway SQLite
+catalog twice: once with SQLite's stock settings (rollback journal, one pool
+for everything) and once with the production profile (WAL and pragmas from
+configure_sqlite, reads on a pool, writes serialized through one writer
+connection by RoutingSession). Each operation opens its own session, as a
+request would. Reads fetch a product by ID; writes read a product and then
+decrement its stock, like an order.
+
+Usage:
+    python benchmarks/sqlite_concurrency.py [threads] [seconds] [write_percent]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import Base, RoutingSession, SQLITE_READ_POOL_SIZE, configure_sqlite
+from db_models.product import DBProduct, PRODUCT_LISTING_COLUMNS
+import db_models  # noqa: F401 - registers every mapper so relationships resolve
+
+
+PRODUCTS = 1_000
+DEFAULT_THREADS = 16
+DEFAULT_SECONDS = 5.0
+DEFAULT_WRITE_PERCENT = 20
+
+
+def populate(engine) -> None:
+    """Insert PRODUCTS synthetic products with plenty of stock."""
+    now = datetime.utcnow()
+    rows = [
+        {
+            "name": f"Toy {i}",
+            "brand": f"Brand {i % 50}",
+            "price": 10.0 + i % 500,
+            "quantity": 1_000_000,
+            "description": "A synthetic product used for benchmarking concurrency.",
+            "category": ("Electronic Toys", "Plush Toys", "Board Games")[i % 3],
+            "category_attributes": {},
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(PRODUCTS)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(DBProduct), rows)
+
+
+def stock_factory(path: str):
+    """Session factory with SQLite's stock settings."""
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    return sessionmaker(bind=engine), [engine]
+
+
+def tuned_factory(path: str):
+    """Session factory with the production profile."""
+    url = f"sqlite:///{path}"
+    reader = create_engine(url, connect_args={"check_same_thread": False},
+                           pool_size=SQLITE_READ_POOL_SIZE)
+    writer = create_engine(url, connect_args={"check_same_thread": False},
+                           pool_size=1, max_overflow=0)
+    configure_sqlite(reader)
+    configure_sqlite(writer, writer=True)
+    return sessionmaker(bind=reader, class_=RoutingSession, writer=writer), [reader, writer]
+
+
+def read_product(db: Session, product_id: int) -> None:
+    db.execute(select(*PRODUCT_LISTING_COLUMNS).where(DBProduct.id == product_id)).first()
+
+
+def order_product(db: Session, product_id: int) -> None:
+    db.execute(select(DBProduct.quantity).where(DBProduct.id == product_id)).scalar_one()
+    db.execute(
+        update(DBProduct)
+        .where(DBProduct.id == product_id, DBProduct.quantity > 0)
+        .values(quantity=DBProduct.quantity - 1)
+    )
+    db.commit()
+
+
+def run(factory, threads: int, seconds: float, write_percent: int) -> dict:
+    """Run the workload and collect throughput, latency and error counts."""
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        local = {"reads": 0, "writes": 0, "errors": 0}
+        local_latencies = []
+        while time.perf_counter() < deadline:
+            product_id = rng.randint(1, PRODUCTS)
+            write = rng.randrange(100) < write_percent
+            started = time.perf_counter()
+            try:
+                with factory() as db:
+                    (order_product if write else read_product)(db, product_id)
+            except OperationalError:
+                local["errors"] += 1
+                continue
+            local_latencies.append(time.perf_counter() - started)
+            local["writes" if write else "reads"] += 1
+        with lock:
+            for key, value in local.items():
+                counts[key] += value
+            latencies.extend(local_latencies)
+
+    workers = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0.0
+    return {
+        "ops": (counts["reads"] + counts["writes"]) / elapsed,
+        "reads": counts["reads"] / elapsed,
+        "writes": counts["writes"] / elapsed,
+        "p95_ms": p95 * 1000,
+        "errors": counts["errors"],
+    }
+
+
+def main(threads: int, seconds: float, write_percent: int) -> None:
+    print(f"{threads} threads, {seconds:.0f}s, {write_percent}% writes")
+    print(f"{'profile':>10} {'ops/s':>10} {'reads/s':>10} {'writes/s':>10} {'p95 ms':>8} {'errors':>7}")
+    results = {}
+    for name, make_factory in (("stock", stock_factory), ("tuned", tuned_factory)):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bench.db")
+            setup = create_engine(f"sqlite:///{path}")
+            Base.metadata.create_all(bind=setup)
+            populate(setup)
+            setup.dispose()
+
+            factory, engines = make_factory(path)
+            results[name] = result = run(factory, threads, seconds, write_percent)
+            for engine in engines:
+                engine.dispose()
+        print(f"{name:>10} {result['ops']:>10,.0f} {result['reads']:>10,.0f} "
+              f"{result['writes']:>10,.0f} {result['p95_ms']:>8.1f} {result['errors']:>7}")
+    print(f"speedup: {results['tuned']['ops'] / results['stock']['ops']:.1f}x")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else DEFAULT_THREADS,
+        float(args[1]) if len(args) > 1 else DEFAULT_SECONDS,
+        int(args[2]) if len(args) > 2 else DEFAULT_WRITE_PERCENT,
+    )
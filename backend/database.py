@@ -2,10 +2,18 @@
 Database Configuration - SQLAlchemy setup for Wonderland Toy Store
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+import asyncio
 import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -14,18 +22,486 @@ load_dotenv()
 # Database URL from environment or default to SQLite
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./wonderland.db")
 
+# SQLite profile: "default" keeps SQLite's stock settings; "production" enables
+# WAL journaling and the pragmas below, and sends all writes through a single
+# writer connection while reads use a pool
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "default").lower()
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_READ_POOL_SIZE = int(os.getenv("SQLITE_READ_POOL_SIZE", "8"))
+
+# Connection pool for server databases (PostgreSQL). Each process holds up to
+# DB_POOL_SIZE + DB_MAX_OVERFLOW connections per engine, so size these so
+# that uvicorn workers x engines x (size + overflow) fits max_connections.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# Seconds to wait for a free connection before failing the request
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Connections older than this many seconds are replaced, so they never
+# outlive server-side idle timeouts or a failover; -1 keeps them forever
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Test each connection on checkout and replace it if the server dropped it
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Server-side limit on any single statement, in milliseconds; 0 disables it
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+
+def sqlite_pragmas() -> List[str]:
+    """
+    Get the pragmas run on every connection in the production SQLite profile.
+
+    WAL lets readers proceed while a write is in progress; synchronous=NORMAL
+    is durable across application crashes in WAL mode and only skips an
+    fsync per commit; a negative cache_size is in KiB rather than pages.
+    """
+    return [
+        f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}",
+        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+
+def configure_sqlite(engine: Engine, writer: bool = False) -> None:
+    """
+    Apply the production SQLite pragmas to every new connection of an engine.
+
+    Writer connections start their transactions with BEGIN IMMEDIATE, taking
+    the write lock up front: a deferred transaction that reads first and
+    writes later cannot wait on the busy timeout when another process
+    commits in between, and fails with "database is locked" instead.
+
+    Args:
+        engine: Sync engine (pass ``async_engine.sync_engine`` for async ones)
+        writer: Whether the engine serves writes
+    """
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        if writer:
+            # Let SQLAlchemy's begin event emit BEGIN instead of the driver
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    if writer:
+        @event.listens_for(engine, "begin")
+        def _begin_immediate(conn):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def is_tuned_sqlite(url: str) -> bool:
+    """Check whether the production SQLite profile applies to a database URL."""
+    parsed = make_url(url)
+    return (parsed.get_backend_name() == "sqlite" and SQLITE_PROFILE == "production"
+            and parsed.database not in (None, "", ":memory:"))
+
+
+class _TimedCheckoutMixin:
+    """Records how long checkouts wait for a connection and how many time out."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._checkout_stats = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self._checkout_stats["timeouts"] += 1
+            raise
+        waited = time.perf_counter() - started
+        with self._stats_lock:
+            stats = self._checkout_stats
+            stats["checkouts"] += 1
+            stats["wait_seconds"] += waited
+            stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+        return connection
+
+    def recreate(self):
+        # Keep counting across pool recreation (engine.dispose())
+        pool = super().recreate()
+        pool._checkout_stats = self._checkout_stats
+        pool._stats_lock = self._stats_lock
+        return pool
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get checkout metrics and current pool usage.
+
+        Returns:
+            dict: Cumulative checkout counters plus size, checked-out and
+            overflow connection counts
+        """
+        with self._stats_lock:
+            stats = dict(self._checkout_stats)
+        stats["size"] = self.size()
+        stats["max_overflow"] = self._max_overflow
+        stats["checked_out"] = self.checkedout()
+        stats["overflow"] = max(0, self.overflow())
+        return stats
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    """QueuePool that records checkout wait metrics."""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout wait metrics."""
+
+
+def engine_options(url: str, writer: bool = False) -> Dict[str, Any]:
+    """
+    Get create_engine / create_async_engine arguments for a database URL.
+
+    Args:
+        url: Database URL
+        writer: Whether the engine is the tuned SQLite writer
+
+    Returns:
+        dict: Pool and connection arguments
+    """
+    parsed = make_url(url)
+    is_async = parsed.get_dialect().is_async
+    pool_class = TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool
+
+    if parsed.get_backend_name() == "sqlite":
+        # For SQLite, we need connect_args to allow multi-threading
+        options: Dict[str, Any] = {} if is_async else {"connect_args": {"check_same_thread": False}}
+        if parsed.database in (None, "", ":memory:"):
+            return options
+        options["poolclass"] = pool_class
+        if is_tuned_sqlite(url):
+            if writer:
+                options.update(pool_size=1, max_overflow=0)
+            else:
+                options["pool_size"] = SQLITE_READ_POOL_SIZE
+        return options
+
+    options = {
+        "poolclass": pool_class,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if DB_STATEMENT_TIMEOUT_MS > 0 and parsed.get_backend_name() == "postgresql":
+        if parsed.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
 # Create SQLAlchemy engine
-# For SQLite, we need connect_args to allow multi-threading
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        DATABASE_URL,
-        connect_args={"check_same_thread": False}
-    )
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+
+# Engine for writes. With tuned SQLite this is a single connection, so
+# concurrent writers queue in the pool instead of contending for SQLite's
+# write lock; otherwise it is the same engine as reads.
+if is_tuned_sqlite(DATABASE_URL):
+    writer_engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL, writer=True))
+    configure_sqlite(engine)
+    configure_sqlite(writer_engine, writer=True)
 else:
-    engine = create_engine(DATABASE_URL)
+    writer_engine = engine
+
+
+# Monotonic time of the last commit that wrote to the primary, in this process
+_last_primary_write = float("-inf")
+
+
+class RoutingSession(Session):
+    """
+    Session that routes statements between primary, writer and replica.
+
+    A statement is a write when it is a flush or an INSERT, UPDATE or
+    DELETE; writes go to the writer engine if one is set, otherwise to the
+    bind (the primary). Reads go to the reader engine (a replica) if one is
+    set, otherwise to the bind. Once a transaction has written, the rest of
+    it stays on the write engine, so it reads its own uncommitted changes.
+    """
+
+    def __init__(self, *args, writer: Optional[Engine] = None,
+                 reader: Optional[Engine] = None, **kwargs):
+        """
+        Initialize the session.
+
+        Args:
+            writer: Engine for writes; None sends them to the bind
+            reader: Engine for reads; None sends them to the bind
+        """
+        super().__init__(*args, **kwargs)
+        self.writer = writer
+        self.reader = reader
+        self._wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._wrote or self._flushing or getattr(clause, "is_dml", False):
+            self._wrote = True
+            if self.writer is not None:
+                return self.writer
+        elif self.reader is not None:
+            return self.reader
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+    def commit(self) -> None:
+        global _last_primary_write
+        try:
+            super().commit()
+            if self._wrote:
+                _last_primary_write = time.monotonic()
+        finally:
+            self._wrote = False
+
+    def rollback(self) -> None:
+        try:
+            super().rollback()
+        finally:
+            self._wrote = False
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self._wrote = False
+
 
 # Create SessionLocal class for database sessions
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    class_=RoutingSession,
+    writer=writer_engine if writer_engine is not engine else None
+)
+
+# Async drivers for each supported backend, used by the async engine
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    """
+    Derive the async driver URL for a database URL.
+    e.g. sqlite:///./wonderland.db -> sqlite+aiosqlite:///./wonderland.db
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend)
+    if driver is None:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return parsed.set(drivername=f"{backend}+{driver}").render_as_string(hide_password=False)
+
+
+# Async engine for the FastAPI routes, so queries never block the event loop
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or get_async_database_url(DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+if is_tuned_sqlite(ASYNC_DATABASE_URL):
+    async_writer_engine = create_async_engine(
+        ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, writer=True)
+    )
+    configure_sqlite(async_engine.sync_engine)
+    configure_sqlite(async_writer_engine.sync_engine, writer=True)
+else:
+    async_writer_engine = async_engine
+
+# Objects stay usable after commit, since async code cannot lazy-load them
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    writer=async_writer_engine.sync_engine if async_writer_engine is not async_engine else None,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Read replicas for read-only endpoints, as comma-separated URLs. Async URLs
+# are derived from the sync ones unless given explicitly.
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+ASYNC_DATABASE_REPLICA_URLS = [
+    url.strip() for url in os.getenv("ASYNC_DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+] or [get_async_database_url(url) for url in DATABASE_REPLICA_URLS]
+# Replicas further behind than this are skipped. Reads also stay on the
+# primary for this long after this process writes, so a cache rebuilt right
+# after a write never picks up the replica's older copy.
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "2"))
+# How often each replica's lag is measured
+REPLICA_CHECK_SECONDS = float(os.getenv("REPLICA_CHECK_SECONDS", "5"))
+
+# Replication delay as seen by a replica. pg_last_xact_replay_timestamp()
+# keeps ageing on an idle primary, so a replica that has replayed all it
+# received counts as current; a non-replica reports 0.
+_LAG_QUERIES = {
+    "postgresql": (
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    ),
+}
+
+
+class Replica:
+    """A replica engine and its last measured replication lag."""
+
+    __slots__ = ("engine", "name", "lag", "healthy", "checked_at", "checking")
+
+    def __init__(self, engine, name: str):
+        self.engine = engine
+        self.name = name
+        self.lag = 0.0
+        self.healthy = False
+        self.checked_at = float("-inf")
+        self.checking = False
+
+
+class ReplicaSet:
+    """
+    Round-robin choice among replicas, falling back to the primary.
+
+    A replica is used while its last lag check succeeded and found it at
+    most ``max_lag`` seconds behind. Checks run lazily when a replica is
+    chosen and its last check is older than ``check_interval``.
+    """
+
+    def __init__(self, engines: List[Any], max_lag: float = REPLICA_MAX_LAG_SECONDS,
+                 check_interval: float = REPLICA_CHECK_SECONDS):
+        """
+        Initialize the replica set.
+
+        Args:
+            engines: Replica engines, all sync or all async
+            max_lag: Seconds of replication lag a replica may have
+            check_interval: Seconds between lag checks of a replica
+        """
+        self.replicas = [Replica(engine, str(index)) for index, engine in enumerate(engines)]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._next = 0
+        self._lock = threading.Lock()
+        self.stats = {"replica": 0, "primary": 0}
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    def _rotation(self) -> List[Replica]:
+        """Replicas in round-robin order, starting after the last one used."""
+        with self._lock:
+            start = self._next
+            self._next = (start + 1) % len(self.replicas)
+        return self.replicas[start:] + self.replicas[:start]
+
+    def _primary_only(self) -> bool:
+        return not self.replicas or time.monotonic() - _last_primary_write < self.max_lag
+
+    def _due(self, replica: Replica) -> bool:
+        return not replica.checking and time.monotonic() - replica.checked_at >= self.check_interval
+
+    def _record(self, replica: Replica, lag: Optional[float]) -> None:
+        replica.healthy = lag is not None
+        replica.lag = float(lag) if lag is not None else float("inf")
+        replica.checked_at = time.monotonic()
+        replica.checking = False
+
+    def _lag_query(self, replica: Replica):
+        return text(_LAG_QUERIES.get(replica.engine.dialect.name, "SELECT 0"))
+
+    def _chosen(self, replica: Optional[Replica]):
+        self.stats["replica" if replica is not None else "primary"] += 1
+        return replica.engine if replica is not None else None
+
+    def choose(self) -> Optional[Engine]:
+        """
+        Choose a sync replica engine for a read-only session.
+
+        Returns:
+            Engine: A current replica, or None to read from the primary
+        """
+        if self._primary_only():
+            return self._chosen(None)
+        for replica in self._rotation():
+            if self._due(replica):
+                replica.checking = True
+                try:
+                    with replica.engine.connect() as conn:
+                        lag = conn.execute(self._lag_query(replica)).scalar()
+                except Exception:
+                    lag = None
+                self._record(replica, lag)
+            if replica.healthy and replica.lag <= self.max_lag:
+                return self._chosen(replica)
+        return self._chosen(None)
+
+    async def choose_async(self):
+        """
+        Choose an async replica engine for a read-only session.
+
+        Returns:
+            AsyncEngine: A current replica, or None to read from the primary
+        """
+        if self._primary_only():
+            return self._chosen(None)
+        for replica in self._rotation():
+            if self._due(replica):
+                replica.checking = True
+                try:
+                    async with replica.engine.connect() as conn:
+                        lag = (await asyncio.wait_for(
+                            conn.execute(self._lag_query(replica)), timeout=self.check_interval
+                        )).scalar()
+                except Exception:
+                    lag = None
+                self._record(replica, lag)
+            if replica.healthy and replica.lag <= self.max_lag:
+                return self._chosen(replica)
+        return self._chosen(None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get routing counts and each replica's state.
+
+        Returns:
+            dict: Read sessions per target and per-replica lag and health
+        """
+        return {
+            "sessions": dict(self.stats),
+            "replicas": [
+                {"name": replica.name, "lag": replica.lag, "healthy": replica.healthy}
+                for replica in self.replicas
+            ],
+        }
+
+
+def _replica_engines(urls: List[str], create) -> List[Any]:
+    engines = []
+    for url in urls:
+        replica = create(url, **engine_options(url))
+        if is_tuned_sqlite(url):
+            configure_sqlite(getattr(replica, "sync_engine", replica))
+        engines.append(replica)
+    return engines
+
+
+replicas = ReplicaSet(_replica_engines(DATABASE_REPLICA_URLS, create_engine))
+async_replicas = ReplicaSet(_replica_engines(ASYNC_DATABASE_REPLICA_URLS, create_async_engine))
 
 # Create Base class for declarative models
 Base = declarative_base()
@@ -43,7 +519,62 @@ def get_db():
         db.close()
 
 
+def get_read_db():
+    """
+    Dependency function to get a session for read-only work.
+    Reads go to a current replica when one is configured; writes still go
+    to the primary.
+    """
+    db = SessionLocal(reader=replicas.choose())
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Columns renamed since older databases (such as the bundled wonderland.db)
+# were created: table -> {old name: current name}
+LEGACY_COLUMNS = {
+    "users": {"hashed_password": "password_hash"},
+    "products": {"image": "image_url"},
+    "order_items": {"price_at_time": "price"},
+}
+
+
+def upgrade_schema(bind: Engine) -> None:
+    """
+    Bring existing tables up to date with the models.
+
+    create_all only creates missing tables, so databases created by an
+    earlier version are upgraded here: legacy columns are renamed, missing
+    nullable columns are added and missing indexes are created. Safe to run
+    on every start.
+
+    Args:
+        bind: Sync engine of the database to upgrade
+    """
+    inspector = inspect(bind)
+    existing = set(inspector.get_table_names())
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing:
+                continue
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for old, new in LEGACY_COLUMNS.get(table.name, {}).items():
+                if old in columns and new not in columns:
+                    conn.execute(text(f"ALTER TABLE {table.name} RENAME COLUMN {old} TO {new}"))
+                    columns = (columns - {old}) | {new}
+            for column in table.columns:
+                if column.name not in columns and column.nullable:
+                    column_type = column.type.compile(dialect=bind.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
 def init_db():
-    """Initialize the database by creating all tables."""
+    """Initialize the database by creating missing tables and upgrading existing ones."""
+    import db_models  # noqa: F401 - registers the models on Base.metadata
+    upgrade_schema(engine)
     Base.metadata.create_all(bind=engine)
 
@@ -1,54 +1,8 @@
 """
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-Order and OrderItem database models.
-"""
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
-from database import Base
-import uuid
-
-
-def generate_order_number():
-    """Generate a unique order number."""
-    from datetime import datetime
-    date_part = datetime.now().strftime("%Y%m%d")
-    unique_part = str(uuid.uuid4().hex)[:6].upper()
-    return f"ORD-{date_part}-{unique_part}"
-
-
-class Order(Base):
-    __tablename__ = "orders"
-
-    id = Column(Integer, primary_key=True, index=True)
-    order_number = Column(String(50), unique=True, index=True, default=generate_order_number)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    total_amount = Column(Float, nullable=False, default=0)
-    status = Column(String(50), default="pending")
-    delivery_address = Column(String(500))
-    city = Column(String(100))
-    postal_code = Column(String(20))
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
-
-    items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
-
-    def __repr__(self):
-        return f"<Order(id={self.id}, order_number='{self.order_number}', status='{self.status}')>"
-
-
-class OrderItem(Base):
-=======
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
 Order Database Models - SQLAlchemy models for orders and order items
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -83,6 +37,11 @@ class Order(Base):
         updated_at: Last update timestamp
     """
     __tablename__ = "orders"
+    __table_args__ = (
+        # Keyset pagination indexes for order listings, newest first
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        Index("ix_orders_status_created_at_id", "status", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     order_number = Column(String(50), unique=True, index=True, nullable=False)
@@ -103,7 +62,10 @@ class Order(Base):
         return f"<Order(id={self.id}, order_number={self.order_number}, status={self.status})>"
 
     def to_dict(self) -> dict:
-        """Convert order to dictionary for API responses."""
+        """
+        Convert order to dictionary for API responses.
+        Serializes ``items``, so listings should load them with selectinload.
+        """
         return {
             "id": str(self.id),
             "orderNumber": self.order_number,
@@ -114,8 +76,8 @@ class Order(Base):
             "deliveryAddress": self.delivery_address,
             "city": self.city,
             "postalCode": self.postal_code,
-            "createdAt": self.created_at.isoformat() if self.created_at else None,
-            "updatedAt": self.updated_at.isoformat() if self.updated_at else None
+            "createdAt": self.created_at,
+            "updatedAt": self.updated_at
         }
 
 
@@ -131,33 +93,12 @@ class OrderItem(Base):
         price: Price at time of order
         product_name: Product name at time of order
     """
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
     __tablename__ = "order_items"
 
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     quantity = Column(Integer, nullable=False, default=1)
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-    price_at_time = Column(Float, nullable=False)
-
-    order = relationship("Order", back_populates="items")
-
-    def __repr__(self):
-        return f"<OrderItem(id={self.id}, product_id={self.product_id}, quantity={self.quantity})>"
-=======
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
     price = Column(Float, nullable=False)
     product_name = Column(String(255))  # Store product name at time of order
 
@@ -177,10 +118,3 @@ class OrderItem(Base):
             "quantity": self.quantity,
             "price": self.price
         }
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
@@ -1,16 +1,4 @@
 """
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-Product database model.
-"""
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON
-from sqlalchemy.sql import func
-=======
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
 Product Database Model - SQLAlchemy model for products
 """
 
@@ -21,41 +9,10 @@ from datetime import datetime
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
 from database import Base
 
 
 class DBProduct(Base):
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-    __tablename__ = "products"
-
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(255), nullable=False)
-    brand = Column(String(255), nullable=False)
-    price = Column(Float, nullable=False)
-    quantity = Column(Integer, default=0)
-    description = Column(String(1000))
-    category = Column(String(50), nullable=False)  # Electronic, Plush, BoardGame
-    image = Column(String(500))
-    category_attributes = Column(JSON, default={})
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-
-    def __repr__(self):
-        return f"<DBProduct(id={self.id}, name='{self.name}', category='{self.category}')>"
-=======
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
     """
     Product model for storing all toy products.
     Uses JSON field for category-specific attributes.
@@ -116,13 +73,56 @@ class DBProduct(Base):
             "category": self.category,
             "categoryAttributes": self.category_attributes,
             "in_stock": self.is_in_stock(),
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
         }
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
+
+
+# Columns read by the listing fast path, in the order product_row_to_dict
+# unpacks them. Plain table columns keep the select off the ORM loading path.
+_columns = DBProduct.__table__.c
+PRODUCT_LISTING_COLUMNS = (
+    _columns.id,
+    _columns.name,
+    _columns.brand,
+    _columns.price,
+    _columns.quantity,
+    _columns.description,
+    _columns.image_url,
+    _columns.category,
+    _columns.category_attributes,
+    _columns.created_at,
+    _columns.updated_at,
+)
+
+
+def product_row_to_dict(row) -> dict:
+    """
+    Convert a PRODUCT_LISTING_COLUMNS row to the same dict as DBProduct.to_dict.
+
+    Selecting the columns as plain rows skips building ORM instances and
+    registering them in the session's identity map, which dominates the
+    cost of serializing large listings.
+
+    Args:
+        row: Result row of select(*PRODUCT_LISTING_COLUMNS)
+
+    Returns:
+        dict: Product dictionary for API responses
+    """
+    (product_id, name, brand, price, quantity, description, image_url,
+     category, category_attributes, created_at, updated_at) = row
+    return {
+        "id": str(product_id),
+        "name": name,
+        "brand": brand,
+        "price": price,
+        "quantity": quantity,
+        "description": description,
+        "image": image_url,
+        "category": category,
+        "categoryAttributes": category_attributes,
+        "in_stock": quantity is not None and quantity > 0,
+        "created_at": created_at,
+        "updated_at": updated_at
+    }
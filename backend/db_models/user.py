@@ -40,3 +40,13 @@ class User(Base):
 
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email}, role={self.role})>"
+
+    def to_dict(self) -> dict:
+        """Convert user to dictionary for API responses."""
+        return {
+            "id": str(self.id),
+            "email": self.email,
+            "name": self.name,
+            "role": self.role,
+            "createdAt": self.created_at
+        }
@@ -0,0 +1,51 @@
+"""
+Catalog Import Script - Bulk load products from a CSV or NDJSON feed
+Same pipeline as POST /api/admin/products/import, run against the configured
+database without going through the API.
+
+Usage:
+    python import_catalog.py feed.csv [--format csv|ndjson] [--workers N]
+"""
+
+import argparse
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database import init_db
+from services.importer import IMPORT_FORMATS, IMPORT_WORKERS, detect_format, import_catalog
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk import products from a CSV or NDJSON feed.")
+    parser.add_argument("path", help="Feed file")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="Feed format (default: from the file extension)")
+    parser.add_argument("--workers", type=int, default=IMPORT_WORKERS,
+                        help=f"Validation processes (default: {IMPORT_WORKERS})")
+    args = parser.parse_args()
+
+    import_format = args.format or detect_format(args.path)
+    if import_format is None:
+        parser.error("cannot tell the format from the file name; pass --format")
+
+    init_db()
+    started = time.perf_counter()
+    with open(args.path, "rb") as feed:
+        report = import_catalog(feed, import_format, workers=args.workers)
+    elapsed = time.perf_counter() - started
+
+    print(f"[OK] Imported {report.imported:,} of {report.received:,} products "
+          f"in {elapsed:.1f}s ({report.received / max(elapsed, 1e-9):,.0f} rows/s)")
+    if report.failed:
+        print(f"[WARN] {report.failed:,} rows failed:")
+        for failure in report.errors[:20]:
+            messages = "; ".join(error["message"] for error in failure["errors"])
+            print(f"   - row {failure['row']}: {messages}")
+        if report.failed > 20:
+            print(f"   ... and {report.failed - 20:,} more")
+    return 0 if report.imported or not report.received else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
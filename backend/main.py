@@ -2,13 +2,17 @@
 Wonderland Toy Store - FastAPI Backend
 Main application entry point.
 """
-import os
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
-from database import engine, Base
+from database import init_db
+from utils.compression import CompressionMiddleware
+from utils.metrics import CONTENT_TYPE_LATEST, MetricsMiddleware, registry
+from utils.responses import FastJSONResponse
+from utils import slow_query_log  # noqa: F401 - registers the engine listeners
+from utils.security import password_hash_pool
 from routes import auth_router, products_router, orders_router, users_router, admin_router
 
 # Load environment variables
@@ -19,10 +23,11 @@ load_dotenv()
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
     print("[INFO] Starting Wonderland Toy Store API...")
-    Base.metadata.create_all(bind=engine)
-    print("[OK] Database tables created")
+    init_db()
+    print("[OK] Database tables ready")
     yield
     print("[INFO] Shutting down Wonderland Toy Store API...")
+    password_hash_pool.shutdown()
 
 
 app = FastAPI(
@@ -30,6 +35,7 @@ app = FastAPI(
     description="Backend API for the Wonderland Toy Store e-commerce platform",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # CORS Configuration
@@ -47,6 +53,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
+# Outermost, so timings include CORS and compression
+app.add_middleware(MetricsMiddleware)
 
 # Include routers
 app.include_router(auth_router, prefix="/api/auth", tags=["Authentication"])
@@ -72,6 +81,12 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint."""
+    return Response(content=registry.render(), media_type=CONTENT_TYPE_LATEST)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
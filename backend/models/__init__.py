@@ -7,11 +7,13 @@ from .product import Product
 from .electronic_toy import ElectronicToy
 from .plush_toy import PlushToy
 from .board_game import BoardGame
+from .product_table import ProductTable
 
 __all__ = [
     'Product',
     'ElectronicToy',
     'PlushToy',
-    'BoardGame'
+    'BoardGame',
+    'ProductTable'
 ]
 
@@ -4,8 +4,8 @@ Inherits from Product and adds game-specific attributes
 """
 
 from datetime import datetime
-from typing import Dict, Any, Optional, List
-from product import Product
+from typing import Dict, Any, Optional
+from .product import Product
 
 
 class BoardGame(Product):
@@ -18,6 +18,8 @@ class BoardGame(Product):
         number_of_players (str): Number of players (e.g., "2-4", "1+")
     """
 
+    __slots__ = ("_age_range", "_number_of_players")
+
     # Class variables for valid values
     VALID_AGE_RANGES = ["3+", "5+", "8+", "10+", "12+", "14+", "16+", "18+"]
 
@@ -216,6 +218,20 @@ class BoardGame(Product):
 
         return True
 
+    def to_csv_row(self) -> list:
+        """
+        Override parent CSV row to append board game columns.
+
+        Returns:
+            list: Product data followed by age range and number of players
+        """
+        return super().to_csv_row() + [self._age_range, self._number_of_players]
+
+    @staticmethod
+    def csv_headers() -> list:
+        """Get CSV column headers, including board game columns."""
+        return Product.csv_headers() + ['Age Range', 'Number of Players']
+
     def is_suitable_for_age(self, age: int) -> bool:
         """
         Check if game is suitable for a specific age.
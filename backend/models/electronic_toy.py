@@ -5,7 +5,7 @@ Inherits from Product and adds electronic-specific attributes
 
 from datetime import datetime
 from typing import Dict, Any, Optional
-from product import Product
+from .product import Product
 
 
 class ElectronicToy(Product):
@@ -18,6 +18,8 @@ class ElectronicToy(Product):
         voltage (str): Operating voltage specifications (e.g., "3V", "5V")
     """
 
+    __slots__ = ("_battery_type", "_voltage")
+
     # Class variable to define valid battery types
     VALID_BATTERY_TYPES = ["AA", "AAA", "C", "D", "9V", "Rechargeable", "USB-C", "Solar", "None"]
 
@@ -197,6 +199,20 @@ class ElectronicToy(Product):
 
         return True
 
+    def to_csv_row(self) -> list:
+        """
+        Override parent CSV row to append electronic columns.
+
+        Returns:
+            list: Product data followed by battery type and voltage
+        """
+        return super().to_csv_row() + [self._battery_type, self._voltage]
+
+    @staticmethod
+    def csv_headers() -> list:
+        """Get CSV column headers, including electronic columns."""
+        return Product.csv_headers() + ['Battery Type', 'Voltage']
+
     def __str__(self) -> str:
         """String representation including electronic details."""
         return (f"ElectronicToy(id={self._id}, name={self._name}, "
@@ -5,7 +5,7 @@ Inherits from Product and adds plush-specific attributes
 
 from datetime import datetime
 from typing import Dict, Any, Optional
-from product import Product
+from .product import Product
 
 
 class PlushToy(Product):
@@ -18,6 +18,8 @@ class PlushToy(Product):
         size (str): Physical size (e.g., "Small", "Medium", "Large", "10cm", "30cm")
     """
 
+    __slots__ = ("_material", "_size")
+
     # Class variables for valid values
     VALID_MATERIALS = ["Polyester", "Cotton", "Fleece", "Velvet", "Plush", "Mixed"]
     VALID_SIZES = ["Micro", "Small", "Medium", "Large", "Extra Large"]
@@ -218,6 +220,20 @@ class PlushToy(Product):
 
         return True
 
+    def to_csv_row(self) -> list:
+        """
+        Override parent CSV row to append plush columns.
+
+        Returns:
+            list: Product data followed by material and size
+        """
+        return super().to_csv_row() + [self._material, self._size]
+
+    @staticmethod
+    def csv_headers() -> list:
+        """Get CSV column headers, including plush columns."""
+        return Product.csv_headers() + ['Material', 'Size']
+
     def __str__(self) -> str:
         """String representation including plush details."""
         return (f"PlushToy(id={self._id}, name={self._name}, "
@@ -23,8 +23,17 @@ class Product:
         category (str): Product category type
         created_at (datetime): Creation timestamp
         updated_at (datetime): Last update timestamp
+
+    Attributes live in __slots__ rather than a per-instance __dict__, which
+    keeps instances small when the whole catalog is loaded into memory.
+    Subclasses declare slots for their own fields.
     """
 
+    __slots__ = (
+        "_id", "_name", "_brand", "_price", "_quantity", "_description",
+        "_image_url", "_category", "_created_at", "_updated_at", "_rating",
+    )
+
     def __init__(
         self,
         id: int,
@@ -49,6 +58,7 @@ class Product:
         self._category = category
         self._created_at = created_at or datetime.now()
         self._updated_at = updated_at or datetime.now()
+        self._rating: Optional[float] = None
 
     # Properties with getters and setters for encapsulation
     @property
@@ -296,7 +306,7 @@ class Product:
 
     def get_rating(self) -> Optional[float]:
         """Get product rating if available."""
-        return getattr(self, '_rating', None)
+        return self._rating
 
     def is_highly_rated(self, threshold: float = 4.0) -> bool:
         """
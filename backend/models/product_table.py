@@ -0,0 +1,295 @@
+"""
+ProductTable - Columnar, vectorized view of many products
+Holds id, price, quantity and category as NumPy arrays so inventory queries
+over a whole catalog run as array operations instead of per-object loops
+"""
+
+from typing import Any, Dict, Iterable, List, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from .product import Product
+
+
+ArrayLike = Union[int, float, Sequence[float], "np.ndarray"]
+
+
+def _require_numpy() -> None:
+    """Fail clearly when the optional NumPy dependency is missing."""
+    if np is None:
+        raise RuntimeError("ProductTable requires numpy; install it with 'pip install numpy'")
+
+
+def _round_cents(values):
+    """
+    Round to 2 places exactly as Python's round() does.
+
+    np.round scales by 100 first, which can tip values lying on a half cent
+    the other way; those few are re-rounded one by one.
+    """
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    ambiguous = np.flatnonzero(np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6)
+    if len(ambiguous):
+        rounded[ambiguous] = [round(value, 2) for value in values[ambiguous].tolist()]
+    return rounded
+
+
+class ProductTable:
+    """
+    Struct-of-arrays representation of a product collection.
+
+    Each query mirrors a per-object method of Product (is_low_stock,
+    calculate_restock_quantity, is_within_price_range, apply_discount, ...)
+    and returns an array aligned with the table's rows, or the ids of the
+    matching rows.
+
+    Attributes:
+        ids (np.ndarray): Product IDs (int64)
+        prices (np.ndarray): Prices (float64)
+        quantities (np.ndarray): Stock quantities (int64)
+        category_codes (np.ndarray): Index into ``categories`` (int16)
+        categories (list): Category names, in code order
+    """
+
+    __slots__ = ("ids", "prices", "quantities", "category_codes", "categories", "_category_index")
+
+    def __init__(self, ids, prices, quantities, category_codes, categories: List[str]):
+        """
+        Initialize a table from existing columns.
+
+        Use from_products, from_rows or from_columns rather than calling
+        this directly.
+
+        Raises:
+            RuntimeError: If NumPy is not installed
+            ValueError: If the columns differ in length
+        """
+        _require_numpy()
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self.quantities = np.asarray(quantities, dtype=np.int64)
+        self.category_codes = np.asarray(category_codes, dtype=np.int16)
+        if not (len(self.ids) == len(self.prices) == len(self.quantities) == len(self.category_codes)):
+            raise ValueError("ProductTable columns must all have the same length")
+        self.categories = list(categories)
+        self._category_index = {name: code for code, name in enumerate(self.categories)}
+
+    # ========== CONSTRUCTION ==========
+    @classmethod
+    def from_columns(cls, ids: Iterable[int], prices: Iterable[float],
+                     quantities: Iterable[int], categories: Iterable[str]) -> 'ProductTable':
+        """
+        Build a table from one iterable per column.
+
+        Args:
+            ids: Product IDs
+            prices: Prices
+            quantities: Stock quantities
+            categories: Category names, one per product
+
+        Returns:
+            ProductTable: The table
+        """
+        _require_numpy()
+        names: Dict[str, int] = {}
+        codes = np.fromiter(
+            (names.setdefault(category, len(names)) for category in categories), dtype=np.int16
+        )
+        return cls(
+            np.fromiter(ids, dtype=np.int64),
+            np.fromiter(prices, dtype=np.float64),
+            np.fromiter(quantities, dtype=np.int64),
+            codes,
+            list(names),
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[int, float, int, str]]) -> 'ProductTable':
+        """
+        Build a table from (id, price, quantity, category) rows, such as the
+        result of ``select(DBProduct.id, DBProduct.price, DBProduct.quantity,
+        DBProduct.category)``.
+
+        Args:
+            rows: Row tuples
+
+        Returns:
+            ProductTable: The table
+        """
+        rows = list(rows)
+        if not rows:
+            return cls.from_columns((), (), (), ())
+        ids, prices, quantities, categories = zip(*rows)
+        return cls.from_columns(ids, prices, (quantity or 0 for quantity in quantities), categories)
+
+    @classmethod
+    def from_products(cls, products: Iterable[Any]) -> 'ProductTable':
+        """
+        Build a table from Product instances (any subclass) or DBProduct rows.
+
+        Args:
+            products: Objects with id, price, quantity and category attributes
+
+        Returns:
+            ProductTable: The table
+        """
+        return cls.from_rows(
+            (product.id, product.price, product.quantity, product.category) for product in products
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __repr__(self) -> str:
+        return f"<ProductTable(rows={len(self)}, categories={self.categories})>"
+
+    def take(self, selection) -> 'ProductTable':
+        """
+        Get the rows picked by a boolean mask or index array.
+
+        Args:
+            selection: Boolean mask or integer indices
+
+        Returns:
+            ProductTable: A new table with the selected rows
+        """
+        return ProductTable(
+            self.ids[selection], self.prices[selection], self.quantities[selection],
+            self.category_codes[selection], self.categories,
+        )
+
+    # ========== FILTERS ==========
+    def in_stock_mask(self):
+        """Mask of products with quantity > 0 (Product.is_in_stock)."""
+        return self.quantities > 0
+
+    def low_stock_mask(self, threshold: ArrayLike = 5):
+        """
+        Mask of products below a stock threshold (Product.is_low_stock).
+
+        Args:
+            threshold: Minimum stock level, scalar or per row
+
+        Returns:
+            np.ndarray: Boolean mask
+        """
+        return self.quantities < np.asarray(threshold)
+
+    def low_stock(self, threshold: ArrayLike = 5):
+        """IDs of products below a stock threshold."""
+        return self.ids[self.low_stock_mask(threshold)]
+
+    def price_range_mask(self, min_price: float, max_price: float):
+        """
+        Mask of products priced within a range, inclusive
+        (Product.is_within_price_range).
+
+        Args:
+            min_price: Minimum price
+            max_price: Maximum price
+
+        Returns:
+            np.ndarray: Boolean mask
+        """
+        return (self.prices >= min_price) & (self.prices <= max_price)
+
+    def within_price_range(self, min_price: float, max_price: float):
+        """IDs of products priced within a range, inclusive."""
+        return self.ids[self.price_range_mask(min_price, max_price)]
+
+    def category_mask(self, category: str):
+        """
+        Mask of products in a category.
+
+        Args:
+            category: Category name
+
+        Returns:
+            np.ndarray: Boolean mask (all False for an unknown category)
+        """
+        code = self._category_index.get(category)
+        if code is None:
+            return np.zeros(len(self), dtype=bool)
+        return self.category_codes == code
+
+    # ========== INVENTORY OPERATIONS ==========
+    def stock_percentages(self, initial_stock: ArrayLike):
+        """
+        Remaining stock as a percentage of initial stock
+        (Product.get_stock_percentage).
+
+        Args:
+            initial_stock: Original stock quantity, scalar or per row
+
+        Returns:
+            np.ndarray: Percentages rounded to 2 places; 0 where initial
+            stock is not positive
+        """
+        initial = np.broadcast_to(np.asarray(initial_stock, dtype=np.float64), self.quantities.shape)
+        percentages = np.zeros(len(self), dtype=np.float64)
+        np.divide(self.quantities * 100.0, initial, out=percentages, where=initial > 0)
+        return _round_cents(percentages)
+
+    def restock_quantities(self, target_stock: ArrayLike):
+        """
+        Quantity to order to reach a target stock level
+        (Product.calculate_restock_quantity).
+
+        Args:
+            target_stock: Desired stock level, scalar or per row
+
+        Returns:
+            np.ndarray: Quantities, 0 where stock already meets the target
+        """
+        return np.maximum(np.asarray(target_stock, dtype=np.int64) - self.quantities, 0)
+
+    # ========== DISCOUNT & PRICING ==========
+    def apply_discount(self, discount_percent: ArrayLike):
+        """
+        Discounted prices (Product.apply_discount).
+
+        Args:
+            discount_percent: Discount percentage (0-100), scalar or per row
+
+        Returns:
+            np.ndarray: Discounted prices rounded to 2 places
+
+        Raises:
+            ValueError: If any discount is outside 0-100
+        """
+        discount = np.asarray(discount_percent, dtype=np.float64)
+        if np.any((discount < 0) | (discount > 100)):
+            raise ValueError("Discount must be between 0 and 100")
+        return _round_cents(self.prices - self.prices * (discount / 100))
+
+    def inventory_value(self, mask=None) -> float:
+        """
+        Total price x quantity over all rows, or the rows in a mask.
+
+        Args:
+            mask: Optional boolean mask
+
+        Returns:
+            float: Stock value
+        """
+        if mask is None:
+            return float(np.dot(self.prices, self.quantities))
+        return float(np.dot(self.prices[mask], self.quantities[mask]))
+
+    def to_products(self, products_by_id: Dict[int, Product], selection=None) -> List[Product]:
+        """
+        Map rows back to their Product objects.
+
+        Args:
+            products_by_id: Products keyed by ID
+            selection: Optional boolean mask or indices
+
+        Returns:
+            list: Products for the selected rows, in table order
+        """
+        ids = self.ids if selection is None else self.ids[selection]
+        return [products_by_id[product_id] for product_id in ids.tolist()]
@@ -2,48 +2,184 @@
 Admin Routes - Admin management functions
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from datetime import datetime
 
-router = APIRouter(prefix="/admin", tags=["Admin"])
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from db_models.order import Order, OrderStatus
+from services.analytics import PERIODS, get_sales_rollup_async
+from services.catalog import apply_stock_levels
+from services.dashboard import get_dashboard_stats_async
+from services.export import EXPORT_FORMATS, stream_catalog_export
+from services.importer import API_IMPORT_WORKERS, IMPORT_FORMATS, detect_format, import_catalog
+from services.inventory import change_order_status, reserve_stock, release_stock, order_quantities
+from utils.deps import get_async_db, get_async_read_db, get_current_admin
+from utils.pagination import encode_cursor, decode_cursor, cursor_page
+from utils.responses import FastJSONRoute
+
+router = APIRouter(prefix="/admin", tags=["Admin"], route_class=FastJSONRoute)
 
 
 @router.get("/dashboard")
-async def admin_dashboard():
-    """Get admin dashboard statistics."""
-    return {
-        "totalProducts": 50,
-        "totalOrders": 100,
-        "totalRevenue": 50000,
-        "totalUsers": 200,
-        "recentOrders": [],
-        "lowStockProducts": []
-    }
+async def admin_dashboard(db: AsyncSession = Depends(get_async_read_db),
+                          admin=Depends(get_current_admin)):
+    """
+    Get admin dashboard statistics.
+
+    Served from the incrementally maintained summary in services.dashboard,
+    so no aggregate queries run per request.
+    """
+    return (await get_dashboard_stats_async(db)).to_dict()
 
 
 @router.get("/orders")
-async def get_all_orders(status: str = None, skip: int = 0, limit: int = 100):
-    """Get all orders (admin only)."""
-    return []
+async def get_all_orders(status: str = None, skip: int = 0, limit: int = 100, cursor: str = None,
+                         db: AsyncSession = Depends(get_async_read_db),
+                         admin=Depends(get_current_admin)):
+    """
+    Get all orders, newest first (admin only).
+
+    Passing ``cursor`` (empty for the first page) switches to keyset
+    pagination on ``(created_at, id)``: the response becomes
+    ``{items, next_cursor}`` and ``skip`` is ignored.
+    """
+    # Items are loaded up front: async sessions cannot lazy-load in to_dict()
+    query = select(Order).options(selectinload(Order.items))
+    if status:
+        query = query.where(Order.status == status)
+    query = query.order_by(Order.created_at.desc(), Order.id.desc())
+
+    if cursor is None:
+        result = await db.execute(query.offset(skip).limit(limit))
+        return [order.to_dict() for order in result.scalars()]
+
+    after = decode_cursor(cursor, datetime, int)
+    if after:
+        query = query.where(tuple_(Order.created_at, Order.id) < tuple_(*after))
+    orders = (await db.execute(query.limit(limit + 1))).scalars().all()
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = encode_cursor(orders[-1].created_at, orders[-1].id)
+    return cursor_page([order.to_dict() for order in orders], next_cursor)
 
 
 @router.get("/analytics")
-async def get_analytics(period: str = "month"):
-    """Get sales analytics."""
-    return {
-        "period": period,
-        "sales": 0,
-        "orders": 0,
-        "revenue": 0,
-        "topProducts": []
-    }
+async def get_analytics(period: str = "month", db: AsyncSession = Depends(get_async_read_db),
+                        admin=Depends(get_current_admin)):
+    """
+    Get sales analytics for the last day, week, month or year (admin only).
+
+    Answered from the pre-aggregated buckets in services.analytics.
+    """
+    if period not in PERIODS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid period. Must be one of: {', '.join(PERIODS)}"
+        )
+    return (await get_sales_rollup_async(db)).summarize(period)
+
+
+@router.get("/products/export")
+async def export_products(format: str = "csv", category: str = None,
+                          db: AsyncSession = Depends(get_async_read_db),
+                          admin=Depends(get_current_admin)):
+    """
+    Export the catalog as CSV or NDJSON (admin only).
+
+    The response streams from a server-side cursor, so memory use does not
+    grow with the catalog. CSV rows carry every category column, empty where
+    it does not apply; NDJSON records only carry their own category's fields.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format. Must be one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        stream_catalog_export(db, format, category),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="products.{extension}"'},
+    )
+
+
+@router.post("/products/import")
+async def import_products(file: UploadFile = File(...), format: str = None,
+                          admin=Depends(get_current_admin)):
+    """
+    Bulk import products from a CSV or NDJSON file (admin only).
+
+    The format is taken from ``format`` or the file extension. Rows are
+    validated against their category's rules and inserted in batches;
+    invalid rows are reported by row number and do not stop the import.
+    """
+    import_format = format or detect_format(file.filename)
+    if import_format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format. Must be one of: {', '.join(IMPORT_FORMATS)}"
+        )
+    report = await asyncio.to_thread(import_catalog, file.file, import_format, API_IMPORT_WORKERS)
+    return report.to_dict()
 
 
 @router.put("/orders/{order_id}/status")
-async def update_order_status(order_id: str, status: str):
+async def update_order_status(order_id: int, status_value: str = Query(..., alias="status"),
+                              db: AsyncSession = Depends(get_async_db),
+                              admin=Depends(get_current_admin)):
     """Update order status (admin only)."""
+    valid_statuses = {order_status.value for order_status in OrderStatus}
+    if status_value not in valid_statuses:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid status. Must be one of: {', '.join(sorted(valid_statuses))}"
+        )
+
+    result = await db.execute(
+        select(Order).options(selectinload(Order.items)).where(Order.id == order_id)
+    )
+    order = result.scalar_one_or_none()
+    if order is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Order not found"
+        )
+
+    previous_status = order.status
+    if not await change_order_status(db, order.id, previous_status, status_value):
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Order was updated by another request, please retry"
+        )
+
+    # Cancelling returns the items to stock; reopening takes them back out
+    cancelled = OrderStatus.CANCELLED.value
+    stock_levels = []
+    if (previous_status == cancelled) != (status_value == cancelled):
+        quantities = order_quantities((item.product_id, item.quantity) for item in order.items)
+        if status_value == cancelled:
+            stock_levels = await release_stock(db, quantities)
+        else:
+            reserved = await reserve_stock(db, quantities)
+            if reserved is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Not enough stock to reopen this order"
+                )
+            stock_levels = reserved.values()
+
+    await db.commit()
+    if stock_levels:
+        apply_stock_levels(stock_levels)
     return {
-        "id": order_id,
-        "status": status,
+        "id": str(order_id),
+        "status": status_value,
         "message": "Order status updated"
     }
-
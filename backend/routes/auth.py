@@ -4,15 +4,25 @@ Authentication Routes - Register, Login, and Get Current User
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-import os
-from dotenv import load_dotenv
-import jwt
-from passlib.context import CryptContext
 
-load_dotenv()
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_models.user import User
+from utils.deps import get_async_db, get_current_user as get_current_principal
+from utils.auth_cache import UserPrincipal
+from utils.responses import FastJSONRoute
+from utils.security import (
+    create_access_token,
+    hash_password_async,
+    verify_password_async,
+    needs_rehash,
+    PasswordHasherBusyError
+)
 
 # Pydantic models
 class LoginRequest(BaseModel):
@@ -24,71 +34,90 @@ class RegisterRequest(BaseModel):
     name: str
     password: str
 
-router = APIRouter()
-
-# Security configuration
-SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
-ALGORITHM = os.getenv("ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))
+router = APIRouter(route_class=FastJSONRoute)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Seconds clients are told to wait when the password hash pool is saturated
+HASH_BUSY_RETRY_AFTER = "1"
 
-def hash_password(password: str) -> str:
-    """Hash a password."""
-    return pwd_context.hash(password)
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
 
+def _hasher_busy() -> HTTPException:
+    """Build the error returned when the password hash pool is saturated."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent authentication requests, please retry",
+        headers={"Retry-After": HASH_BUSY_RETRY_AFTER}
+    )
 
-def create_access_token(data: dict, expires_delta: timedelta = None):
-    """Create a JWT access token."""
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+def _issue_token(user: User) -> str:
+    """Create an access token for a user."""
+    return create_access_token({"user_id": user.id, "sub": user.email})
 
 
 @router.post("/register")
-async def register(user_data: RegisterRequest):
+async def register(user_data: RegisterRequest, db: AsyncSession = Depends(get_async_db)):
     """Register a new user."""
+    result = await db.execute(select(User.id).where(User.email == user_data.email))
+    if result.first() is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+
+    try:
+        password_hash = await hash_password_async(user_data.password)
+    except PasswordHasherBusyError:
+        raise _hasher_busy()
+
+    user = User(
+        email=user_data.email,
+        name=user_data.name,
+        password_hash=password_hash,
+        role="customer"
+    )
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+
     return {
         "message": "User registered successfully",
-        "user": {
-            "id": "1",
-            "email": user_data.email,
-            "name": user_data.name,
-            "role": "customer",
-            "createdAt": datetime.utcnow().isoformat()
-        },
-        "access_token": create_access_token({"sub": user_data.email}),
+        "user": user.to_dict(),
+        "access_token": _issue_token(user),
         "token_type": "bearer"
     }
 
 
 @router.post("/login")
-async def login(login_data: LoginRequest):
+async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """Login user."""
-    # For demo purposes, accept any credentials
+    result = await db.execute(select(User).where(User.email == login_data.email))
+    user = result.scalar_one_or_none()
+
+    try:
+        valid = user is not None and await verify_password_async(
+            login_data.password, user.password_hash
+        )
+        if valid and needs_rehash(user.password_hash):
+            # Cost factor changed since this hash was made; upgrade it now
+            # that the plain password is at hand
+            user.password_hash = await hash_password_async(login_data.password)
+            await db.commit()
+    except PasswordHasherBusyError:
+        raise _hasher_busy()
+
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
     return {
-        "access_token": create_access_token({"sub": login_data.email}),
+        "access_token": _issue_token(user),
         "token_type": "bearer",
-        "user": {
-            "id": "1",
-            "email": login_data.email,
-            "name": login_data.email.split("@")[0],
-            "role": "customer",
-            "createdAt": datetime.utcnow().isoformat()
-        }
+        "user": user.to_dict()
     }
 
 
@@ -99,29 +128,9 @@ async def logout():
 
 
 @router.get("/me")
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(current_user: UserPrincipal = Depends(get_current_principal)):
     """Get current user information."""
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials"
-            )
-    except jwt.PyJWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
-
-    return {
-        "id": "1",
-        "email": email,
-        "name": email.split("@")[0],
-        "role": "customer",
-        "createdAt": datetime.utcnow().isoformat()
-    }
+    return current_user.to_dict()
 
 
 @router.put("/profile")
@@ -139,7 +148,29 @@ async def update_profile(name: str = None, email: str = None, token: str = Depen
 
 
 @router.post("/change-password")
-async def change_password(old_password: str, new_password: str, token: str = Depends(oauth2_scheme)):
+async def change_password(
+    old_password: str,
+    new_password: str,
+    current_user: UserPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Change user password."""
-    return {"message": "Password changed successfully"}
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
 
+    try:
+        if not await verify_password_async(old_password, user.password_hash):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Incorrect password"
+            )
+        user.password_hash = await hash_password_async(new_password)
+    except PasswordHasherBusyError:
+        raise _hasher_busy()
+
+    await db.commit()
+    return {"message": "Password changed successfully"}
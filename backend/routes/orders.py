@@ -3,77 +3,191 @@ Orders Routes - Order management
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+import uuid
 
-router = APIRouter(prefix="/orders", tags=["Orders"])
+from db_models.order import Order, OrderItem, OrderStatus
+from services.catalog import apply_stock_levels
+from services.inventory import change_order_status, reserve_stock, release_stock, order_quantities
+from utils.auth_cache import UserPrincipal
+from utils.deps import get_async_db, get_async_read_db, get_current_user
+from utils.pagination import encode_cursor, decode_cursor, cursor_page
+from utils.responses import FastJSONRoute
+
+router = APIRouter(prefix="/orders", tags=["Orders"], route_class=FastJSONRoute)
+
+# Orders can only be cancelled before they ship
+CANCELLABLE_STATUSES = {OrderStatus.PENDING.value, OrderStatus.PROCESSING.value}
+
+
+# Pydantic models
+class OrderItemRequest(BaseModel):
+    productId: str
+    quantity: int
+
+class CreateOrderRequest(BaseModel):
+    items: List[OrderItemRequest]
+    deliveryAddress: str
+    city: Optional[str] = None
+    postalCode: Optional[str] = None
+
+
+def _orders_with_items():
+    """
+    Select orders with their items batch-loaded in one extra query.
+
+    Order.to_dict() serializes the items relationship; loading it lazily
+    would cost a query per order (and async sessions cannot lazy-load).
+    """
+    return select(Order).options(selectinload(Order.items))
+
+
+async def _get_order_or_404(db: AsyncSession, order_id: int, user: UserPrincipal) -> Order:
+    """Load an order visible to the user, raising 404 otherwise."""
+    result = await db.execute(_orders_with_items().where(Order.id == order_id))
+    order = result.scalar_one_or_none()
+    # Other users' orders are reported as missing rather than forbidden
+    if order is None or (order.user_id != user.id and user.role != "admin"):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Order not found"
+        )
+    return order
+
+
+def _new_order_number() -> str:
+    """Generate a unique, human-readable order number."""
+    return f"ORD-{datetime.utcnow():%Y%m%d}-{uuid.uuid4().hex[:8].upper()}"
 
 
 @router.post("/")
-async def create_order(items: list = None, deliveryAddress: str = None, city: str = None, postalCode: str = None):
+async def create_order(
+    order_data: CreateOrderRequest,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Create a new order."""
-    return {
-        "id": "order-123",
-        "orderNumber": f"ORD-{datetime.now().timestamp()}",
-        "userId": "user-1",
-        "items": items or [],
-        "totalAmount": 0,
-        "status": "pending",
-        "deliveryAddress": deliveryAddress,
-        "city": city,
-        "postalCode": postalCode,
-        "createdAt": datetime.utcnow().isoformat(),
-        "updatedAt": datetime.utcnow().isoformat(),
-    }
+    if not order_data.items or any(item.quantity <= 0 for item in order_data.items):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Order must contain items with positive quantities"
+        )
+    try:
+        quantities = order_quantities((item.productId, item.quantity) for item in order_data.items)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid product ID"
+        )
+
+    reserved = await reserve_stock(db, quantities)
+    if reserved is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="One or more products are unavailable in the requested quantity"
+        )
+
+    order = Order(
+        order_number=_new_order_number(),
+        user_id=current_user.id,
+        status=OrderStatus.PENDING.value,
+        delivery_address=order_data.deliveryAddress,
+        city=order_data.city,
+        postal_code=order_data.postalCode,
+        items=[
+            OrderItem(
+                product_id=product_id,
+                quantity=quantity,
+                price=reserved[product_id].price,
+                product_name=reserved[product_id].name
+            )
+            for product_id, quantity in quantities.items()
+        ]
+    )
+    order.total_amount = round(sum(item.price * item.quantity for item in order.items), 2)
+    db.add(order)
+    await db.commit()
+    # Stock levels are part of the catalog listing
+    apply_stock_levels(reserved.values())
+    return order.to_dict()
 
 
 @router.get("/my-orders")
-async def get_user_orders():
-    """Get current user's orders."""
-    return [
-        {
-            "id": "order-1",
-            "orderNumber": "ORD-001",
-            "userId": "user-1",
-            "items": [
-                {
-                    "productId": "1",
-                    "name": "Robot Explorer",
-                    "quantity": 2,
-                    "price": 4999.99,
-                }
-            ],
-            "totalAmount": 9999.98,
-            "status": "delivered",
-            "deliveryAddress": "123 Main St",
-            "city": "Karachi",
-            "postalCode": "75500",
-            "createdAt": datetime.utcnow().isoformat(),
-            "updatedAt": datetime.utcnow().isoformat(),
-        }
-    ]
+async def get_user_orders(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str = None,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Get current user's orders, newest first.
+
+    Passing ``cursor`` (empty for the first page) switches to keyset
+    pagination on ``(created_at, id)``, as for the admin order listing.
+    """
+    query = (
+        _orders_with_items()
+        .where(Order.user_id == current_user.id)
+        .order_by(Order.created_at.desc(), Order.id.desc())
+    )
+
+    if cursor is None:
+        result = await db.execute(query.offset(skip).limit(limit))
+        return [order.to_dict() for order in result.scalars()]
+
+    after = decode_cursor(cursor, datetime, int)
+    if after:
+        query = query.where(tuple_(Order.created_at, Order.id) < tuple_(*after))
+    orders = (await db.execute(query.limit(limit + 1))).scalars().all()
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = encode_cursor(orders[-1].created_at, orders[-1].id)
+    return cursor_page([order.to_dict() for order in orders], next_cursor)
 
 
 @router.get("/{order_id}")
-async def get_order(order_id: str):
+async def get_order(
+    order_id: int,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get a specific order by ID."""
-    return {
-        "id": order_id,
-        "orderNumber": f"ORD-{order_id}",
-        "userId": "user-1",
-        "items": [],
-        "totalAmount": 0,
-        "status": "pending",
-        "createdAt": datetime.utcnow().isoformat(),
-        "updatedAt": datetime.utcnow().isoformat(),
-    }
+    order = await _get_order_or_404(db, order_id, current_user)
+    return order.to_dict()
 
 
 @router.put("/{order_id}/cancel")
-async def cancel_order(order_id: str):
-    """Cancel an order."""
+async def cancel_order(
+    order_id: int,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Cancel an order and return its items to stock."""
+    order = await _get_order_or_404(db, order_id, current_user)
+    if order.status not in CANCELLABLE_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Order cannot be cancelled once {order.status}"
+        )
+
+    if not await change_order_status(db, order.id, order.status, OrderStatus.CANCELLED.value):
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Order was updated by another request, please retry"
+        )
+    released = await release_stock(db, order_quantities((item.product_id, item.quantity) for item in order.items))
+    await db.commit()
+    apply_stock_levels(released)
     return {
-        "id": order_id,
-        "status": "cancelled",
+        "id": str(order_id),
+        "status": OrderStatus.CANCELLED.value,
         "message": "Order cancelled successfully"
     }
-
@@ -3,8 +3,36 @@ Users Routes - User management
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-router = APIRouter(prefix="/users", tags=["Users"])
+from db_models.user import User
+from utils.auth_cache import UserPrincipal
+from utils.deps import get_async_db, get_current_admin, get_current_user
+from utils.pagination import encode_cursor, decode_cursor, cursor_page
+from utils.responses import FastJSONRoute
+
+router = APIRouter(prefix="/users", tags=["Users"], route_class=FastJSONRoute)
+
+
+async def _get_user_or_404(db: AsyncSession, user_id: str) -> User:
+    """Load a user for writing, raising 404 if it does not exist."""
+    user = await db.get(User, int(user_id)) if user_id.isdigit() else None
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
+
+
+def _require_self_or_admin(current_user: UserPrincipal, user_id: str) -> None:
+    """Only let users change their own account, unless they are an admin."""
+    if current_user.role != "admin" and str(current_user.id) != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not allowed to modify this user"
+        )
 
 
 @router.get("/{user_id}")
@@ -20,24 +48,56 @@ async def get_user(user_id: str):
 
 
 @router.get("/")
-async def get_all_users(skip: int = 0, limit: int = 100):
-    """Get all users (admin only)."""
-    return []
+async def get_all_users(skip: int = 0, limit: int = 100, cursor: str = None,
+                        db: AsyncSession = Depends(get_async_db),
+                        admin=Depends(get_current_admin)):
+    """
+    Get all users (admin only).
+
+    Passing ``cursor`` (empty for the first page) switches to keyset
+    pagination on user ID: the response becomes ``{items, next_cursor}``
+    and ``skip`` is ignored.
+    """
+    query = select(User).order_by(User.id)
+
+    if cursor is None:
+        result = await db.execute(query.offset(skip).limit(limit))
+        return [user.to_dict() for user in result.scalars()]
+
+    after = decode_cursor(cursor, int)
+    if after:
+        query = query.where(User.id > after[0])
+    users = (await db.execute(query.limit(limit + 1))).scalars().all()
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor(users[-1].id)
+    return cursor_page([user.to_dict() for user in users], next_cursor)
 
 
 @router.put("/{user_id}")
-async def update_user(user_id: str, name: str = None, email: str = None):
-    """Update user information."""
-    return {
-        "id": user_id,
-        "name": name or "User",
-        "email": email or "user@example.com",
-        "message": "User updated successfully"
-    }
+async def update_user(user_id: str, name: str = None, email: str = None,
+                      db: AsyncSession = Depends(get_async_db),
+                      current_user: UserPrincipal = Depends(get_current_user)):
+    """Update user information (the user themselves or an admin)."""
+    _require_self_or_admin(current_user, user_id)
+    user = await _get_user_or_404(db, user_id)
+    if name is not None:
+        user.name = name
+    if email is not None:
+        user.email = email
+    # Committing invalidates the user's cached auth principal
+    await db.commit()
+    await db.refresh(user)
+    return {**user.to_dict(), "message": "User updated successfully"}
 
 
 @router.delete("/{user_id}")
-async def delete_user(user_id: str):
-    """Delete a user (admin only)."""
+async def delete_user(user_id: str, db: AsyncSession = Depends(get_async_db),
+                      current_user: UserPrincipal = Depends(get_current_user)):
+    """Delete a user (the user themselves or an admin)."""
+    _require_self_or_admin(current_user, user_id)
+    user = await _get_user_or_404(db, user_id)
+    await db.delete(user)
+    await db.commit()
     return {"message": f"User {user_id} deleted successfully"}
-
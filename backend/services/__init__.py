@@ -0,0 +1,61 @@
+"""
+Wonderland Toy Store - Services Package
+"""
+
+from services.catalog import (
+    CatalogSnapshot,
+    get_catalog_snapshot,
+    get_catalog_version,
+    bump_catalog_version,
+    apply_stock_levels
+)
+from services.search import (
+    ProductSearchIndex,
+    get_search_index,
+    index_product,
+    unindex_product,
+    invalidate_search_index
+)
+from services.analytics import (
+    SalesRollup,
+    get_sales_rollup,
+    invalidate_sales_rollup
+)
+from services.dashboard import (
+    DashboardStats,
+    get_dashboard_stats,
+    invalidate_dashboard_stats
+)
+from services.inventory import change_order_status, reserve_stock, release_stock
+from services.export import stream_catalog_export
+from services.validation import (
+    ValidationResult,
+    validate_product_data,
+    validate_products
+)
+
+__all__ = [
+    'CatalogSnapshot',
+    'get_catalog_snapshot',
+    'get_catalog_version',
+    'bump_catalog_version',
+    'apply_stock_levels',
+    'ProductSearchIndex',
+    'get_search_index',
+    'index_product',
+    'unindex_product',
+    'invalidate_search_index',
+    'SalesRollup',
+    'get_sales_rollup',
+    'invalidate_sales_rollup',
+    'DashboardStats',
+    'get_dashboard_stats',
+    'invalidate_dashboard_stats',
+    'change_order_status',
+    'reserve_stock',
+    'release_stock',
+    'stream_catalog_export',
+    'ValidationResult',
+    'validate_product_data',
+    'validate_products'
+]
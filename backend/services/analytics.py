@@ -0,0 +1,471 @@
+"""
+Sales Analytics - Time-bucketed rollups of orders, revenue and units sold
+
+Answering "sales this month" from ``orders`` and ``order_items`` directly
+means scanning every line item in the window on each request. Instead sales
+are rolled up into hourly, daily and monthly buckets, loaded once with
+grouped queries and then kept current from committed order changes, the
+same way as the dashboard stats. A period is answered by summing at most a
+few dozen buckets, and ``topProducts`` is taken with a bounded heap over
+the per-product totals of those buckets.
+
+Cancelled orders are excluded from every figure.
+"""
+
+import heapq
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db_models.order import Order, OrderItem, OrderStatus
+from utils.snapshots import CommittedChanges, SharedSnapshot, resyncing_snapshot
+
+
+HOUR = "hour"
+DAY = "day"
+MONTH = "month"
+
+# Bucket granularity and number of buckets (ending with the current one)
+# that answer each period
+PERIODS = {
+    "day": (HOUR, 24),
+    "week": (DAY, 7),
+    "month": (DAY, 30),
+    "year": (MONTH, 12),
+}
+
+# How far back each granularity is kept; monthly buckets are kept forever
+RETENTION = {
+    HOUR: timedelta(days=7),
+    DAY: timedelta(days=400),
+}
+
+# Number of products returned in topProducts
+TOP_PRODUCTS_LIMIT = 10
+
+# Seconds before the rollups are reloaded from the database
+ANALYTICS_RESYNC_SECONDS = float(os.getenv("ANALYTICS_RESYNC_SECONDS", "3600"))
+
+_CANCELLED = OrderStatus.CANCELLED.value
+
+# Order line: (product_id, quantity, price, product_name)
+OrderLine = Tuple[int, int, float, Optional[str]]
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    """
+    Truncate a timestamp to the start of its bucket.
+
+    Args:
+        moment: Timestamp (naive UTC, like the order timestamps)
+        granularity: HOUR, DAY or MONTH
+
+    Returns:
+        datetime: Start of the bucket containing moment
+    """
+    if granularity == HOUR:
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == DAY:
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _previous_bucket(start: datetime, granularity: str) -> datetime:
+    """Get the start of the bucket before the one starting at start."""
+    if granularity == HOUR:
+        return start - timedelta(hours=1)
+    if granularity == DAY:
+        return start - timedelta(days=1)
+    return (start - timedelta(days=1)).replace(day=1)
+
+
+class SalesBucket:
+    """Sales totals for one time bucket."""
+
+    __slots__ = ("orders", "revenue", "units", "products")
+
+    def __init__(self):
+        self.orders = 0
+        self.revenue = 0.0
+        self.units = 0
+        # product_id -> [units, revenue]
+        self.products: Dict[int, List[float]] = {}
+
+    def add_product(self, product_id: int, units: int, revenue: float) -> None:
+        """Add (or with negative values, remove) units of a product."""
+        totals = self.products.setdefault(product_id, [0, 0.0])
+        totals[0] += units
+        totals[1] += revenue
+        self.units += units
+        if totals[0] <= 0:
+            del self.products[product_id]
+
+
+class SalesRollup:
+    """
+    Hourly, daily and monthly sales buckets.
+
+    Every order is counted once per granularity, so any period can be read
+    from the coarsest granularity that resolves it.
+    """
+
+    def __init__(self):
+        """Initialize empty rollups."""
+        self.buckets: Dict[str, Dict[datetime, SalesBucket]] = {HOUR: {}, DAY: {}, MONTH: {}}
+        self.product_names: Dict[int, str] = {}
+        self.loaded_at = time.monotonic()
+        self.stale = False
+        self._lock = threading.Lock()
+
+    def _bucket(self, granularity: str, start: datetime) -> SalesBucket:
+        """Get or create a bucket; caller must hold the lock."""
+        buckets = self.buckets[granularity]
+        bucket = buckets.get(start)
+        if bucket is None:
+            bucket = buckets[start] = SalesBucket()
+            self._prune(granularity, start)
+        return bucket
+
+    def _prune(self, granularity: str, newest: datetime) -> None:
+        """Drop buckets past their retention; caller must hold the lock."""
+        retention = RETENTION.get(granularity)
+        if retention is None:
+            return
+        cutoff = newest - retention
+        buckets = self.buckets[granularity]
+        for start in [start for start in buckets if start < cutoff]:
+            del buckets[start]
+
+    def record_order(self, created_at: datetime, amount: float,
+                     lines: List[OrderLine], sign: int = 1) -> None:
+        """
+        Count an order in (sign=1) or out of (sign=-1) the rollups.
+
+        Args:
+            created_at: Order creation timestamp
+            amount: Order total
+            lines: The order's lines
+            sign: 1 to add the order, -1 to remove it
+        """
+        now = datetime.utcnow()
+        with self._lock:
+            for granularity in self.buckets:
+                start = bucket_start(created_at, granularity)
+                retention = RETENTION.get(granularity)
+                if retention is not None and start < bucket_start(now, granularity) - retention:
+                    continue
+                bucket = self._bucket(granularity, start)
+                bucket.orders += sign
+                bucket.revenue += sign * (amount or 0.0)
+                for product_id, quantity, price, _ in lines:
+                    bucket.add_product(product_id, sign * quantity, sign * quantity * price)
+            for product_id, _, _, name in lines:
+                if name:
+                    self.product_names[product_id] = name
+
+    def summarize(self, period: str, now: Optional[datetime] = None,
+                  top: int = TOP_PRODUCTS_LIMIT) -> dict:
+        """
+        Build the analytics response for a period.
+
+        Args:
+            period: One of PERIODS
+            now: End of the period (defaults to the current UTC time)
+            top: Number of products to return in topProducts
+
+        Returns:
+            dict: Totals, per-bucket series and top products for the period
+        """
+        granularity, count = PERIODS[period]
+        start = bucket_start(now or datetime.utcnow(), granularity)
+        starts = [start]
+        for _ in range(count - 1):
+            starts.append(_previous_bucket(starts[-1], granularity))
+        starts.reverse()
+
+        with self._lock:
+            buckets = self.buckets[granularity]
+            series = []
+            products: Dict[int, List[float]] = {}
+            for bucket_time in starts:
+                bucket = buckets.get(bucket_time)
+                if bucket is None:
+                    series.append({"start": bucket_time.isoformat(), "orders": 0, "revenue": 0.0, "sales": 0})
+                    continue
+                series.append({
+                    "start": bucket_time.isoformat(),
+                    "orders": bucket.orders,
+                    "revenue": round(bucket.revenue, 2),
+                    "sales": bucket.units
+                })
+                for product_id, (units, revenue) in bucket.products.items():
+                    totals = products.get(product_id)
+                    if totals is None:
+                        products[product_id] = [units, revenue]
+                    else:
+                        totals[0] += units
+                        totals[1] += revenue
+            top_products = heapq.nlargest(top, products.items(), key=lambda item: item[1][0])
+            names = self.product_names
+
+            return {
+                "period": period,
+                "granularity": granularity,
+                "sales": sum(point["sales"] for point in series),
+                "orders": sum(point["orders"] for point in series),
+                "revenue": round(sum(point["revenue"] for point in series), 2),
+                "series": series,
+                "topProducts": [
+                    {
+                        "productId": str(product_id),
+                        "name": names.get(product_id),
+                        "unitsSold": units,
+                        "revenue": round(revenue, 2)
+                    }
+                    for product_id, (units, revenue) in top_products
+                ]
+            }
+
+    def is_fresh(self) -> bool:
+        """Check whether the rollups can be served without a reload."""
+        return not self.stale and time.monotonic() - self.loaded_at < ANALYTICS_RESYNC_SECONDS
+
+
+def _truncate(column, granularity: str, dialect: str):
+    """Build a SQL expression truncating a timestamp column to its bucket."""
+    if dialect == "sqlite":
+        formats = {HOUR: "%Y-%m-%d %H:00:00", DAY: "%Y-%m-%d 00:00:00", MONTH: "%Y-%m-01 00:00:00"}
+        return func.strftime(formats[granularity], column)
+    return func.date_trunc(granularity, column)
+
+
+def _as_datetime(value) -> datetime:
+    """Normalize a truncated bucket value (string on SQLite) to a datetime."""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value.replace(tzinfo=None)
+
+
+def _rollup_queries(dialect: str, now: datetime):
+    """Build the grouped order and line item statements for each granularity."""
+    statements = []
+    for granularity in (HOUR, DAY, MONTH):
+        bucket = _truncate(Order.created_at, granularity, dialect).label("bucket")
+        conditions = [Order.status != _CANCELLED]
+        if granularity in RETENTION:
+            conditions.append(
+                Order.created_at >= bucket_start(now, granularity) - RETENTION[granularity]
+            )
+        orders = (
+            select(bucket, func.count(Order.id), func.coalesce(func.sum(Order.total_amount), 0.0))
+            .where(*conditions)
+            .group_by(bucket)
+        )
+        lines = (
+            select(
+                bucket,
+                OrderItem.product_id,
+                func.sum(OrderItem.quantity),
+                func.sum(OrderItem.quantity * OrderItem.price),
+                func.max(OrderItem.product_name)
+            )
+            .join(Order, OrderItem.order_id == Order.id)
+            .where(*conditions)
+            .group_by(bucket, OrderItem.product_id)
+        )
+        statements.append((granularity, orders, lines))
+    return statements
+
+
+def _fill_rollup(rollup: SalesRollup, granularity: str, order_rows, line_rows) -> None:
+    """Populate one granularity of a rollup from grouped query results."""
+    buckets = rollup.buckets[granularity]
+    for bucket_value, orders, revenue in order_rows:
+        bucket = buckets.setdefault(_as_datetime(bucket_value), SalesBucket())
+        bucket.orders = orders
+        bucket.revenue = float(revenue)
+    for bucket_value, product_id, units, revenue, name in line_rows:
+        bucket = buckets.setdefault(_as_datetime(bucket_value), SalesBucket())
+        bucket.add_product(product_id, int(units), float(revenue or 0.0))
+        if name:
+            rollup.product_names[product_id] = name
+
+
+def load_sales_rollup(db: Session) -> SalesRollup:
+    """
+    Build the rollups from the database.
+
+    Args:
+        db: Database session
+
+    Returns:
+        SalesRollup: The freshly loaded rollups
+    """
+    rollup = SalesRollup()
+    dialect = db.get_bind().dialect.name
+    for granularity, orders, lines in _rollup_queries(dialect, datetime.utcnow()):
+        _fill_rollup(rollup, granularity, db.execute(orders).all(), db.execute(lines).all())
+    return rollup
+
+
+# Reloaded when stale or past ANALYTICS_RESYNC_SECONDS; the generation
+# advances on every applied commit
+_sales: SharedSnapshot[SalesRollup] = resyncing_snapshot()
+
+
+def get_sales_rollup(db: Session) -> SalesRollup:
+    """
+    Get the sales rollups, loading them on first use or after a resync.
+
+    Args:
+        db: Database session used only when a reload is needed
+
+    Returns:
+        SalesRollup: The current rollups
+    """
+    return _sales.get(lambda generation: load_sales_rollup(db))
+
+
+async def get_sales_rollup_async(db: AsyncSession) -> SalesRollup:
+    """
+    Async variant of get_sales_rollup for route handlers.
+
+    Args:
+        db: Async database session used only when a reload is needed
+
+    Returns:
+        SalesRollup: The current rollups
+    """
+    async def load(generation: int) -> SalesRollup:
+        rollup = SalesRollup()
+        dialect = db.get_bind().dialect.name
+        for granularity, orders, lines in _rollup_queries(dialect, datetime.utcnow()):
+            _fill_rollup(
+                rollup, granularity,
+                (await db.execute(orders)).all(),
+                (await db.execute(lines)).all()
+            )
+        return rollup
+
+    return await _sales.get_async(load)
+
+
+def invalidate_sales_rollup() -> None:
+    """Force the next read to reload the rollups from the database."""
+    rollup = _sales.value
+    if rollup is not None:
+        rollup.stale = True
+
+
+def _order_lines(state) -> Optional[List[OrderLine]]:
+    """Get an order's lines from its loaded items, or None if not loaded."""
+    items = state.dict.get("items")
+    if items is None:
+        return None
+    return [
+        (item.product_id, item.quantity or 0, item.price or 0.0, item.product_name)
+        for item in items
+    ]
+
+
+def _previous(state, key: str):
+    """Get an attribute's value from before the flush, or None if unknown."""
+    history = state.attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return state.dict.get(key)
+
+
+def _collect_order(changes: list, order: Order, change: str) -> bool:
+    """
+    Turn an order insert, update or delete into rollup changes.
+
+    Returns:
+        bool: False if the change could not be resolved from loaded state
+    """
+    state = inspect(order)
+    created_at = state.dict.get("created_at")
+    if created_at is None:
+        return False
+
+    if change == "new":
+        if state.dict.get("status") == _CANCELLED:
+            return True
+        lines = _order_lines(state)
+        if lines is None:
+            return False
+        changes.append((created_at, state.dict.get("total_amount"), lines, 1))
+        return True
+
+    if change == "deleted":
+        was_counted = _previous(state, "status") != _CANCELLED
+        if was_counted:
+            lines = _order_lines(state)
+            if lines is None:
+                return False
+            changes.append((created_at, _previous(state, "total_amount"), lines, -1))
+        return True
+
+    status_history = state.attrs.status.history
+    amount_history = state.attrs.total_amount.history
+    if not (status_history.has_changes() or amount_history.has_changes()):
+        return True
+    was_counted = _previous(state, "status") != _CANCELLED
+    is_counted = state.dict.get("status") != _CANCELLED
+    if was_counted == is_counted and not amount_history.has_changes():
+        return True
+    lines = _order_lines(state)
+    if lines is None:
+        return False
+    if was_counted:
+        changes.append((created_at, _previous(state, "total_amount"), lines, -1))
+    if is_counted:
+        changes.append((created_at, state.dict.get("total_amount"), lines, 1))
+    return True
+
+
+def _new_sales_changes() -> dict:
+    return {"orders": [], "stale": False}
+
+
+def _collect_sales_changes(session: Session, pending: dict) -> None:
+    """Turn a flush's order changes into rollup changes."""
+    # Orders whose lines are accounted for along with the order itself
+    whole_orders = {id(instance) for instance in list(session.new) + list(session.deleted)
+                    if isinstance(instance, Order)}
+    for change, instances in (("new", session.new), ("dirty", session.dirty),
+                              ("deleted", session.deleted)):
+        for instance in instances:
+            if isinstance(instance, Order):
+                if not _collect_order(pending["orders"], instance, change):
+                    pending["stale"] = True
+            elif isinstance(instance, OrderItem):
+                # Line items changed on an existing order are not folded in
+                if id(inspect(instance).dict.get("order")) not in whole_orders:
+                    pending["stale"] = True
+
+
+def _apply_sales_changes(pending: dict) -> None:
+    """Apply a committed transaction's rollup changes."""
+    if not (pending["orders"] or pending["stale"]):
+        return
+    _, rollup = _sales.advance()
+    if rollup is None:
+        return
+    if pending["stale"]:
+        rollup.stale = True
+    for created_at, amount, lines, sign in pending["orders"]:
+        rollup.record_order(created_at, amount, lines, sign)
+
+
+_changes = CommittedChanges("analytics_changes", _new_sales_changes, _collect_sales_changes, _apply_sales_changes)
@@ -0,0 +1,382 @@
+"""
+Catalog Snapshot - Versioned, pre-serialized in-memory view of the product catalog
+
+The catalog listing is read far more often than it is written, so instead of
+querying ``products`` and serializing every row on every request, the whole
+catalog is serialized once into an immutable snapshot. Product writes
+bump the catalog version; the next read notices the version change and
+rebuilds the snapshot. Orders only change stock levels, so those are patched
+into a copy of the snapshot instead, and only the cached responses that
+contain the affected products are dropped.
+
+Writes made by other processes (other API workers, import_catalog.py,
+seed_data.py) cannot bump this process's version, so every
+``CATALOG_SYNC_SECONDS`` a read also compares a cheap fingerprint of the
+products table (row count, highest ID, latest update) with the one taken
+when the snapshot was built, and rebuilds the snapshot and the search index
+when it differs.
+"""
+
+import bisect
+import copy
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db_models.product import DBProduct, PRODUCT_LISTING_COLUMNS, product_row_to_dict
+from services.search import invalidate_search_index
+from utils.response_cache import catalog_response_cache
+from utils.snapshots import SharedSnapshot
+
+
+# Page size the frontend requests by default; these pages are prebuilt
+DEFAULT_PAGE_SIZE = 100
+
+# Upper bound on lazily cached non-default pages per snapshot
+MAX_CACHED_PAGES = 1024
+
+# Seconds between checks for product writes made by other processes; 0
+# checks on every read and a negative value disables the check (only safe
+# with a single process writing products)
+CATALOG_SYNC_SECONDS = float(os.getenv("CATALOG_SYNC_SECONDS", "5"))
+
+
+class CatalogSnapshot:
+    """
+    Immutable, pre-serialized view of the catalog at a given version.
+
+    Product dicts are shared between the id index, the category lists and
+    the cached pages, so callers must treat them as read-only.
+
+    Attributes:
+        version (int): Catalog version the snapshot was built from
+        fingerprint (tuple): products table fingerprint taken before the
+            products were read, or None if unknown
+    """
+
+    def __init__(self, version: int, products: List[dict], fingerprint: Optional[tuple] = None):
+        """
+        Build the snapshot indexes from serialized products.
+
+        Args:
+            version: Catalog version the products were read at
+            products: Product dicts as produced by DBProduct.to_dict()
+            fingerprint: Result of the fingerprint query, taken first
+        """
+        self.version = version
+        self.fingerprint = fingerprint
+        self._by_id: Dict[str, dict] = {p["id"]: p for p in products}
+
+        by_category: Dict[Optional[str], List[dict]] = {None: products}
+        for product in products:
+            by_category.setdefault(product["category"], []).append(product)
+        self._by_category: Dict[Optional[str], Tuple[dict, ...]] = {
+            category: tuple(items) for category, items in by_category.items()
+        }
+        # Sorted integer IDs per category, for keyset (cursor) pagination
+        self._ids_by_category: Dict[Optional[str], List[int]] = {
+            category: [int(p["id"]) for p in items]
+            for category, items in self._by_category.items()
+        }
+
+        # Prebuild the default pages for every category (None = all products)
+        self._pages: Dict[Tuple[Optional[str], int, int], List[dict]] = {}
+        for category, items in self._by_category.items():
+            for skip in range(0, max(len(items), 1), DEFAULT_PAGE_SIZE):
+                self._pages[(category, skip, DEFAULT_PAGE_SIZE)] = list(
+                    items[skip:skip + DEFAULT_PAGE_SIZE]
+                )
+        self._pages_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get_page(self, category: Optional[str] = None, skip: int = 0,
+                 limit: int = DEFAULT_PAGE_SIZE) -> List[dict]:
+        """
+        Get a page of serialized products.
+
+        Args:
+            category: Category to filter by, or None for all products
+            skip: Number of products to skip
+            limit: Maximum number of products to return
+
+        Returns:
+            List of product dicts
+        """
+        key = (category, skip, limit)
+        page = self._pages.get(key)
+        if page is not None:
+            return page
+
+        page = list(self._by_category.get(category, ())[skip:skip + limit])
+        with self._pages_lock:
+            if len(self._pages) < MAX_CACHED_PAGES:
+                self._pages[key] = page
+        return page
+
+    def get_page_after(self, category: Optional[str] = None, after_id: Optional[int] = None,
+                       limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[dict], Optional[int]]:
+        """
+        Get the page of serialized products that follows a product ID.
+
+        Args:
+            category: Category to filter by, or None for all products
+            after_id: ID of the last product on the previous page, or None
+            limit: Maximum number of products to return
+
+        Returns:
+            tuple: (products, ID to continue after or None on the last page)
+        """
+        ids = self._ids_by_category.get(category, [])
+        start = 0 if after_id is None else bisect.bisect_right(ids, after_id)
+        if start == 0:
+            page = self.get_page(category, 0, limit)
+        else:
+            page = list(self._by_category[category][start:start + limit])
+        has_more = start + limit < len(ids)
+        return page, (int(page[-1]["id"]) if has_more and page else None)
+
+    def get_product(self, product_id: str) -> Optional[dict]:
+        """Get a single serialized product by ID."""
+        return self._by_id.get(str(product_id))
+
+    def get_category(self, category: Optional[str] = None) -> Tuple[dict, ...]:
+        """Get every serialized product in a category (None for all)."""
+        return self._by_category.get(category, ())
+
+    def with_stock_levels(self, version: int, levels: Dict[str, tuple],
+                          fingerprint: Optional[tuple]) -> "CatalogSnapshot":
+        """
+        Copy the snapshot with new stock levels for a few products.
+
+        Only the changed product dicts and the category tuples and default
+        pages holding them are rebuilt; everything else is shared with this
+        snapshot. Lazily cached non-default pages are not carried over.
+
+        Args:
+            version: Catalog version of the copy
+            levels: product ID -> (quantity, updated_at)
+            fingerprint: products table fingerprint after the change
+
+        Returns:
+            CatalogSnapshot: The patched copy
+        """
+        patched = copy.copy(self)
+        patched.version = version
+        patched.fingerprint = fingerprint
+        patched._by_id = dict(self._by_id)
+        patched._by_category = dict(self._by_category)
+        patched._pages = {
+            key: page for key, page in self._pages.items()
+            if key[2] == DEFAULT_PAGE_SIZE and key[1] % DEFAULT_PAGE_SIZE == 0
+        }
+        patched._pages_lock = threading.Lock()
+
+        positions: Dict[Optional[str], Dict[int, dict]] = {}
+        for product_id, (quantity, updated_at) in levels.items():
+            product = self._by_id.get(product_id)
+            if product is None:
+                continue
+            product = patched._by_id[product_id] = {
+                **product,
+                "quantity": quantity,
+                "in_stock": quantity is not None and quantity > 0,
+                "updated_at": updated_at,
+            }
+            for category in (None, product["category"]):
+                index = bisect.bisect_left(self._ids_by_category[category], int(product_id))
+                positions.setdefault(category, {})[index] = product
+
+        for category, changed in positions.items():
+            items = list(self._by_category[category])
+            for index, product in changed.items():
+                items[index] = product
+            items = patched._by_category[category] = tuple(items)
+            for skip in {index - index % DEFAULT_PAGE_SIZE for index in changed}:
+                patched._pages[(category, skip, DEFAULT_PAGE_SIZE)] = list(
+                    items[skip:skip + DEFAULT_PAGE_SIZE]
+                )
+        return patched
+
+
+def _snapshot_is_current(snapshot: CatalogSnapshot, version: int) -> bool:
+    return snapshot.version == version
+
+
+def _newer_than_installed(snapshot: CatalogSnapshot, raced: bool) -> bool:
+    """Install a snapshot unless a newer one is already installed."""
+    installed = _catalog.value
+    return installed is None or snapshot.version >= installed.version
+
+
+# The snapshot's generation is the catalog version
+_catalog: SharedSnapshot[CatalogSnapshot] = SharedSnapshot(
+    is_current=_snapshot_is_current, on_install=_newer_than_installed
+)
+
+
+def get_catalog_version() -> int:
+    """Get the current catalog version."""
+    return _catalog.generation
+
+
+def bump_catalog_version() -> int:
+    """
+    Mark the catalog as changed. Must be called after every committed
+    product write so the next read rebuilds the snapshot.
+
+    Returns:
+        int: The new catalog version
+    """
+    version, _ = _catalog.advance()
+    return version
+
+
+def apply_stock_levels(rows: Iterable) -> int:
+    """
+    Patch committed stock changes into the catalog. Must be called after
+    committing reserve_stock/release_stock, in place of bump_catalog_version.
+
+    If the installed snapshot is current it is replaced by a copy holding
+    the new levels, and the cached responses that do not contain the
+    changed products are carried over to the new version. Otherwise the
+    version is simply bumped, as a rebuild is due anyway.
+
+    Args:
+        rows: Rows with id, quantity and updated_at of the changed products
+
+    Returns:
+        int: The new catalog version
+    """
+    levels = {str(row.id): (row.quantity, row.updated_at) for row in rows}
+
+    def patch(snapshot: CatalogSnapshot, version: int) -> Optional[CatalogSnapshot]:
+        if snapshot.version != version - 1:
+            return None
+        # Runs under the snapshot lock, so no reader can see the new version
+        # before the response cache has been moved to it
+        catalog_response_cache.carry_forward(snapshot.version, version, levels)
+        return snapshot.with_stock_levels(version, levels, _advance_fingerprint(snapshot.fingerprint, levels))
+
+    version, _ = _catalog.advance(patch=patch)
+    return version
+
+
+# Monotonic time of the last fingerprint check
+_synced_at = 0.0
+
+
+def _listing_query():
+    """Select every product as plain column rows, in ID order."""
+    return select(*PRODUCT_LISTING_COLUMNS).order_by(PRODUCT_LISTING_COLUMNS[0])
+
+
+def _fingerprint_query():
+    """Select the row count, highest ID and latest update of the products table."""
+    return select(func.count(DBProduct.id), func.max(DBProduct.id), func.max(DBProduct.updated_at))
+
+
+def _mark_synced() -> None:
+    """Record that the products table was just read."""
+    global _synced_at
+    _synced_at = time.monotonic()
+
+
+def _sync_due() -> bool:
+    """Check whether a read should look for writes by other processes."""
+    global _synced_at
+    if CATALOG_SYNC_SECONDS < 0:
+        return False
+    now = time.monotonic()
+    if now - _synced_at < CATALOG_SYNC_SECONDS:
+        return False
+    # Claimed before querying, so a burst of readers runs one check
+    _synced_at = now
+    return True
+
+
+def _advance_fingerprint(fingerprint: Optional[tuple], levels: Dict[str, tuple]) -> Optional[tuple]:
+    """Fingerprint after this process updated existing products, so the update
+    is not mistaken for a write by another process."""
+    if fingerprint is None:
+        return None
+    count, max_id, max_updated_at = fingerprint
+    updated = [updated_at for _, updated_at in levels.values() if updated_at is not None]
+    if max_updated_at is not None:
+        updated.append(max_updated_at)
+    return count, max_id, max(updated, default=None)
+
+
+def _check_fingerprint(snapshot: CatalogSnapshot, fingerprint: tuple) -> None:
+    """Drop the snapshot and search index if another process changed products."""
+    if tuple(fingerprint) != snapshot.fingerprint and snapshot.version == _catalog.generation:
+        bump_catalog_version()
+        invalidate_search_index()
+
+
+def build_catalog_snapshot(db: Session, version: int) -> CatalogSnapshot:
+    """
+    Read every product from the database and serialize it into a snapshot.
+
+    Args:
+        db: Database session
+        version: Catalog version to stamp on the snapshot
+
+    Returns:
+        CatalogSnapshot: The freshly built snapshot
+    """
+    fingerprint = tuple(db.execute(_fingerprint_query()).one())
+    _mark_synced()
+    result = db.execute(_listing_query())
+    return CatalogSnapshot(version, list(map(product_row_to_dict, result)), fingerprint)
+
+
+def get_catalog_snapshot(db: Session) -> CatalogSnapshot:
+    """
+    Get the snapshot for the current catalog version, rebuilding it if a
+    product write has bumped the version since it was built, or if another
+    process has changed the products table. A write that lands mid-build
+    bumps the version again, so the snapshot is simply rebuilt on the
+    following read.
+
+    Args:
+        db: Database session used only when a check or rebuild is needed
+
+    Returns:
+        CatalogSnapshot: Snapshot matching the current catalog version
+    """
+    snapshot = _catalog.current()
+    if snapshot is not None and _sync_due():
+        _check_fingerprint(snapshot, db.execute(_fingerprint_query()).one())
+    return _catalog.get(lambda version: build_catalog_snapshot(db, version))
+
+
+async def get_catalog_snapshot_async(db: AsyncSession) -> CatalogSnapshot:
+    """
+    Async variant of get_catalog_snapshot for route handlers.
+
+    Args:
+        db: Async database session used only when a check or rebuild is needed
+
+    Returns:
+        CatalogSnapshot: Snapshot matching the current catalog version
+    """
+    snapshot = _catalog.current()
+    if snapshot is not None and _sync_due():
+        _check_fingerprint(snapshot, (await db.execute(_fingerprint_query())).one())
+
+    async def load(version: int) -> CatalogSnapshot:
+        fingerprint = tuple((await db.execute(_fingerprint_query())).one())
+        _mark_synced()
+        result = await db.execute(_listing_query())
+        return CatalogSnapshot(version, list(map(product_row_to_dict, result)), fingerprint)
+
+    return await _catalog.get_async(load)
@@ -0,0 +1,424 @@
+"""
+Dashboard Stats - Incrementally maintained aggregates for the admin dashboard
+
+Computing the dashboard live means counting and summing over ``orders``,
+``products`` and ``users`` on every admin page load. Instead the totals are
+loaded once and then kept current from the ORM unit of work: every committed
+flush that adds, changes or deletes an order, product or user is folded into
+the in-memory summary, so the dashboard is served without touching the
+database. A periodic resync corrects drift from writes made outside the ORM
+or by other processes.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db_models.order import Order, OrderStatus
+from db_models.product import DBProduct
+from db_models.user import User
+from utils.snapshots import CommittedChanges, SharedSnapshot, resyncing_snapshot
+
+
+# Products with fewer units than this are reported as low stock
+LOW_STOCK_THRESHOLD = int(os.getenv("LOW_STOCK_THRESHOLD", "10"))
+
+# Maximum entries returned in recentOrders / lowStockProducts
+RECENT_ORDERS_LIMIT = 10
+LOW_STOCK_LIMIT = 20
+
+# Seconds before the summary is reloaded from the database
+DASHBOARD_RESYNC_SECONDS = float(os.getenv("DASHBOARD_RESYNC_SECONDS", "300"))
+
+# Orders whose amount counts towards totalRevenue
+REVENUE_STATUSES = frozenset({OrderStatus.DELIVERED.value})
+
+_MISSING = object()
+
+
+def _order_summary(values: dict) -> dict:
+    """Build the recentOrders entry for an order."""
+    created_at = values.get("created_at")
+    return {
+        "id": str(values["id"]),
+        "orderNumber": values.get("order_number"),
+        "userId": str(values.get("user_id")),
+        "totalAmount": values.get("total_amount") or 0.0,
+        "status": values.get("status"),
+        "createdAt": created_at,
+        "_sort": (created_at.isoformat() if created_at else "", values["id"])
+    }
+
+
+def _low_stock_entry(product_id: int, name: Optional[str], quantity: int) -> dict:
+    """Build the lowStockProducts entry for a product."""
+    return {"id": str(product_id), "name": name, "quantity": quantity}
+
+
+class DashboardDelta:
+    """
+    Changes from one transaction, collected at flush time and applied to
+    the summary only once the transaction commits.
+    """
+
+    def __init__(self):
+        self.products = 0
+        self.users = 0
+        # status -> (order count, order amount)
+        self.orders: Dict[str, List[float]] = {}
+        self.recent_upserts: Dict[int, dict] = {}
+        self.recent_deletes: set = set()
+        # product_id -> (name, quantity), or None when deleted
+        self.stock: Dict[int, Optional[Tuple[Optional[str], int]]] = {}
+        # Set when a change could not be folded in; forces a reload
+        self.stale = False
+
+    def add_order(self, status: Optional[str], amount: float, sign: int = 1) -> None:
+        """Count an order in (sign=1) or out of (sign=-1) a status."""
+        totals = self.orders.setdefault(status, [0, 0.0])
+        totals[0] += sign
+        totals[1] += sign * (amount or 0.0)
+
+    def upsert_recent(self, order_id: int, summary: dict) -> None:
+        """Record a new order, or a change to one, for the recent orders list."""
+        existing = self.recent_upserts.get(order_id)
+        if existing is not None:
+            summary = {
+                **existing, **summary,
+                "_update_only": existing.get("_update_only") and summary.get("_update_only")
+            }
+        self.recent_upserts[order_id] = summary
+
+    def delete_recent(self, order_id: int) -> None:
+        """Record a deleted order for the recent orders list."""
+        self.recent_upserts.pop(order_id, None)
+        self.recent_deletes.add(order_id)
+
+    def __bool__(self) -> bool:
+        return bool(self.products or self.users or self.orders or self.recent_upserts
+                    or self.recent_deletes or self.stock or self.stale)
+
+
+class DashboardStats:
+    """
+    In-memory dashboard summary.
+
+    Counters are updated in O(1) per changed row; the serialized response
+    is cached and only rebuilt after a change.
+    """
+
+    def __init__(self, total_products: int, total_users: int,
+                 orders: Dict[str, List[float]], recent_orders: List[dict],
+                 low_stock: Dict[int, dict]):
+        """
+        Initialize the summary from freshly loaded totals.
+
+        Args:
+            total_products: Number of products
+            total_users: Number of users
+            orders: status -> [order count, order amount]
+            recent_orders: Newest order summaries, newest first
+            low_stock: product_id -> low stock entry
+        """
+        self.total_products = total_products
+        self.total_users = total_users
+        self.orders = orders
+        self.recent_orders = recent_orders
+        self.low_stock = low_stock
+        self.loaded_at = time.monotonic()
+        self.stale = False
+        self._response: Optional[dict] = None
+        self._lock = threading.Lock()
+
+    def apply(self, delta: DashboardDelta) -> None:
+        """
+        Fold a committed transaction's changes into the summary.
+
+        Args:
+            delta: Changes collected from the transaction's flushes
+        """
+        with self._lock:
+            self._response = None
+            if delta.stale:
+                self.stale = True
+            self.total_products += delta.products
+            self.total_users += delta.users
+            for status_value, (count, amount) in delta.orders.items():
+                totals = self.orders.setdefault(status_value, [0, 0.0])
+                totals[0] += count
+                totals[1] += amount
+
+            for product_id, stock in delta.stock.items():
+                if stock is None or stock[1] >= LOW_STOCK_THRESHOLD:
+                    self.low_stock.pop(product_id, None)
+                else:
+                    self.low_stock[product_id] = _low_stock_entry(product_id, *stock)
+
+            if delta.recent_upserts or delta.recent_deletes:
+                self._apply_recent(delta)
+
+    def _apply_recent(self, delta: DashboardDelta) -> None:
+        """Update the recent orders list; caller must hold the lock."""
+        recent = {int(order["id"]): order for order in self.recent_orders}
+        for order_id in delta.recent_deletes:
+            if recent.pop(order_id, None) is not None:
+                # An older order now belongs in the list; reload to find it
+                self.stale = True
+        for order_id, summary in delta.recent_upserts.items():
+            if order_id in recent or not summary.get("_update_only"):
+                recent[order_id] = {**recent.get(order_id, {}), **summary}
+        ordered = sorted(recent.values(), key=lambda order: order["_sort"], reverse=True)
+        self.recent_orders = ordered[:RECENT_ORDERS_LIMIT]
+
+    def is_fresh(self) -> bool:
+        """Check whether the summary can be served without a reload."""
+        return not self.stale and time.monotonic() - self.loaded_at < DASHBOARD_RESYNC_SECONDS
+
+    def to_dict(self) -> dict:
+        """
+        Get the dashboard response.
+
+        Returns:
+            dict: Dashboard statistics
+        """
+        response = self._response
+        if response is not None:
+            return response
+        with self._lock:
+            low_stock = sorted(
+                self.low_stock.values(), key=lambda p: (p["quantity"], int(p["id"]))
+            )
+            response = {
+                "totalProducts": self.total_products,
+                "totalOrders": sum(count for count, _ in self.orders.values()),
+                "pendingOrders": self.orders.get(OrderStatus.PENDING.value, [0, 0.0])[0],
+                "totalRevenue": round(sum(
+                    amount for status_value, (_, amount) in self.orders.items()
+                    if status_value in REVENUE_STATUSES
+                ), 2),
+                "totalUsers": self.total_users,
+                "recentOrders": [
+                    {key: value for key, value in order.items() if not key.startswith("_")}
+                    for order in self.recent_orders
+                ],
+                "lowStockProducts": low_stock[:LOW_STOCK_LIMIT],
+                "lowStockCount": len(low_stock)
+            }
+            self._response = response
+            return response
+
+
+# Reloaded when stale or past DASHBOARD_RESYNC_SECONDS; the generation
+# advances on every applied commit
+_dashboard: SharedSnapshot[DashboardStats] = resyncing_snapshot()
+
+
+_RECENT_ORDER_COLUMNS = (
+    Order.id, Order.order_number, Order.user_id, Order.total_amount,
+    Order.status, Order.created_at
+)
+
+
+def _summary_queries():
+    """Build the statements that load the dashboard totals."""
+    return (
+        select(func.count(DBProduct.id)),
+        select(func.count(User.id)),
+        select(Order.status, func.count(Order.id), func.coalesce(func.sum(Order.total_amount), 0.0))
+        .group_by(Order.status),
+        select(*_RECENT_ORDER_COLUMNS)
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(RECENT_ORDERS_LIMIT),
+        select(DBProduct.id, DBProduct.name, DBProduct.quantity)
+        .where(DBProduct.quantity < LOW_STOCK_THRESHOLD),
+    )
+
+
+def _build_stats(products, users, order_rows, recent_rows, low_stock_rows) -> DashboardStats:
+    """Assemble a summary from the results of the summary queries."""
+    return DashboardStats(
+        total_products=products,
+        total_users=users,
+        orders={status_value: [count, float(amount)] for status_value, count, amount in order_rows},
+        recent_orders=[_order_summary(row._asdict()) for row in recent_rows],
+        low_stock={
+            product_id: _low_stock_entry(product_id, name, quantity)
+            for product_id, name, quantity in low_stock_rows
+        }
+    )
+
+
+def load_dashboard_stats(db: Session) -> DashboardStats:
+    """
+    Compute the dashboard totals from the database.
+
+    Args:
+        db: Database session
+
+    Returns:
+        DashboardStats: The freshly loaded summary
+    """
+    products, users, orders, recent, low_stock = _summary_queries()
+    return _build_stats(
+        db.execute(products).scalar_one(),
+        db.execute(users).scalar_one(),
+        db.execute(orders).all(),
+        db.execute(recent).all(),
+        db.execute(low_stock).all()
+    )
+
+
+def get_dashboard_stats(db: Session) -> DashboardStats:
+    """
+    Get the dashboard summary, loading it on first use or after a resync.
+
+    Args:
+        db: Database session used only when a reload is needed
+
+    Returns:
+        DashboardStats: The current summary
+    """
+    return _dashboard.get(lambda generation: load_dashboard_stats(db))
+
+
+async def get_dashboard_stats_async(db: AsyncSession) -> DashboardStats:
+    """
+    Async variant of get_dashboard_stats for route handlers.
+
+    Args:
+        db: Async database session used only when a reload is needed
+
+    Returns:
+        DashboardStats: The current summary
+    """
+    async def load(generation: int) -> DashboardStats:
+        products, users, orders, recent, low_stock = _summary_queries()
+        return _build_stats(
+            (await db.execute(products)).scalar_one(),
+            (await db.execute(users)).scalar_one(),
+            (await db.execute(orders)).all(),
+            (await db.execute(recent)).all(),
+            (await db.execute(low_stock)).all()
+        )
+
+    return await _dashboard.get_async(load)
+
+
+def invalidate_dashboard_stats() -> None:
+    """Force the next read to reload the summary from the database."""
+    stats = _dashboard.value
+    if stats is not None:
+        stats.stale = True
+
+
+def stage_stock_levels(session: Session, rows) -> None:
+    """
+    Record product stock changed by a bulk UPDATE, which bypasses the ORM
+    flush events. Applied when the session commits.
+
+    Args:
+        session: Session (sync, or the sync_session of an AsyncSession)
+        rows: (product_id, name, quantity) rows as returned by the UPDATE
+    """
+    delta = _changes.pending(session)
+    for product_id, name, quantity in rows:
+        delta.stock[product_id] = (name, quantity)
+
+
+def _previous(state, key: str):
+    """Get an attribute's value from before the flush, or _MISSING."""
+    history = state.attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return state.dict.get(key, _MISSING)
+
+
+def _collect_order(delta: DashboardDelta, order: Order, change: str) -> None:
+    """Fold an order insert, update or delete into the delta."""
+    state = inspect(order)
+    values = state.dict
+    order_id = values.get("id")
+    if change == "new":
+        delta.add_order(values.get("status"), values.get("total_amount"))
+        delta.upsert_recent(order_id, _order_summary(values))
+        return
+    if change == "deleted":
+        status_value = _previous(state, "status")
+        amount = _previous(state, "total_amount")
+        if status_value is _MISSING or amount is _MISSING:
+            delta.stale = True
+            return
+        delta.add_order(status_value, amount, -1)
+        delta.delete_recent(order_id)
+        return
+
+    if not (state.attrs.status.history.has_changes()
+            or state.attrs.total_amount.history.has_changes()):
+        return
+    old_status = _previous(state, "status")
+    old_amount = _previous(state, "total_amount")
+    new_status = values.get("status", _MISSING)
+    new_amount = values.get("total_amount", _MISSING)
+    if _MISSING in (old_status, old_amount, new_status, new_amount):
+        delta.stale = True
+        return
+    delta.add_order(old_status, old_amount, -1)
+    delta.add_order(new_status, new_amount)
+    delta.upsert_recent(order_id, {
+        "status": new_status, "totalAmount": new_amount or 0.0, "_update_only": True
+    })
+
+
+def _collect_product(delta: DashboardDelta, product: DBProduct, change: str) -> None:
+    """Fold a product insert, update or delete into the delta."""
+    state = inspect(product)
+    product_id = state.dict.get("id")
+    if change == "deleted":
+        delta.products -= 1
+        delta.stock[product_id] = None
+        return
+    if change == "new":
+        delta.products += 1
+    elif not (state.attrs.quantity.history.has_changes()
+              or state.attrs.name.history.has_changes()):
+        return
+    quantity = state.dict.get("quantity", _MISSING)
+    if quantity is _MISSING:
+        delta.stale = True
+        return
+    delta.stock[product_id] = (state.dict.get("name"), quantity or 0)
+
+
+def _collect_dashboard_changes(session: Session, delta: DashboardDelta) -> None:
+    """Fold a flush's order, product and user changes into the delta."""
+    for change, instances in (("new", session.new), ("dirty", session.dirty),
+                              ("deleted", session.deleted)):
+        for instance in instances:
+            if isinstance(instance, Order):
+                _collect_order(delta, instance, change)
+            elif isinstance(instance, DBProduct):
+                _collect_product(delta, instance, change)
+            elif isinstance(instance, User) and change != "dirty":
+                delta.users += 1 if change == "new" else -1
+
+
+def _apply_dashboard_changes(delta: DashboardDelta) -> None:
+    """Fold a committed transaction's delta into the installed summary."""
+    if not delta:
+        return
+    _, stats = _dashboard.advance()
+    if stats is not None:
+        stats.apply(delta)
+
+
+_changes = CommittedChanges("dashboard_delta", DashboardDelta,
+                            _collect_dashboard_changes, _apply_dashboard_changes)
@@ -0,0 +1,219 @@
+"""
+Catalog Export - Streaming CSV and NDJSON export of the product catalog
+
+Products are read through a server-side cursor (``AsyncSession.stream`` with
+``yield_per``), turned into their domain model (ElectronicToy, PlushToy,
+BoardGame or plain Product) and written with the model's ``to_csv_row``.
+Output is produced in chunks of about ``EXPORT_CHUNK_BYTES``, so memory use
+is bounded by one fetch batch and one chunk whatever the catalog size.
+"""
+
+import csv
+import io
+import os
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Type
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db_models.product import DBProduct, PRODUCT_LISTING_COLUMNS
+from models import BoardGame, ElectronicToy, PlushToy, Product
+from utils.responses import dump_json
+
+
+# Rows fetched from the cursor per round trip
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+# Output is flushed to the client once a chunk reaches this size
+EXPORT_CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_BYTES", str(64 * 1024)))
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+# Domain model for each stored category
+CATEGORY_MODELS: Dict[str, Type[Product]] = {
+    "Electronic": ElectronicToy,
+    "Plush": PlushToy,
+    "BoardGame": BoardGame,
+}
+
+# Constructor argument per category column, with the category_attributes
+# keys it may be stored under (the seed data uses camelCase)
+_SPEC_KEYS = {
+    "battery_type": ("battery_type", "batteryType"),
+    "voltage": ("voltage",),
+    "material": ("material",),
+    "size": ("size",),
+    "age_range": ("age_range", "ageRange"),
+    "number_of_players": ("number_of_players", "numberOfPlayers"),
+}
+
+_BASE_HEADERS = Product.csv_headers()
+
+
+def _field_name(header: str) -> str:
+    """NDJSON key for a CSV header, e.g. 'Image URL' -> 'image_url'."""
+    return header.lower().replace(" ", "_")
+
+
+# Every base column followed by each category's own columns
+EXPORT_HEADERS: List[str] = _BASE_HEADERS + [
+    header
+    for model in CATEGORY_MODELS.values()
+    for header in model.csv_headers()[len(_BASE_HEADERS):]
+]
+_CATEGORY_HEADERS = EXPORT_HEADERS[len(_BASE_HEADERS):]
+
+
+def _layout(model: Type[Product]) -> Tuple[List[int], List[str]]:
+    """Export column positions and NDJSON keys of a model's CSV row."""
+    headers = model.csv_headers()
+    return [EXPORT_HEADERS.index(header) for header in headers], [_field_name(h) for h in headers]
+
+
+_LAYOUTS = {model: _layout(model) for model in (Product, *CATEGORY_MODELS.values())}
+
+
+def _spec(attributes: dict, name: str) -> Optional[str]:
+    """Read a category attribute under any of its stored key spellings."""
+    for key in _SPEC_KEYS[name]:
+        if attributes.get(key) is not None:
+            return str(attributes[key])
+    return None
+
+
+def row_to_model(row) -> Product:
+    """
+    Build the domain model for a PRODUCT_LISTING_COLUMNS row.
+
+    Rows whose stored specs fail the category model's validation, and rows
+    of unknown categories, become a plain Product.
+
+    Args:
+        row: Result row of select(*PRODUCT_LISTING_COLUMNS)
+
+    Returns:
+        Product: ElectronicToy, PlushToy, BoardGame or Product instance
+    """
+    (product_id, name, brand, price, quantity, description, image_url,
+     category, category_attributes, created_at, updated_at) = row
+    common = {
+        "id": product_id,
+        "name": name or "",
+        "brand": brand or "",
+        "price": price or 0,
+        "quantity": quantity or 0,
+        "description": description or "",
+        "image_url": image_url or "",
+        "created_at": created_at,
+        "updated_at": updated_at,
+    }
+    model = CATEGORY_MODELS.get(category)
+    if model is not None:
+        attributes = category_attributes or {}
+        specs = {
+            _field_name(header): _spec(attributes, _field_name(header))
+            for header in model.csv_headers()[len(_BASE_HEADERS):]
+        }
+        try:
+            return model(**common, **specs)
+        except ValueError:
+            pass
+    return Product(category=category or "", **common)
+
+
+def export_values(row) -> List:
+    """
+    Lay out one product as a row aligned with EXPORT_HEADERS.
+
+    Columns that do not apply to the product's category are empty. For rows
+    that fell back to a plain Product, stored category attributes are still
+    written to their columns.
+
+    Args:
+        row: Result row of select(*PRODUCT_LISTING_COLUMNS)
+
+    Returns:
+        list: CSV values
+    """
+    product = row_to_model(row)
+    positions, _ = _LAYOUTS[type(product)]
+    values = [""] * len(EXPORT_HEADERS)
+    for position, value in zip(positions, product.to_csv_row()):
+        values[position] = value
+    if type(product) is Product and row.category_attributes:
+        for offset, header in enumerate(_CATEGORY_HEADERS, start=len(_BASE_HEADERS)):
+            values[offset] = _spec(row.category_attributes, _field_name(header)) or ""
+    return values
+
+
+def export_record(row) -> dict:
+    """
+    Lay out one product as an NDJSON record keyed by snake_case field name.
+
+    Only the columns of the product's model are included.
+
+    Args:
+        row: Result row of select(*PRODUCT_LISTING_COLUMNS)
+
+    Returns:
+        dict: Product record
+    """
+    product = row_to_model(row)
+    _, keys = _LAYOUTS[type(product)]
+    return dict(zip(keys, product.to_csv_row()))
+
+
+async def _stream_rows(db: AsyncSession, category: Optional[str]) -> AsyncIterator[list]:
+    """Yield batches of catalog rows, in ID order, from a server-side cursor."""
+    query = select(*PRODUCT_LISTING_COLUMNS).order_by(DBProduct.id)
+    if category:
+        query = query.where(DBProduct.category == category)
+    result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    async for batch in result.partitions():
+        yield batch
+
+
+async def stream_catalog_export(db: AsyncSession, export_format: str = "csv",
+                                category: Optional[str] = None) -> AsyncIterator[bytes]:
+    """
+    Stream the catalog as CSV (with a header row) or NDJSON.
+
+    Args:
+        db: Async session, kept open until the stream is exhausted
+        export_format: "csv" or "ndjson"
+        category: Only export this category, if given
+
+    Yields:
+        bytes: Chunks of roughly EXPORT_CHUNK_BYTES
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    if export_format == "ndjson":
+        chunk = bytearray()
+        async for batch in _stream_rows(db, category):
+            for row in batch:
+                chunk += dump_json(export_record(row))
+                chunk += b"\n"
+                if len(chunk) >= EXPORT_CHUNK_BYTES:
+                    yield bytes(chunk)
+                    chunk.clear()
+        if chunk:
+            yield bytes(chunk)
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_HEADERS)
+    async for batch in _stream_rows(db, category):
+        for row in batch:
+            writer.writerow(export_values(row))
+            if buffer.tell() >= EXPORT_CHUNK_BYTES:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
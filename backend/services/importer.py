@@ -0,0 +1,276 @@
+"""
+Catalog Import - Bulk loading of products from CSV or NDJSON feeds
+
+Records are parsed from the feed one at a time, validated in chunks of
+``IMPORT_BATCH_SIZE`` by services.validation (the ElectronicToy, PlushToy
+and BoardGame rules, or the base Product rules for other categories), on a
+process pool for import_catalog.py and inline for API uploads, and every
+valid chunk is written with one batched INSERT.
+Invalid rows, and rows the database rejects, are reported individually
+with their per-field errors, without aborting the rest of the feed.
+Columns are matched loosely, so files produced by the catalog export and
+product dicts from the API both import as they are.
+"""
+
+import csv
+import io
+import json
+import os
+import re
+from collections import deque
+from datetime import datetime
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import SessionLocal
+from db_models.product import DBProduct
+from services.catalog import bump_catalog_version
+from services.dashboard import invalidate_dashboard_stats
+from services.search import invalidate_search_index
+from services.validation import PRODUCT_FIELDS, SPEC_FIELDS, VALIDATION_WORKERS, iter_validated
+
+
+# Rows validated per worker task and written per INSERT
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+# Validation processes; 0 or 1 validates in the importing thread
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", str(VALIDATION_WORKERS)))
+# Validation processes for uploads to the API. Inline by default: a process
+# pool per upload would compete with the server's own workers for the CPUs
+API_IMPORT_WORKERS = int(os.getenv("API_IMPORT_WORKERS", "1"))
+# Row errors kept for the report; the failed count covers all of them
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Stored category_attributes key for each spec field; keys match the
+# camelCase used by the seed data and the frontend
+CATEGORY_ATTRIBUTE_KEYS = {
+    "Electronic": {"battery_type": "batteryType", "voltage": "voltage"},
+    "Plush": {"material": "material", "size": "size"},
+    "BoardGame": {"age_range": "ageRange", "number_of_players": "numberOfPlayers"},
+}
+
+# Errors the database driver raises for a rejected row; sqlite3 raises a
+# bare OverflowError for integers wider than 64 bits
+_ROW_ERRORS = (SQLAlchemyError, OverflowError)
+
+# Record key marking a line that could not be parsed
+_PARSE_ERROR = "__error__"
+
+_KEY_PATTERN = re.compile(r"[^a-z0-9]")
+
+# Validation field name for each column name with case, spaces and
+# underscores dropped ('Image URL', 'image_url' and 'imageUrl' all match)
+_FIELD_NAMES = {
+    **{_KEY_PATTERN.sub("", field): field for field in PRODUCT_FIELDS + SPEC_FIELDS},
+    "image": "image_url",
+    "stock": "quantity",
+}
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    """
+    Guess the feed format from a file name.
+
+    Args:
+        filename: Uploaded or local file name
+
+    Returns:
+        str or None: "csv", "ndjson", or None if the extension is unknown
+    """
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".ndjson", ".jsonl"):
+        return "ndjson"
+    return None
+
+
+def iter_records(stream: IO[bytes], import_format: str) -> Iterator[Dict[str, Any]]:
+    """
+    Parse a binary feed into records without reading it all into memory.
+
+    Args:
+        stream: Binary file object
+        import_format: "csv" (with a header row) or "ndjson"
+
+    Yields:
+        dict: One record per row or line; malformed NDJSON lines yield a
+        record holding only the parse error
+    """
+    if import_format not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format: {import_format}")
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="" if import_format == "csv" else None)
+    if import_format == "csv":
+        yield from csv.DictReader(text)
+        return
+    for line in text:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield {_PARSE_ERROR: f"Invalid JSON: {exc}"}
+            continue
+        if not isinstance(record, dict):
+            yield {_PARSE_ERROR: "Each line must be a JSON object"}
+            continue
+        yield record
+
+
+def _normalize(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map record keys to validation field names, flattening a nested
+    categoryAttributes object. Unknown columns are dropped.
+    """
+    fields = {}
+    for key, value in record.items():
+        if isinstance(value, dict):
+            fields.update(_normalize(value))
+            continue
+        field = _FIELD_NAMES.get(_KEY_PATTERN.sub("", str(key).lower())) if key is not None else None
+        if field is not None:
+            fields[field] = value
+    return fields
+
+
+def _product_row(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a products row from validated data."""
+    attribute_keys = CATEGORY_ATTRIBUTE_KEYS.get(data["category"], {})
+    return {
+        "name": data["name"],
+        "brand": data["brand"],
+        "price": data["price"],
+        "quantity": data["quantity"],
+        "description": data["description"],
+        "image_url": data["image_url"] or None,
+        "category": data["category"],
+        "category_attributes": {stored: data[field] for field, stored in attribute_keys.items()},
+    }
+
+
+class ImportReport:
+    """
+    Outcome of a bulk import.
+
+    Attributes:
+        received (int): Records read from the feed
+        imported (int): Products inserted
+        failed (int): Records rejected by validation or the database
+        errors (list): {"row", "errors"} entries, at most IMPORT_MAX_ERRORS;
+            each error is a {"field", "message"} dict (field None for
+            errors about the whole row)
+    """
+
+    def __init__(self):
+        self.received = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+
+    def add_failures(self, failures: List[dict]) -> None:
+        """Count failed rows, keeping details up to IMPORT_MAX_ERRORS."""
+        self.failed += len(failures)
+        room = IMPORT_MAX_ERRORS - len(self.errors)
+        if room > 0:
+            self.errors.extend(failures[:room])
+
+    def to_dict(self) -> dict:
+        """Convert the report to a dictionary for API responses."""
+        return {
+            "received": self.received,
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda failure: failure["row"]),
+            "errorsTruncated": self.failed > len(self.errors),
+        }
+
+
+def _database_error(exc: Exception) -> str:
+    """Short description of a database error for the report."""
+    error = getattr(exc, "orig", None) or exc
+    return f"{type(error).__name__}: {error}"
+
+
+def _insert_rows(rows: List[Tuple[int, dict]], report: ImportReport) -> None:
+    """
+    Insert a chunk of valid rows with one batched INSERT. If the database
+    rejects the batch, rows are retried one by one so only the offending
+    rows fail.
+    """
+    now = datetime.utcnow()
+    values = [{**row, "created_at": now, "updated_at": now} for _, row in rows]
+    with SessionLocal() as db:
+        try:
+            db.execute(insert(DBProduct), values)
+            db.commit()
+            report.imported += len(values)
+            return
+        except _ROW_ERRORS:
+            db.rollback()
+
+        failures = []
+        for (number, _), value in zip(rows, values):
+            try:
+                db.execute(insert(DBProduct), [value])
+                db.commit()
+                report.imported += 1
+            except _ROW_ERRORS as exc:
+                db.rollback()
+                failures.append({"row": number, "errors": [{"field": None, "message": _database_error(exc)}]})
+        report.add_failures(failures)
+
+
+def import_catalog(stream: IO[bytes], import_format: str = "csv",
+                   workers: int = IMPORT_WORKERS) -> ImportReport:
+    """
+    Import products from a CSV or NDJSON feed.
+
+    Each chunk is committed on its own, so a failure part way through keeps
+    the chunks already written. Blocking; call it from a worker thread in
+    async code.
+
+    Args:
+        stream: Binary file object holding the feed
+        import_format: "csv" or "ndjson"
+        workers: Validation processes (0 or 1 validates inline)
+
+    Returns:
+        ImportReport: Counts and per-row errors
+    """
+    report = ImportReport()
+    # Row numbers of records handed to validation, in order
+    numbers = deque()
+
+    def parsed_records() -> Iterator[Dict[str, Any]]:
+        for number, record in enumerate(iter_records(stream, import_format), start=1):
+            report.received += 1
+            if _PARSE_ERROR in record:
+                report.add_failures([{"row": number, "errors": [{"field": None, "message": record[_PARSE_ERROR]}]}])
+                continue
+            numbers.append(number)
+            yield _normalize(record)
+
+    try:
+        for results in iter_validated(parsed_records(), workers, IMPORT_BATCH_SIZE):
+            rows: List[Tuple[int, dict]] = []
+            failures = []
+            for result in results:
+                number = numbers.popleft()
+                if result.valid:
+                    rows.append((number, _product_row(result.data)))
+                else:
+                    failures.append({"row": number, "errors": result.errors})
+            report.add_failures(failures)
+            if rows:
+                _insert_rows(rows, report)
+    finally:
+        if report.imported:
+            bump_catalog_version()
+            invalidate_search_index()
+            invalidate_dashboard_stats()
+    return report
@@ -0,0 +1,142 @@
+"""
+Inventory - Atomic stock reservation and release for orders
+
+Stock is adjusted with conditional UPDATE statements rather than read-modify-
+write on loaded products, so two concurrent orders can never both take the
+last unit. All lines of an order are adjusted by a single set-based UPDATE
+joined to the requested quantities, so an order costs one round trip however
+many products it holds. The statements bypass ORM flush events, so the
+resulting stock levels are handed to the dashboard explicitly and returned
+for the caller to patch into the catalog snapshot once committed.
+
+Order status changes that move stock are claimed the same way: the status
+is only changed if it still holds the value the caller read, so two requests
+cancelling the same order cannot both return its items to stock.
+"""
+
+from typing import Dict, List, Optional
+
+from sqlalchemy import Integer, literal, select, union_all, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db_models.order import Order
+from db_models.product import DBProduct
+from services.dashboard import stage_stock_levels
+
+
+def _adjust_stock(quantities: Dict[int, int], take: bool):
+    """
+    Build one UPDATE taking units from, or returning them to, each product.
+
+    Args:
+        quantities: product_id -> units (must not be empty)
+        take: Take stock, only where enough is left, rather than return it
+
+    Returns:
+        Update statement returning (id, name, quantity, price, updated_at)
+        for every product it changed
+    """
+    # A UNION ALL of one-row SELECTs rather than VALUES, since SQLite cannot
+    # name the columns of a VALUES list in FROM
+    lines = union_all(*(
+        select(literal(product_id, Integer).label("product_id"), literal(units, Integer).label("units"))
+        for product_id, units in sorted(quantities.items())
+    )).subquery("lines")
+    statement = update(DBProduct).where(DBProduct.id == lines.c.product_id)
+    if take:
+        statement = statement.where(DBProduct.quantity >= lines.c.units)
+        quantity = DBProduct.quantity - lines.c.units
+    else:
+        quantity = DBProduct.quantity + lines.c.units
+    return (
+        statement
+        .values(quantity=quantity)
+        .returning(DBProduct.id, DBProduct.name, DBProduct.quantity, DBProduct.price, DBProduct.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def reserve_stock(db: AsyncSession, quantities: Dict[int, int]) -> Optional[Dict[int, Row]]:
+    """
+    Take stock for an order within the session's transaction.
+
+    Args:
+        db: Async database session; the caller commits or rolls back
+        quantities: product_id -> units requested
+
+    Returns:
+        dict: product_id -> (id, name, quantity, price, updated_at) row with
+        the post-reservation quantity, or None if any product is missing or
+        short, in which case the transaction has been rolled back
+    """
+    if not quantities:
+        return {}
+    rows = (await db.execute(_adjust_stock(quantities, take=True))).all()
+    if len(rows) != len(quantities):
+        await db.rollback()
+        return None
+
+    stage_stock_levels(db.sync_session, [(row.id, row.name, row.quantity) for row in rows])
+    return {row.id: row for row in rows}
+
+
+async def release_stock(db: AsyncSession, quantities: Dict[int, int]) -> List[Row]:
+    """
+    Return stock from a cancelled order within the session's transaction.
+
+    Args:
+        db: Async database session; the caller commits
+        quantities: product_id -> units to return
+
+    Returns:
+        list: (id, name, quantity, price, updated_at) rows of the products
+        that still exist, with their post-release quantity
+    """
+    if not quantities:
+        return []
+    rows = (await db.execute(_adjust_stock(quantities, take=False))).all()
+    stage_stock_levels(db.sync_session, [(row.id, row.name, row.quantity) for row in rows])
+    return rows
+
+
+async def change_order_status(db: AsyncSession, order_id: int, current: str, new: str) -> bool:
+    """
+    Move an order to a new status if it still has the status the caller read.
+
+    Args:
+        db: Async database session; the caller commits or rolls back
+        order_id: Order to update
+        current: Status the caller based its decision on
+        new: Status to set
+
+    Returns:
+        bool: True if this transaction changed the status, False if another
+        request changed it first
+    """
+    result = await db.execute(
+        update(Order)
+        .where(Order.id == order_id, Order.status == current)
+        .values(status=new)
+    )
+    return result.rowcount == 1
+
+
+def order_quantities(lines) -> Dict[int, int]:
+    """
+    Sum requested units per product, merging repeated lines.
+
+    Args:
+        lines: (product_id, quantity) pairs
+
+    Returns:
+        dict: product_id -> total units
+    """
+    quantities: Dict[int, int] = {}
+    for product_id, quantity in lines:
+        product_id = int(product_id)
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    return quantities
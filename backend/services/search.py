@@ -0,0 +1,371 @@
+"""
+Product Search Index - In-process inverted index with BM25 ranking
+
+Every product is tokenized from ``Product.get_search_keywords`` (name, brand,
+description and category) into an inverted index of term -> postings. Queries
+are answered from the postings alone, so latency depends on how many products
+share the query terms rather than on catalog size. The last query term also
+matches as a prefix ("rob" finds "robot"), which keeps search-as-you-type
+working.
+"""
+
+import asyncio
+import bisect
+import heapq
+import math
+from operator import itemgetter
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db_models.product import DBProduct
+from models.product import Product
+from utils.snapshots import SharedSnapshot
+
+
+# BM25 tuning constants
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Extra term frequency for terms found in the name / brand fields
+NAME_BOOST = 2
+BRAND_BOOST = 1
+
+# Prefix expansions are scored lower than exact term matches
+PREFIX_PENALTY = 0.8
+
+# Upper bound on vocabulary terms a single prefix may expand to
+MAX_PREFIX_EXPANSIONS = 64
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase alphanumeric search terms.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        list: Search terms in order of appearance
+    """
+    return _TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def to_search_product(product: DBProduct) -> Product:
+    """Convert a database product into the domain model used for indexing."""
+    return Product(
+        id=product.id,
+        name=product.name or "",
+        brand=product.brand or "",
+        price=product.price or 0,
+        quantity=product.quantity or 0,
+        description=product.description or "",
+        image_url=product.image_url or "",
+        category=product.category or "",
+        created_at=product.created_at,
+        updated_at=product.updated_at
+    )
+
+
+class ProductSearchIndex:
+    """
+    Inverted index over the product catalog.
+
+    Postings map each term to the products containing it along with a
+    field-boosted term frequency. Product IDs are stored as strings to match
+    the API representation.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+        # Sorted vocabulary for prefix lookups
+        self._vocabulary: List[str] = []
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    @staticmethod
+    def _document_terms(product: Product) -> Dict[str, int]:
+        """Build the boosted term frequencies for a product."""
+        terms: Dict[str, int] = {}
+        for keyword in product.get_search_keywords():
+            for term in tokenize(keyword):
+                terms[term] = terms.get(term, 0) + 1
+        for term in set(tokenize(product.name)):
+            terms[term] = terms.get(term, 0) + NAME_BOOST
+        for term in set(tokenize(product.brand)):
+            terms[term] = terms.get(term, 0) + BRAND_BOOST
+        return terms
+
+    def add_product(self, product: Product) -> None:
+        """
+        Add or replace a product in the index.
+
+        Args:
+            product: Product to index
+        """
+        doc_id = str(product.id)
+        terms = self._document_terms(product)
+        with self._lock:
+            self._remove(doc_id)
+            for term, frequency in terms.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    bisect.insort(self._vocabulary, term)
+                postings[doc_id] = frequency
+            self._doc_terms[doc_id] = terms
+            length = sum(terms.values())
+            self._doc_lengths[doc_id] = length
+            self._total_length += length
+
+    def remove_product(self, product_id) -> None:
+        """
+        Remove a product from the index if present.
+
+        Args:
+            product_id: ID of the product to remove
+        """
+        with self._lock:
+            self._remove(str(product_id))
+
+    def _remove(self, doc_id: str) -> None:
+        """Remove a document; caller must hold the lock."""
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+                position = bisect.bisect_left(self._vocabulary, term)
+                del self._vocabulary[position]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+
+    def _expand(self, term: str, prefix: bool) -> List[Tuple[str, float]]:
+        """Get the vocabulary terms a query term matches, with their weights."""
+        matches = []
+        if term in self._postings:
+            matches.append((term, 1.0))
+        if not prefix:
+            return matches
+        position = bisect.bisect_left(self._vocabulary, term)
+        for candidate in self._vocabulary[position:position + MAX_PREFIX_EXPANSIONS + 1]:
+            if not candidate.startswith(term):
+                break
+            if candidate != term:
+                matches.append((candidate, PREFIX_PENALTY))
+        return matches
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """
+        Rank products against a query using BM25.
+
+        Every query term must match a product. The last term also matches as
+        a prefix, since it is usually the one still being typed.
+
+        Args:
+            query: Free-text search query
+            limit: Maximum number of results
+
+        Returns:
+            list: (product_id, score) pairs, best match first
+        """
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        if not query_terms or limit <= 0:
+            return []
+
+        with self._lock:
+            document_count = len(self._doc_terms)
+            if document_count == 0:
+                return []
+            average_length = self._total_length / document_count
+
+            # Most selective term first, so later terms only score survivors
+            last = len(query_terms) - 1
+            expanded = [self._expand(term, i == last) for i, term in enumerate(query_terms)]
+            expanded.sort(key=lambda matches: sum(len(self._postings[m]) for m, _ in matches))
+
+            scores: Optional[Dict[str, float]] = None
+            for matches in expanded:
+                term_scores: Dict[str, float] = {}
+                for match, weight in matches:
+                    postings = self._postings[match]
+                    idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    if scores is not None and len(scores) < len(postings):
+                        candidates = [
+                            (doc_id, postings[doc_id]) for doc_id in scores if doc_id in postings
+                        ]
+                    else:
+                        candidates = postings.items()
+                    for doc_id, frequency in candidates:
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_lengths[doc_id] / average_length)
+                        score = weight * idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+                        if score > term_scores.get(doc_id, 0.0):
+                            term_scores[doc_id] = score
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {
+                        doc_id: score + term_scores[doc_id]
+                        for doc_id, score in scores.items()
+                        if doc_id in term_scores
+                    }
+                if not scores:
+                    return []
+
+        return heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+
+
+# Writes committed while the initial build is reading the catalog, replayed
+# once the index is installed (None = removal). Guarded by _search.lock.
+_pending_writes: Optional[List[Tuple[str, Optional[Product]]]] = None
+
+
+def _replay_pending_writes(index: ProductSearchIndex, raced: bool) -> bool:
+    """Replay journaled writes onto a freshly built index before it is installed."""
+    global _pending_writes
+    pending, _pending_writes = _pending_writes, None
+    if raced or _search.value is not None:
+        # Invalidated mid-build, so the build may predate a bulk write (or
+        # another build won): serve it once, rebuild on the next search
+        return False
+    for product_id, product in pending or ():
+        if product is None:
+            index.remove_product(product_id)
+        else:
+            index.add_product(product)
+    return True
+
+
+# Built once, then kept current by index_product/unindex_product; the
+# generation only advances when the index is invalidated
+_search: SharedSnapshot[ProductSearchIndex] = SharedSnapshot(on_install=_replay_pending_writes)
+
+
+def build_search_index(products: Iterable[Product]) -> ProductSearchIndex:
+    """
+    Build a search index from a collection of products.
+
+    Args:
+        products: Products to index
+
+    Returns:
+        ProductSearchIndex: The populated index
+    """
+    index = ProductSearchIndex()
+    for product in products:
+        index.add_product(product)
+    return index
+
+
+def _begin_build() -> None:
+    """Start journaling writes that race with the initial build."""
+    global _pending_writes
+    with _search.lock:
+        if _pending_writes is None:
+            _pending_writes = []
+
+
+def _abort_build() -> None:
+    """Stop journaling writes after a failed build."""
+    global _pending_writes
+    with _search.lock:
+        if _search.value is None:
+            _pending_writes = None
+
+
+def get_search_index(db: Session) -> ProductSearchIndex:
+    """
+    Get the process-wide search index, building it from the database on
+    first use. Afterwards it is kept current by index_product/unindex_product.
+
+    Args:
+        db: Database session used only for the initial build
+
+    Returns:
+        ProductSearchIndex: The shared index
+    """
+    def load(generation: int) -> ProductSearchIndex:
+        _begin_build()
+        try:
+            return build_search_index(
+                to_search_product(product) for product in db.query(DBProduct).yield_per(1000)
+            )
+        except Exception:
+            _abort_build()
+            raise
+
+    return _search.get(load)
+
+
+async def get_search_index_async(db: AsyncSession) -> ProductSearchIndex:
+    """
+    Async variant of get_search_index for route handlers. Tokenizing runs
+    in a worker thread so a large initial build doesn't stall the event loop.
+
+    Args:
+        db: Async database session used only for the initial build
+
+    Returns:
+        ProductSearchIndex: The shared index
+    """
+    async def load(generation: int) -> ProductSearchIndex:
+        _begin_build()
+        try:
+            result = await db.execute(select(DBProduct))
+            products = [to_search_product(product) for product in result.scalars()]
+            return await asyncio.to_thread(build_search_index, products)
+        except Exception:
+            _abort_build()
+            raise
+
+    return await _search.get_async(load)
+
+
+def _record_write(product_id: str, product: Optional[Product]) -> None:
+    """Apply a committed product write to the index, or journal it mid-build."""
+    with _search.lock:
+        index = _search.value
+        if index is None:
+            if _pending_writes is not None:
+                _pending_writes.append((product_id, product))
+            return
+    if product is None:
+        index.remove_product(product_id)
+    else:
+        index.add_product(product)
+
+
+def index_product(product: DBProduct) -> None:
+    """Add or refresh a product in the search index after a committed write."""
+    _record_write(str(product.id), to_search_product(product))
+
+
+def unindex_product(product_id) -> None:
+    """Drop a product from the search index after it has been deleted."""
+    _record_write(str(product_id), None)
+
+
+def invalidate_search_index() -> None:
+    """
+    Drop the index so the next search rebuilds it from the database.
+    Used after bulk writes, where one rebuild is cheaper than indexing
+    every written product.
+    """
+    _search.advance(drop=True)
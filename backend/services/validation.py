@@ -0,0 +1,369 @@
+"""
+Product Validation - Compiled, memoized validation of product specs
+
+Applies the same rules as Product.validate_product and the category
+models' validate_*_specs methods (ElectronicToy, PlushToy, BoardGame), with
+the same messages, but without building model instances and without
+stopping at the first failure: every field is checked and the result lists
+one error per failing field. A category is also required, as it is for
+stored products. The rules are compiled once from the model classes. Spec
+strings such as voltages ("6V"), player counts ("2-4") and age ranges ("8+")
+are parsed through bounded LRU caches, and whole spec checks are memoized,
+since feeds repeat a small set of values. Large batches can be spread over
+a process pool.
+"""
+
+import math
+import multiprocessing
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models import BoardGame, ElectronicToy, PlushToy
+
+
+# Parsed values kept per spec parser
+SPEC_CACHE_SIZE = int(os.getenv("SPEC_CACHE_SIZE", "4096"))
+# Processes for batch validation; 0 or 1 validates in the calling thread
+VALIDATION_WORKERS = int(os.getenv("VALIDATION_WORKERS", str(os.cpu_count() or 1)))
+# Records per worker task
+VALIDATION_CHUNK_SIZE = int(os.getenv("VALIDATION_CHUNK_SIZE", "1000"))
+
+# Canonical field names accepted by validate_product_data
+PRODUCT_FIELDS = ("name", "brand", "price", "quantity", "description", "image_url", "category")
+SPEC_FIELDS = ("battery_type", "voltage", "material", "size", "age_range", "number_of_players")
+
+_VOLTAGE_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)\s*v$", re.IGNORECASE)
+# Counts are capped at 9 digits, as int() refuses very long digit strings
+_PLAYERS_PATTERN = re.compile(r"^(\d{1,9})\s*(?:(-)\s*(\d{1,9})|(\+))?$")
+_AGE_PATTERN = re.compile(r"^(\d{1,9})\s*(?:\+|-\s*\d+)?$")
+
+# Nominal heights, as in PlushToy.validate_size
+_SIZE_HEIGHTS_CM = {"Micro": 5, "Small": 15, "Medium": 30, "Large": 60, "Extra Large": 100}
+
+
+@lru_cache(maxsize=SPEC_CACHE_SIZE)
+def parse_voltage(value: str) -> Optional[float]:
+    """
+    Parse a voltage such as "6V" or "4.5 V".
+
+    Returns:
+        float or None: Volts, or None if the value is not a plain voltage
+    """
+    match = _VOLTAGE_PATTERN.match(value.strip())
+    return float(match.group(1)) if match else None
+
+
+@lru_cache(maxsize=SPEC_CACHE_SIZE)
+def parse_player_count(value: str) -> Optional[Tuple[int, Optional[int]]]:
+    """
+    Parse a player count such as "2", "2-4", "1+" or "Solo".
+
+    Returns:
+        tuple or None: (minimum, maximum) players, maximum None when open
+        ended; None if the value cannot be parsed
+    """
+    value = value.strip()
+    if value.lower() == "solo":
+        return 1, 1
+    match = _PLAYERS_PATTERN.match(value)
+    if not match:
+        return None
+    minimum = int(match.group(1))
+    if match.group(4):
+        return minimum, None
+    maximum = int(match.group(3)) if match.group(2) else minimum
+    return (minimum, maximum) if minimum <= maximum else None
+
+
+@lru_cache(maxsize=SPEC_CACHE_SIZE)
+def parse_age_range(value: str) -> Optional[int]:
+    """
+    Parse the minimum age of an age range such as "8+" or "5-10".
+
+    Returns:
+        int or None: Minimum age, or None if the value cannot be parsed
+    """
+    match = _AGE_PATTERN.match(value.strip())
+    return int(match.group(1)) if match else None
+
+
+def _voltage_specs(values: Dict[str, str]) -> Dict[str, Any]:
+    return {
+        "voltage_volts": parse_voltage(values["voltage"]),
+        "requires_batteries": values["battery_type"] != "None",
+        "is_rechargeable": values["battery_type"] == "Rechargeable",
+    }
+
+
+def _size_specs(values: Dict[str, str]) -> Dict[str, Any]:
+    return {"height_cm": _SIZE_HEIGHTS_CM.get(values["size"])}
+
+
+def _game_specs(values: Dict[str, str]) -> Dict[str, Any]:
+    players = parse_player_count(values["number_of_players"])
+    return {
+        "min_age": parse_age_range(values["age_range"]),
+        "min_players": players[0] if players else None,
+        "max_players": players[1] if players else None,
+    }
+
+
+class _SpecRule:
+    """Required check and optional allowed values for one spec field."""
+
+    __slots__ = ("field", "required_message", "allowed", "invalid_label", "listing")
+
+    def __init__(self, field: str, required_message: str,
+                 allowed: Optional[Sequence[str]] = None, invalid_label: str = "", listing: str = ""):
+        self.field = field
+        self.required_message = required_message
+        self.allowed = frozenset(allowed) if allowed is not None else None
+        self.invalid_label = invalid_label
+        # Built once; the models join the valid values on every failure
+        self.listing = f"{listing}: {', '.join(allowed)}" if allowed is not None else ""
+
+    def check(self, value: str) -> Optional[str]:
+        """Error message for a value, or None if it passes."""
+        if not value:
+            return self.required_message
+        if self.allowed is not None and value not in self.allowed:
+            return f"Invalid {self.invalid_label}: {value}. {self.listing}"
+        return None
+
+
+# Spec rules and parsed-spec builder per category, compiled from the models
+CATEGORY_RULES = {
+    "Electronic": ((
+        _SpecRule("battery_type", "Battery type is required for electronic toys",
+                  ElectronicToy.VALID_BATTERY_TYPES, "battery type", "Valid types"),
+        _SpecRule("voltage", "Voltage specification is required for electronic toys"),
+    ), _voltage_specs),
+    "Plush": ((
+        _SpecRule("material", "Material is required for plush toys",
+                  PlushToy.VALID_MATERIALS, "material", "Valid materials"),
+        _SpecRule("size", "Size is required for plush toys",
+                  PlushToy.VALID_SIZES, "size", "Valid sizes"),
+    ), _size_specs),
+    "BoardGame": ((
+        _SpecRule("age_range", "Age range is required for board games",
+                  BoardGame.VALID_AGE_RANGES, "age range", "Valid ranges"),
+        _SpecRule("number_of_players", "Number of players is required for board games"),
+    ), _game_specs),
+}
+
+_CATEGORY_FIELDS = {
+    category: tuple(rule.field for rule in spec_rules)
+    for category, (spec_rules, _) in CATEGORY_RULES.items()
+}
+
+_NAME_REQUIRED = {"field": "name", "message": "Product name is required"}
+_BRAND_REQUIRED = {"field": "brand", "message": "Product brand is required"}
+_CATEGORY_REQUIRED = {"field": "category", "message": "Category is required"}
+_NEGATIVE_PRICE = {"field": "price", "message": "Product price cannot be negative"}
+_NEGATIVE_QUANTITY = {"field": "quantity", "message": "Product quantity cannot be negative"}
+
+
+@lru_cache(maxsize=SPEC_CACHE_SIZE)
+def _check_specs(category: str, values: Tuple[str, ...]) -> Tuple[Tuple[Dict[str, str], ...], Dict[str, Any]]:
+    """
+    Check one combination of spec values for a category.
+
+    Feeds repeat a handful of combinations, so whole outcomes are cached.
+
+    Returns:
+        tuple: (field errors, parsed specs; empty unless all specs pass)
+    """
+    spec_rules, build_specs = CATEGORY_RULES[category]
+    errors = []
+    for rule, value in zip(spec_rules, values):
+        message = rule.check(value)
+        if message is not None:
+            errors.append({"field": rule.field, "message": message})
+    if errors:
+        return tuple(errors), {}
+    return (), build_specs(dict(zip(_CATEGORY_FIELDS[category], values)))
+
+
+class ValidationResult:
+    """
+    Outcome of validating one product record.
+
+    Error and spec dicts may be shared between results, so callers must
+    treat them as read-only.
+
+    Attributes:
+        data (dict): Cleaned values: stripped strings, float price, int
+            quantity and the category's spec fields
+        errors (list): {"field", "message"} entries, one per failing field
+        specs (dict): Values parsed from the category specs, when valid
+    """
+
+    __slots__ = ("data", "errors", "specs")
+
+    def __init__(self, data: Dict[str, Any], errors: List[Dict[str, str]], specs: Dict[str, Any]):
+        self.data = data
+        self.errors = errors
+        self.specs = specs
+
+    @property
+    def valid(self) -> bool:
+        """Whether every field passed."""
+        return not self.errors
+
+    def to_dict(self) -> dict:
+        """Convert the result to a dictionary for API responses."""
+        return {"valid": self.valid, "errors": self.errors, "specs": self.specs}
+
+
+def _text(value: Any) -> str:
+    """Coerce a field to a stripped string; missing values become empty."""
+    if value.__class__ is str:
+        return value.strip()
+    return "" if value is None else str(value).strip()
+
+
+def _number(value: Any, field: str, errors: List[Dict[str, str]]) -> Optional[float]:
+    """Parse a finite number, recording a field error if it is not one."""
+    try:
+        number = float(value) if isinstance(value, (int, float)) else float(_text(value))
+    except (ValueError, OverflowError):
+        # OverflowError: ints too large for a float, such as 10**400
+        number = math.nan
+    if not math.isfinite(number):
+        errors.append({"field": field, "message": f"Invalid {field}: {value!r}"})
+        return None
+    return number
+
+
+def validate_product_data(record: Mapping[str, Any]) -> ValidationResult:
+    """
+    Validate one product record, collecting every field error.
+
+    Args:
+        record: Values keyed by PRODUCT_FIELDS and SPEC_FIELDS names;
+            numbers may be given as strings
+
+    Returns:
+        ValidationResult: Cleaned data, per-field errors and parsed specs
+    """
+    get = record.get
+    errors: List[Dict[str, str]] = []
+    data = {
+        "name": _text(get("name")),
+        "brand": _text(get("brand")),
+        "description": _text(get("description")),
+        "image_url": _text(get("image_url")),
+        "category": _text(get("category")),
+    }
+
+    if not data["name"]:
+        errors.append(_NAME_REQUIRED)
+    if not data["brand"]:
+        errors.append(_BRAND_REQUIRED)
+
+    price = _number(get("price"), "price", errors)
+    if price is not None and price < 0:
+        errors.append(_NEGATIVE_PRICE)
+    data["price"] = price
+
+    quantity = _number(get("quantity", 0), "quantity", errors)
+    if quantity is not None:
+        if not quantity.is_integer():
+            errors.append({"field": "quantity", "message": f"Quantity must be a whole number: {get('quantity')!r}"})
+            quantity = None
+        elif quantity < 0:
+            errors.append(_NEGATIVE_QUANTITY)
+    data["quantity"] = int(quantity) if quantity is not None else None
+
+    category = data["category"]
+    if not category:
+        errors.append(_CATEGORY_REQUIRED)
+
+    specs: Dict[str, Any] = {}
+    fields = _CATEGORY_FIELDS.get(category)
+    if fields is not None:
+        # Every category has exactly two spec fields
+        first, second = fields
+        values = data[first], data[second] = _text(get(first)), _text(get(second))
+        spec_errors, specs = _check_specs(category, values)
+        if spec_errors:
+            errors.extend(spec_errors)
+
+    return ValidationResult(data, errors, specs)
+
+
+def validate_chunk(records: List[Mapping[str, Any]]) -> List[ValidationResult]:
+    """Validate a list of records. Runs in the worker processes."""
+    return [validate_product_data(record) for record in records]
+
+
+def iter_validated(records: Iterable[Mapping[str, Any]], workers: int = VALIDATION_WORKERS,
+                   chunk_size: int = VALIDATION_CHUNK_SIZE) -> Iterator[List[ValidationResult]]:
+    """
+    Validate a stream of records chunk by chunk, in input order.
+
+    With several workers, chunks are validated on a process pool with up to
+    two per worker in flight, so memory stays bounded and the caller can
+    work on one chunk's results while later chunks are validated.
+
+    Args:
+        records: Product records
+        workers: Validation processes (0 or 1 validates inline)
+        chunk_size: Records per chunk
+
+    Yields:
+        list: ValidationResults for each chunk, aligned with its records
+    """
+    records = iter(records)
+    chunks = iter(lambda: list(islice(records, chunk_size)), [])
+    if workers <= 1:
+        for chunk in chunks:
+            yield validate_chunk(chunk)
+        return
+
+    # spawn: forking a server process that runs threads is not safe
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(validate_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def validate_products(records: Sequence[Mapping[str, Any]],
+                      workers: Optional[int] = None) -> List[ValidationResult]:
+    """
+    Validate a batch of records. Batches smaller than two chunks are
+    validated inline, where starting processes would cost more than it saves.
+
+    Args:
+        records: Product records
+        workers: Validation processes (default VALIDATION_WORKERS)
+
+    Returns:
+        list: One ValidationResult per record, in order
+    """
+    if workers is None:
+        workers = VALIDATION_WORKERS
+    if len(records) < 2 * VALIDATION_CHUNK_SIZE:
+        workers = 1
+    return [result for chunk in iter_validated(records, workers) for result in chunk]
+
+
+def spec_cache_info() -> Dict[str, Any]:
+    """LRU statistics of the spec caches in this process."""
+    return {
+        "spec_check": _check_specs.cache_info()._asdict(),
+        "voltage": parse_voltage.cache_info()._asdict(),
+        "player_count": parse_player_count.cache_info()._asdict(),
+        "age_range": parse_age_range.cache_info()._asdict(),
+    }
@@ -0,0 +1,97 @@
+"""
+Test configuration - isolated SQLite database and API client fixtures
+
+The database URL and bcrypt cost are set before the app is imported, so the
+engines, caches and hashing pool all point at a throwaway database.
+"""
+
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+_DB_DIR = tempfile.mkdtemp(prefix="wonderland-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["CATALOG_SYNC_SECONDS"] = "-1"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+from main import app
+from database import SessionLocal, init_db
+from db_models.product import DBProduct
+from db_models.user import User
+from services.catalog import bump_catalog_version
+from services.search import invalidate_search_index
+
+
+@pytest.fixture(scope="session")
+def client():
+    """API client sharing one test database for the whole session."""
+    init_db()
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db():
+    """Synchronous session on the test database."""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_products(db):
+    """Insert products directly and return their IDs."""
+    def make(*specs):
+        defaults = {"brand": "Acme", "price": 10.0, "quantity": 100,
+                    "category": "Plush Toys", "description": ""}
+        products = [DBProduct(**{**defaults, **spec}) for spec in specs]
+        db.add_all(products)
+        db.commit()
+        # Written outside the API, so drop the in-process caches
+        bump_catalog_version()
+        invalidate_search_index()
+        return [product.id for product in products]
+    return make
+
+
+def register(client, role: str = "customer") -> dict:
+    """Register a fresh user and return their auth headers and ID."""
+    email = f"{uuid.uuid4().hex}@example.com"
+    response = client.post("/api/auth/register",
+                           json={"email": email, "name": "Test User", "password": "secret123"})
+    assert response.status_code in (200, 201), response.text
+    user_id = int(response.json()["user"]["id"])
+    if role != "customer":
+        session = SessionLocal()
+        try:
+            session.get(User, user_id).role = role
+            session.commit()
+        finally:
+            session.close()
+        response = client.post("/api/auth/login", json={"email": email, "password": "secret123"})
+    return {
+        "id": user_id,
+        "email": email,
+        "headers": {"Authorization": f"Bearer {response.json()['access_token']}"},
+    }
+
+
+@pytest.fixture
+def user(client):
+    """A freshly registered customer."""
+    return register(client)
+
+
+@pytest.fixture
+def admin(client):
+    """A freshly registered admin."""
+    return register(client, "admin")
@@ -0,0 +1,30 @@
+"""
+Tests for the admin sales analytics endpoint
+"""
+
+
+def test_analytics_requires_admin(client, user):
+    assert client.get("/api/admin/admin/analytics").status_code == 401
+    assert client.get("/api/admin/admin/analytics", headers=user["headers"]).status_code == 403
+
+
+def test_analytics_counts_new_orders(client, user, admin, make_products):
+    product_id, = make_products({"name": "Abacus", "price": 4.0})
+    before = client.get("/api/admin/admin/analytics", params={"period": "day"},
+                        headers=admin["headers"]).json()
+
+    client.post("/api/orders/orders/", headers=user["headers"], json={
+        "items": [{"productId": str(product_id), "quantity": 3}],
+        "deliveryAddress": "1 Test Lane",
+    })
+    after = client.get("/api/admin/admin/analytics", params={"period": "day"},
+                       headers=admin["headers"]).json()
+    assert after["orders"] == before["orders"] + 1
+    assert after["sales"] == before["sales"] + 3
+    assert after["revenue"] == before["revenue"] + 12.0
+
+
+def test_analytics_rejects_unknown_period(client, admin):
+    response = client.get("/api/admin/admin/analytics", params={"period": "decade"},
+                          headers=admin["headers"])
+    assert response.status_code == 400
@@ -0,0 +1,66 @@
+"""
+Tests for the auth cache and its invalidation on user changes
+"""
+
+import time
+
+from utils.auth_cache import AuthCache, UserPrincipal, auth_cache
+
+
+def _principal(user_id: int) -> UserPrincipal:
+    return UserPrincipal(user_id, f"user{user_id}@example.com", "User", "customer")
+
+
+def test_cache_respects_token_expiry():
+    cache = AuthCache(ttl_seconds=60)
+    cache.put("expired", {"exp": time.time() - 1}, _principal(1))
+    cache.put("live", {"exp": time.time() + 60}, _principal(1))
+    assert cache.get("expired") is None
+    assert cache.get("live")[1].id == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = AuthCache(max_size=2, ttl_seconds=60)
+    cache.put("a", {}, _principal(1))
+    cache.put("b", {}, _principal(2))
+    cache.get("a")
+    cache.put("c", {}, _principal(3))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_invalidate_user_drops_all_their_tokens():
+    cache = AuthCache(ttl_seconds=60)
+    cache.put("a1", {}, _principal(1))
+    cache.put("a2", {}, _principal(1))
+    cache.put("b", {}, _principal(2))
+    cache.invalidate_user(1)
+    assert cache.get("a1") is None and cache.get("a2") is None
+    assert cache.get("b") is not None
+
+
+def test_update_invalidates_cached_principal(client, user):
+    assert client.get("/api/auth/me", headers=user["headers"]).json()["name"] == "Test User"
+    assert len(auth_cache) > 0
+
+    response = client.put(f"/api/users/users/{user['id']}", params={"name": "Renamed"},
+                          headers=user["headers"])
+    assert response.status_code == 200
+    assert client.get("/api/auth/me", headers=user["headers"]).json()["name"] == "Renamed"
+
+
+def test_deleted_user_token_rejected(client, user):
+    assert client.get("/api/auth/me", headers=user["headers"]).status_code == 200
+    response = client.delete(f"/api/users/users/{user['id']}", headers=user["headers"])
+    assert response.status_code == 200
+    assert client.get("/api/auth/me", headers=user["headers"]).status_code == 401
+
+
+def test_user_writes_require_owner_or_admin(client, user, admin):
+    other = f"/api/users/users/{admin['id']}"
+    assert client.put(other, params={"name": "Nope"}).status_code == 401
+    assert client.put(other, params={"name": "Nope"}, headers=user["headers"]).status_code == 403
+    assert client.delete(other, headers=user["headers"]).status_code == 403
+
+    mine = f"/api/users/users/{user['id']}"
+    assert client.put(mine, params={"name": "By Admin"}, headers=admin["headers"]).status_code == 200
@@ -0,0 +1,137 @@
+"""
+Tests for gzip/brotli response compression
+"""
+
+import asyncio
+import gzip
+import json
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from utils import compression
+from utils.compression import CompressionMiddleware, negotiate_encoding
+
+
+LARGE = {"items": [{"id": n, "name": f"Toy {n}"} for n in range(100)]}
+SMALL = {"id": 1}
+
+
+async def _large(request):
+    return JSONResponse(LARGE, headers={"Vary": "Origin"})
+
+
+async def _small(request):
+    return JSONResponse(SMALL)
+
+
+async def _encoded(request):
+    return Response(gzip.compress(json.dumps(LARGE).encode()), media_type="application/json",
+                    headers={"Content-Encoding": "gzip"})
+
+
+async def _image(request):
+    return Response(b"\x89PNG" + b"\0" * 2000, media_type="image/png")
+
+
+async def _lines():
+    for n in range(50):
+        yield (json.dumps({"id": n, "name": f"Toy {n}"}) + "\n").encode()
+
+
+async def _stream(request):
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+
+app = CompressionMiddleware(Starlette(routes=[
+    Route("/large", _large), Route("/small", _small), Route("/encoded", _encoded),
+    Route("/image", _image), Route("/stream", _stream),
+]), minimum_size=500)
+client = TestClient(app)
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("*", "br"),
+    ("gzip;q=bogus", None),
+])
+def test_negotiate_encoding(header, expected, monkeypatch):
+    monkeypatch.setattr(compression, "SUPPORTED_ENCODINGS", ("br", "gzip"))
+    assert negotiate_encoding(header) == expected
+
+
+def test_gzip_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "SUPPORTED_ENCODINGS", ("gzip",))
+    assert negotiate_encoding("br, gzip;q=0.5") == "gzip"
+    assert negotiate_encoding("br") is None
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br"])
+def test_large_responses_are_compressed(encoding):
+    if encoding not in compression.SUPPORTED_ENCODINGS:
+        pytest.skip("brotli is not installed")
+    with client.stream("GET", "/large", headers={"Accept-Encoding": encoding}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == encoding
+    assert response.headers["content-length"] == str(len(raw))
+    assert [v.strip() for v in response.headers["vary"].split(",")] == ["Origin", "Accept-Encoding"]
+    assert json.loads(compression.brotli.decompress(raw) if encoding == "br" else gzip.decompress(raw)) == LARGE
+
+
+def test_small_and_unaccepted_responses_are_left_alone():
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert "vary" not in small.headers
+    assert small.json() == SMALL
+
+    plain = client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.json() == LARGE
+
+
+def test_already_encoded_and_binary_responses_pass_through():
+    with client.stream("GET", "/encoded", headers={"Accept-Encoding": "br, gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "gzip"
+    assert json.loads(gzip.decompress(raw)) == LARGE
+
+    image = client.get("/image", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in image.headers
+    assert image.content.startswith(b"\x89PNG")
+
+
+def test_streaming_responses_are_compressed_chunk_by_chunk():
+    scope = {"type": "http", "method": "GET", "path": "/stream", "raw_path": b"/stream",
+             "root_path": "", "scheme": "http", "query_string": b"", "server": ("test", 80),
+             "headers": [(b"accept-encoding", b"gzip")]}
+    messages = []
+    requested = []
+
+    async def receive():
+        if requested:
+            # The client stays connected until the response is done
+            await asyncio.Event().wait()
+        requested.append(True)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+
+    start, *bodies = messages
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    # Not buffered into one body: the stream is still sent in several messages
+    assert len(bodies) > 1 and bodies[-1]["more_body"] is False
+    lines = gzip.decompress(b"".join(message["body"] for message in bodies)).decode().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == list(range(50))
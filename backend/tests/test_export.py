@@ -0,0 +1,123 @@
+"""
+Tests for the streaming catalog export and its round trip through the importer
+"""
+
+import csv
+import io
+import json
+
+from sqlalchemy import select
+
+from db_models.product import DBProduct
+from services.export import EXPORT_HEADERS
+from services.importer import import_catalog
+
+
+EXPORT_URL = "/api/admin/admin/products/export"
+
+SPECS = [
+    {"name": "Robot", "category": "Electronic", "category_attributes": {"batteryType": "AA", "voltage": "6V"}},
+    {"name": "Bear", "category": "Plush", "category_attributes": {"material": "Cotton", "size": "Small"}},
+    {"name": "Chess", "category": "BoardGame", "category_attributes": {"ageRange": "8+", "numberOfPlayers": "2"}},
+    {"name": "Kite", "category": "Misc", "category_attributes": None},
+    # Stored specs that fail PlushToy validation: exported as a plain Product
+    {"name": "Silk Cat", "category": "Plush", "category_attributes": {"material": "Silk", "size": "Small"}},
+]
+
+
+def _make(make_products, prefix):
+    specs = [{**spec, "name": f"{prefix} {spec['name']}"} for spec in SPECS]
+    return dict(zip((spec["name"] for spec in specs), make_products(*specs)))
+
+
+def _stored(db, names, imported):
+    """Stored fields of the named products: the originals, or the imported copies."""
+    db.expire_all()
+    last_original = max(names.values())
+    rows = db.execute(
+        select(DBProduct.name, DBProduct.brand, DBProduct.price, DBProduct.quantity,
+               DBProduct.category, DBProduct.category_attributes)
+        .where(DBProduct.name.in_(names),
+               DBProduct.id > last_original if imported else DBProduct.id <= last_original)
+        .order_by(DBProduct.name)
+    ).all()
+    # Imports always store an attributes object, empty for other categories
+    return [(*row[:-1], row[-1] or {}) for row in rows]
+
+
+def test_export_requires_admin(client, user):
+    assert client.get(EXPORT_URL).status_code == 401
+    assert client.get(EXPORT_URL, headers=user["headers"]).status_code == 403
+
+
+def test_unknown_format_rejected(client, admin):
+    assert client.get(EXPORT_URL, params={"format": "xml"}, headers=admin["headers"]).status_code == 400
+
+
+def test_csv_export_fills_category_columns(client, admin, make_products):
+    ids = _make(make_products, "Csv")
+    response = client.get(EXPORT_URL, headers=admin["headers"])
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert response.headers["content-disposition"] == 'attachment; filename="products.csv"'
+
+    reader = csv.reader(io.StringIO(response.text))
+    assert next(reader) == EXPORT_HEADERS
+    rows = {row[1]: dict(zip(EXPORT_HEADERS, row)) for row in reader}
+    category_columns = EXPORT_HEADERS[EXPORT_HEADERS.index("Updated At") + 1:]
+
+    robot = rows["Csv Robot"]
+    assert robot["ID"] == str(ids["Csv Robot"]) and robot["Category"] == "Electronic"
+    assert (robot["Battery Type"], robot["Voltage"]) == ("AA", "6V")
+    assert {robot[column] for column in category_columns if column not in ("Battery Type", "Voltage")} == {""}
+    assert (rows["Csv Bear"]["Material"], rows["Csv Bear"]["Size"]) == ("Cotton", "Small")
+    assert (rows["Csv Chess"]["Age Range"], rows["Csv Chess"]["Number of Players"]) == ("8+", "2")
+    assert {rows["Csv Kite"][column] for column in category_columns} == {""}
+    # Invalid specs still land in their columns
+    assert (rows["Csv Silk Cat"]["Material"], rows["Csv Silk Cat"]["Size"]) == ("Silk", "Small")
+
+
+def test_ndjson_export_keeps_own_fields(client, admin, make_products):
+    _make(make_products, "Ndjson")
+    response = client.get(EXPORT_URL, params={"format": "ndjson", "category": "Electronic"},
+                          headers=admin["headers"])
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'attachment; filename="products.ndjson"'
+
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert records and {record["category"] for record in records} == {"Electronic"}
+    robot = next(record for record in records if record["name"] == "Ndjson Robot")
+    assert (robot["battery_type"], robot["voltage"]) == ("AA", "6V")
+    assert "material" not in robot
+
+    every = client.get(EXPORT_URL, params={"format": "ndjson"}, headers=admin["headers"])
+    kite = next(json.loads(line) for line in every.text.splitlines() if '"Ndjson Kite"' in line)
+    assert set(kite) == {"id", "name", "brand", "price", "quantity", "description",
+                         "image_url", "category", "created_at", "updated_at"}
+
+
+def _round_trip(client, admin, db, make_products, prefix, export_format):
+    ids = _make(make_products, prefix)
+    response = client.get(EXPORT_URL, params={"format": export_format}, headers=admin["headers"])
+    lines = response.text.splitlines(keepends=True)
+    if export_format == "csv":
+        lines = lines[:1] + [line for line in lines[1:] if f",{prefix} " in line]
+    else:
+        lines = [line for line in lines if f'"name":"{prefix} ' in line]
+
+    report = import_catalog(io.BytesIO("".join(lines).encode("utf-8")), export_format, workers=1)
+
+    # The plush toy with invalid specs is the only row rejected
+    assert (report.received, report.imported, report.failed) == (5, 4, 1)
+    assert report.errors[0]["errors"][0]["field"] == "material"
+    originals = [row for row in _stored(db, ids, imported=False) if not row[0].endswith("Silk Cat")]
+    assert _stored(db, ids, imported=True) == originals
+
+
+def test_csv_export_round_trips_through_import(client, admin, db, make_products):
+    _round_trip(client, admin, db, make_products, "Trip Csv", "csv")
+
+
+def test_ndjson_export_round_trips_through_import(client, admin, db, make_products):
+    _round_trip(client, admin, db, make_products, "Trip Ndjson", "ndjson")
@@ -0,0 +1,131 @@
+"""
+Tests for the bulk catalog importer and its API endpoint
+"""
+
+import io
+import json
+
+import pytest
+from sqlalchemy import select, text
+
+import services.importer as importer
+from database import engine
+from db_models.product import DBProduct
+from services.importer import _normalize, detect_format, import_catalog, iter_records
+
+
+def _csv(*lines: str) -> io.BytesIO:
+    return io.BytesIO("\n".join(lines).encode("utf-8"))
+
+
+def _ndjson(*records) -> io.BytesIO:
+    return io.BytesIO("\n".join(r if isinstance(r, str) else json.dumps(r) for r in records).encode("utf-8"))
+
+
+def test_detect_format():
+    assert detect_format("feed.CSV") == "csv"
+    assert detect_format("feed.jsonl") == "ndjson"
+    assert detect_format("feed.xlsx") is None and detect_format(None) is None
+
+
+def test_parse_csv_with_bom():
+    stream = io.BytesIO("\ufeffname,price\nKite,\"1,5\"\n".encode("utf-8"))
+    assert list(iter_records(stream, "csv")) == [{"name": "Kite", "price": "1,5"}]
+
+
+def test_parse_ndjson_reports_bad_lines():
+    records = list(iter_records(_ndjson({"name": "Kite"}, "", "{oops", "[1, 2]"), "ndjson"))
+    assert records[0] == {"name": "Kite"}
+    assert records[1]["__error__"].startswith("Invalid JSON")
+    assert records[2]["__error__"] == "Each line must be a JSON object"
+
+
+def test_unknown_format_rejected():
+    with pytest.raises(ValueError):
+        list(iter_records(io.BytesIO(b""), "xml"))
+
+
+def test_column_names_are_normalised():
+    assert _normalize({
+        "Name": "Chess", "Image URL": "a.png", "stock": 3, "Unknown": "x",
+        "categoryAttributes": {"ageRange": "8+", "numberOfPlayers": "2"},
+    }) == {"name": "Chess", "image_url": "a.png", "quantity": 3, "age_range": "8+", "number_of_players": "2"}
+    assert _normalize({"imageUrl": "b.png", "IMAGE": "c.png"}) == {"image_url": "c.png"}
+
+
+def test_import_reports_row_errors(client, db):
+    report = import_catalog(_csv(
+        "Name,Brand,Price,Quantity,Category,Age Range,Number Of Players",
+        "Import Chess,Acme,12.5,3,BoardGame,8+,2",
+        ",Acme,-1,3,Misc,,",
+        "Import Ludo,Acme,7,1,BoardGame,7,2-4",
+    ), "csv", workers=1)
+
+    assert (report.received, report.imported, report.failed) == (3, 1, 2)
+    errors = {failure["row"]: [e["field"] for e in failure["errors"]] for failure in report.errors}
+    assert errors == {2: ["name", "price"], 3: ["age_range"]}
+
+    chess = db.execute(select(DBProduct).where(DBProduct.name == "Import Chess")).scalar_one()
+    assert chess.price == 12.5 and chess.quantity == 3
+    assert chess.category_attributes == {"ageRange": "8+", "numberOfPlayers": "2"}
+
+
+def test_error_details_are_capped(client, monkeypatch):
+    monkeypatch.setattr(importer, "IMPORT_MAX_ERRORS", 2)
+    report = import_catalog(_ndjson(*({"name": "", "brand": "Acme"} for _ in range(5))), "ndjson", workers=1)
+    body = report.to_dict()
+    assert body["failed"] == 5 and len(body["errors"]) == 2 and body["errorsTruncated"]
+
+
+@pytest.fixture
+def reject_trigger():
+    """Make the database refuse products named 'Reject me'."""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TRIGGER reject_products BEFORE INSERT ON products "
+            "WHEN NEW.name = 'Reject me' BEGIN SELECT RAISE(ABORT, 'rejected by trigger'); END"
+        ))
+    yield
+    with engine.begin() as conn:
+        conn.execute(text("DROP TRIGGER reject_products"))
+
+
+def test_rejected_batch_is_retried_row_by_row(client, db, reject_trigger):
+    report = import_catalog(_ndjson(
+        {"name": "Retry One", "brand": "Acme", "price": 1, "category": "Misc"},
+        {"name": "Reject me", "brand": "Acme", "price": 1, "category": "Misc"},
+        {"name": "Retry Two", "brand": "Acme", "price": 1, "category": "Misc", "quantity": 10 ** 20},
+        {"name": "Retry Three", "brand": "Acme", "price": 1, "category": "Misc"},
+    ), "ndjson", workers=1)
+
+    assert (report.imported, report.failed) == (2, 2)
+    messages = {failure["row"]: failure["errors"][0]["message"] for failure in report.errors}
+    assert "rejected by trigger" in messages[2]
+    assert messages[3].startswith("OverflowError")
+    names = set(db.execute(select(DBProduct.name).where(DBProduct.name.like("Retry %"))).scalars())
+    assert names == {"Retry One", "Retry Three"}
+
+
+def test_import_endpoint_validates_inline(client, admin, user, monkeypatch):
+    used_workers = []
+    iter_validated = importer.iter_validated
+
+    def recording(records, workers, chunk_size):
+        used_workers.append(workers)
+        return iter_validated(records, workers, chunk_size)
+
+    monkeypatch.setattr(importer, "iter_validated", recording)
+    feed = b"name,brand,price,quantity,category\nUploaded Kite,Acme,3,2,Misc\n"
+    files = {"file": ("feed.csv", feed, "text/csv")}
+
+    assert client.post("/api/admin/admin/products/import", files=files,
+                       headers=user["headers"]).status_code == 403
+    response = client.post("/api/admin/admin/products/import", files=files, headers=admin["headers"])
+    assert response.status_code == 200
+    assert response.json()["imported"] == 1
+    assert used_workers == [1]
+    assert client.get("/api/products/search/uploaded").json()["count"] == 1
+
+    bad = client.post("/api/admin/admin/products/import", headers=admin["headers"],
+                      files={"file": ("feed.xlsx", b"", "application/octet-stream")})
+    assert bad.status_code == 400
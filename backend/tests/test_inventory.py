@@ -0,0 +1,154 @@
+"""
+Tests for stock reservation/release and the catalog stock patching
+"""
+
+import asyncio
+
+from database import AsyncSessionLocal
+from db_models.order import Order
+from db_models.product import DBProduct
+from services.catalog import _fingerprint_query, get_catalog_snapshot
+from services.inventory import change_order_status, reserve_stock, release_stock
+from utils.query_counter import count_queries
+from utils.response_cache import catalog_response_cache
+
+
+def _stock(db, product_id: int) -> int:
+    db.expire_all()
+    return db.get(DBProduct, product_id).quantity
+
+
+def _order(client, user, *lines):
+    return client.post("/api/orders/orders/", headers=user["headers"], json={
+        "items": [{"productId": str(product_id), "quantity": quantity} for product_id, quantity in lines],
+        "deliveryAddress": "1 Test Lane",
+    })
+
+
+def _run(coroutine_function, *args):
+    async def run():
+        async with AsyncSessionLocal() as session:
+            result = await coroutine_function(session, *args)
+            await session.commit()
+            return result
+    return asyncio.run(run())
+
+
+def test_reserve_and_release_in_one_statement(client, db, make_products):
+    first, second = make_products({"name": "Kite", "quantity": 5}, {"name": "Yo-yo", "quantity": 3})
+
+    with count_queries() as queries:
+        reserved = _run(reserve_stock, {first: 2, second: 3})
+    assert queries.count == 1
+    assert {product_id: row.quantity for product_id, row in reserved.items()} == {first: 3, second: 0}
+
+    with count_queries() as queries:
+        released = _run(release_stock, {first: 2, second: 1})
+    assert queries.count == 1
+    assert sorted((row.id, row.quantity) for row in released) == [(first, 5), (second, 1)]
+
+
+def test_reserve_is_all_or_nothing(client, db, make_products):
+    plenty, scarce = make_products({"name": "Ball", "quantity": 10}, {"name": "Drum", "quantity": 1})
+
+    assert _run(reserve_stock, {plenty: 4, scarce: 2}) is None
+    assert _run(reserve_stock, {plenty: 1, 999999: 1}) is None
+    assert _stock(db, plenty) == 10 and _stock(db, scarce) == 1
+
+
+def test_order_and_cancel_move_stock(client, db, user, make_products):
+    product_id, = make_products({"name": "Robot", "quantity": 4})
+
+    order = _order(client, user, (product_id, 3))
+    assert order.status_code == 200
+    assert _stock(db, product_id) == 1
+    assert _order(client, user, (product_id, 2)).status_code == 400
+
+    cancelled = client.put(f"/api/orders/orders/{order.json()['id']}/cancel", headers=user["headers"])
+    assert cancelled.status_code == 200
+    assert _stock(db, product_id) == 4
+
+
+def test_double_cancel_returns_stock_once(client, db, user, make_products):
+    product_id, = make_products({"name": "Spinning Top", "quantity": 5})
+    order_id = _order(client, user, (product_id, 2)).json()["id"]
+    url = f"/api/orders/orders/{order_id}/cancel"
+
+    assert client.put(url, headers=user["headers"]).status_code == 200
+    assert client.put(url, headers=user["headers"]).status_code == 400
+    assert _stock(db, product_id) == 5
+
+
+def test_concurrent_cancels_claim_the_order_once(client, db, user, make_products):
+    product_id, = make_products({"name": "Marbles", "quantity": 5})
+    order_id = int(_order(client, user, (product_id, 2)).json()["id"])
+
+    async def cancel(session, read_status):
+        if not await change_order_status(session, order_id, read_status, "cancelled"):
+            await session.rollback()
+            return False
+        await release_stock(session, {product_id: 2})
+        await session.commit()
+        return True
+
+    async def race():
+        async with AsyncSessionLocal() as first, AsyncSessionLocal() as second:
+            # Both requests read the order before either one cancels it
+            first_status = (await first.get(Order, order_id)).status
+            second_status = (await second.get(Order, order_id)).status
+            return await cancel(first, first_status), await cancel(second, second_status)
+
+    assert asyncio.run(race()) == (True, False)
+    assert _stock(db, product_id) == 5
+    db.expire_all()
+    assert db.get(Order, order_id).status == "cancelled"
+
+
+def test_admin_reopens_cancelled_order(client, db, user, admin, make_products):
+    product_id, = make_products({"name": "Puzzle", "quantity": 2})
+    order_id = _order(client, user, (product_id, 2)).json()["id"]
+    url = f"/api/admin/admin/orders/{order_id}/status"
+
+    assert client.put(url, params={"status": "cancelled"}).status_code == 401
+    assert client.put(url, params={"status": "cancelled"}, headers=user["headers"]).status_code == 403
+
+    assert client.put(url, params={"status": "cancelled"}, headers=admin["headers"]).status_code == 200
+    assert _stock(db, product_id) == 2
+
+    reopened = client.put(url, params={"status": "processing"}, headers=admin["headers"])
+    assert reopened.status_code == 200
+    assert reopened.json()["status"] == "processing"
+    assert _stock(db, product_id) == 0
+
+    # Cancel again, sell the stock elsewhere, and reopening must fail
+    client.put(url, params={"status": "cancelled"}, headers=admin["headers"])
+    assert _order(client, user, (product_id, 1)).status_code == 200
+    assert client.put(url, params={"status": "pending"}, headers=admin["headers"]).status_code == 400
+    assert _stock(db, product_id) == 1
+
+
+def test_orders_patch_catalog_without_rebuild(client, db, user, make_products):
+    sold, untouched = make_products({"name": "Train", "quantity": 1}, {"name": "Blocks", "quantity": 9})
+    client.get("/api/products/")
+    kept = client.get(f"/api/products/{untouched}")
+    snapshot = get_catalog_snapshot(db)
+
+    assert _order(client, user, (sold, 1)).status_code == 200
+
+    patched = get_catalog_snapshot(db)
+    assert patched.version == snapshot.version + 1
+    product = patched.get_product(sold)
+    assert product["quantity"] == 0 and product["in_stock"] is False
+    assert patched.get_product(untouched) is snapshot.get_product(untouched)
+    # The patch keeps the fingerprint in step, so no rebuild is triggered
+    assert patched.fingerprint == tuple(db.execute(_fingerprint_query()).one())
+
+    listed = {p["id"]: p for p in client.get("/api/products/").json()}
+    assert listed[str(sold)]["quantity"] == 0
+    assert client.get(f"/api/products/{sold}").json()["quantity"] == 0
+
+    # The untouched product's cached response was carried over
+    hits = catalog_response_cache.hits
+    again = client.get(f"/api/products/{untouched}")
+    assert catalog_response_cache.hits == hits + 1
+    assert again.headers["etag"] == kept.headers["etag"]
@@ -0,0 +1,27 @@
+"""
+Tests for the request metrics labels
+"""
+
+from utils.metrics import http_requests_total
+
+
+def _routes():
+    return {dict(labels)["route"] for labels in http_requests_total._values}
+
+
+def test_routes_are_labelled_by_their_template(client, make_products):
+    product_id, = make_products({"name": "Label Lion"})
+    client.get(f"/api/products/{product_id}")
+    client.get("/api/products/search/products")
+    client.get("/health")
+    routes = _routes()
+    assert {"/api/products/{product_id}", "/api/products/search/{query}", "/health"} <= routes
+    assert "/api/{query}/search/{query}" not in routes
+    assert not any(str(product_id) in route for route in routes)
+
+
+def test_unmatched_paths_share_one_label(client):
+    client.get("/api/no-such-route/12345")
+    routes = _routes()
+    assert "unmatched" in routes
+    assert not any("12345" in route for route in routes)
@@ -0,0 +1,54 @@
+"""
+Query budget tests for the order listings (no N+1 item loading)
+"""
+
+import pytest
+
+from utils.query_counter import ORDER_LISTING_QUERY_BUDGET, QueryBudgetExceeded, query_budget
+
+
+@pytest.fixture
+def orders(client, user, make_products):
+    """Several multi-item orders placed by one user."""
+    product_ids = make_products(*({"name": f"Budget {i}", "quantity": 1000} for i in range(4)))
+    for i in range(6):
+        response = client.post("/api/orders/orders/", headers=user["headers"], json={
+            "items": [{"productId": str(product_id), "quantity": i + 1} for product_id in product_ids[:2 + i % 3]],
+            "deliveryAddress": "1 Test Lane",
+        })
+        assert response.status_code == 200
+    return user
+
+
+def _within_budget(client, path, headers, **params):
+    # The first request verifies the token; repeat requests hit the auth cache
+    client.get(path, headers=headers, params=params)
+    with query_budget(ORDER_LISTING_QUERY_BUDGET) as queries:
+        response = client.get(path, headers=headers, params=params)
+    assert response.status_code == 200
+    assert queries.count > 0
+    return response.json()
+
+
+def test_my_orders_within_budget(client, orders):
+    listed = _within_budget(client, "/api/orders/orders/my-orders", orders["headers"])
+    assert len(listed) == 6
+    assert all(len(order["items"]) >= 2 for order in listed)
+
+    page = _within_budget(client, "/api/orders/orders/my-orders", orders["headers"], cursor="", limit=4)
+    assert len(page["items"]) == 4 and page["next_cursor"]
+
+
+def test_admin_orders_within_budget(client, orders, admin):
+    listed = _within_budget(client, "/api/admin/admin/orders", admin["headers"])
+    assert len(listed) >= 6
+    assert all(order["items"] for order in listed)
+
+    page = _within_budget(client, "/api/admin/admin/orders", admin["headers"], cursor="", limit=4)
+    assert len(page["items"]) == 4
+
+
+def test_budget_catches_extra_queries(client, orders):
+    with pytest.raises(QueryBudgetExceeded):
+        with query_budget(0):
+            client.get("/api/orders/orders/my-orders", headers=orders["headers"])
@@ -0,0 +1,75 @@
+"""
+Tests for keyset pagination cursors and the paginated listings
+"""
+
+import base64
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from utils.pagination import encode_cursor, decode_cursor
+
+
+def _raw_cursor(payload) -> str:
+    raw = json.dumps(payload).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def test_cursor_round_trip():
+    created = datetime(2024, 5, 1, 12, 30)
+    assert decode_cursor(encode_cursor(created, 42), datetime, int) == [created, 42]
+    assert decode_cursor(encode_cursor(7), int) == [7]
+
+
+def test_empty_cursor_is_first_page():
+    assert decode_cursor("", int) is None
+
+
+@pytest.mark.parametrize("cursor, types", [
+    ("not base64!", (int,)),
+    (_raw_cursor({"id": 1}), (int,)),
+    (_raw_cursor(["abc"]), (int,)),
+    (_raw_cursor([True]), (int,)),
+    (_raw_cursor([1, 2]), (int,)),
+    (_raw_cursor([{"dt": "yesterday"}, 1]), (datetime, int)),
+    (_raw_cursor([1, 1]), (datetime, int)),
+])
+def test_malformed_cursor_rejected(cursor, types):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, *types)
+    assert error.value.status_code == 400
+
+
+def test_product_cursor_walks_every_product(client, make_products):
+    make_products(*({"name": f"Paged {i}"} for i in range(7)))
+    all_ids = [product["id"] for product in client.get("/api/products/").json()]
+
+    seen, cursor = [], ""
+    while cursor is not None:
+        page = client.get("/api/products/", params={"cursor": cursor, "limit": 3}).json()
+        seen.extend(product["id"] for product in page["items"])
+        cursor = page["next_cursor"]
+    assert seen == all_ids
+
+
+@pytest.mark.parametrize("path", [
+    "/api/products/",
+    "/api/orders/orders/my-orders",
+    "/api/admin/admin/orders",
+    "/api/users/users/",
+])
+def test_listings_reject_bad_cursor(client, admin, path):
+    response = client.get(path, params={"cursor": _raw_cursor(["abc"])}, headers=admin["headers"])
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("path", [
+    "/api/admin/admin/dashboard",
+    "/api/admin/admin/orders",
+    "/api/users/users/",
+])
+def test_admin_listings_require_admin(client, user, path):
+    assert client.get(path).status_code == 401
+    assert client.get(path, headers=user["headers"]).status_code == 403
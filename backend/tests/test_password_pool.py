@@ -0,0 +1,59 @@
+"""
+Tests for the bounded password hashing pool
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from utils.security import PasswordHashPool, PasswordHasherBusyError, get_password_hash, verify_password
+
+
+def test_hash_and_verify_on_pool():
+    pool = PasswordHashPool(workers=2, max_queue=2)
+
+    async def run():
+        hashed = await pool.run(get_password_hash, "secret123")
+        return await pool.run(verify_password, "secret123", hashed)
+
+    try:
+        assert asyncio.run(run()) is True
+        assert pool.get_stats()["completed"] == 2
+    finally:
+        pool.shutdown()
+
+
+def test_cancelled_caller_keeps_slot_until_work_finishes():
+    pool = PasswordHashPool(workers=1, max_queue=0)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_hash():
+        started.set()
+        release.wait(5)
+        return "hashed"
+
+    async def run():
+        waiter = asyncio.ensure_future(pool.run(slow_hash))
+        await asyncio.to_thread(started.wait, 5)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        # The worker is still hashing, so the pool is still full
+        assert pool.get_stats()["in_flight"] == 1
+        with pytest.raises(PasswordHasherBusyError):
+            await pool.run(slow_hash)
+
+        release.set()
+        for _ in range(100):
+            if pool.get_stats()["in_flight"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert await pool.run(lambda: "free") == "free"
+
+    try:
+        asyncio.run(run())
+    finally:
+        release.set()
+        pool.shutdown()
@@ -0,0 +1,93 @@
+"""
+Tests for the columnar ProductTable and its edge cases
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from models import Product, ProductTable
+
+
+ROWS = [(1, 100.0, 0, "Plush"), (2, 19.99, 3, "Electronic"), (3, 2500.0, 40, "Plush"), (4, 0.5, None, "Misc")]
+
+
+def _product(product_id, price, quantity, category):
+    return Product(id=product_id, name=f"Toy {product_id}", brand="Acme", price=price, quantity=quantity or 0,
+                   description="", image_url="", category=category)
+
+
+@pytest.fixture
+def table():
+    return ProductTable.from_rows(ROWS)
+
+
+@pytest.mark.parametrize("build", [
+    lambda: ProductTable.from_rows([]),
+    lambda: ProductTable.from_products([]),
+    lambda: ProductTable.from_columns([], [], [], []),
+])
+def test_empty_table(build):
+    empty = build()
+    assert len(empty) == 0 and empty.categories == []
+    assert empty.low_stock().tolist() == []
+    assert empty.within_price_range(0, 100).tolist() == []
+    assert empty.category_mask("Plush").tolist() == []
+    assert empty.stock_percentages(10).tolist() == []
+    assert empty.restock_quantities(10).tolist() == []
+    assert empty.apply_discount(10).tolist() == []
+    assert empty.inventory_value() == 0.0
+    assert empty.to_products({}) == []
+    with pytest.raises(ValueError):
+        empty.apply_discount(101)
+
+
+def test_missing_quantity_counts_as_zero(table):
+    assert table.quantities.tolist() == [0, 3, 40, 0]
+    assert table.in_stock_mask().tolist() == [False, True, True, False]
+
+
+def test_unknown_category_matches_nothing(table):
+    assert table.categories == ["Plush", "Electronic", "Misc"]
+    assert table.category_mask("BoardGame").tolist() == [False] * 4
+    assert table.ids[table.category_mask("Plush")].tolist() == [1, 3]
+    assert table.inventory_value(table.category_mask("BoardGame")) == 0.0
+
+
+def test_non_positive_initial_stock_gives_zero_percent(table):
+    assert table.stock_percentages(0).tolist() == [0.0] * 4
+    assert table.stock_percentages(-5).tolist() == [0.0] * 4
+    assert table.stock_percentages([10, 0, -1, 7]).tolist() == [0.0, 0.0, 0.0, 0.0]
+    assert table.stock_percentages([10, 6, 0, 7]).tolist() == [0.0, 50.0, 0.0, 0.0]
+
+
+def test_stock_percentages_match_products(table):
+    products = [_product(*row) for row in ROWS]
+    for initial in (0, -3, 1, 3, 7, 80, 333):
+        assert table.stock_percentages(initial).tolist() == [p.get_stock_percentage(initial) for p in products]
+
+
+@pytest.mark.parametrize("discount", [-0.01, 100.01, [10, 20, -1, 0], [0, 0, 0, 150]])
+def test_discount_outside_range_rejected(table, discount):
+    with pytest.raises(ValueError, match="between 0 and 100"):
+        table.apply_discount(discount)
+
+
+def test_discount_bounds_and_parity(table):
+    assert table.apply_discount(0).tolist() == table.prices.tolist()
+    assert table.apply_discount(100).tolist() == [0.0] * 4
+    products = [_product(*row) for row in ROWS]
+    for discount in (12.5, 33, 50):
+        assert table.apply_discount(discount).tolist() == [p.apply_discount(discount) for p in products]
+
+
+def test_restock_and_price_range(table):
+    assert table.restock_quantities(5).tolist() == [5, 2, 0, 5]
+    assert table.restock_quantities([0, 3, 50, -1]).tolist() == [0, 0, 10, 0]
+    assert table.within_price_range(19.99, 100).tolist() == [1, 2]
+    assert table.within_price_range(100, 19.99).tolist() == []
+
+
+def test_mismatched_columns_rejected():
+    with pytest.raises(ValueError, match="same length"):
+        ProductTable([1, 2], [1.0], [1, 2], [0, 0], ["Plush"])
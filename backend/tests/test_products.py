@@ -0,0 +1,84 @@
+"""
+Tests for the product routes
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import update
+
+import services.catalog as catalog
+from database import engine
+from db_models.product import DBProduct
+from services.catalog import get_catalog_snapshot, get_catalog_version
+from utils.query_counter import count_queries
+
+NEW_PRODUCT = {"name": "Guarded Kite", "brand": "Acme", "price": 5.0, "quantity": 2,
+               "category": "Misc", "description": "Should never be written"}
+
+
+@pytest.mark.parametrize("method, path", [
+    ("post", "/api/products/"),
+    ("put", "/api/products/{id}"),
+    ("delete", "/api/products/{id}"),
+])
+def test_product_writes_require_admin(client, db, user, make_products, method, path):
+    product_id, = make_products({"name": "Guarded", "quantity": 7})
+    url = path.format(id=product_id)
+    params = NEW_PRODUCT if method == "post" else {"quantity": 0}
+
+    assert getattr(client, method)(url, params=params).status_code == 401
+    assert getattr(client, method)(url, params=params, headers=user["headers"]).status_code == 403
+
+    db.expire_all()
+    assert db.get(DBProduct, product_id).quantity == 7
+    assert db.query(DBProduct).filter_by(name=NEW_PRODUCT["name"]).count() == 0
+
+
+def _listed(client, **params):
+    return {product["id"]: product for product in client.get("/api/products/", params=params).json()}
+
+
+def test_reads_share_one_snapshot(client, db, make_products):
+    make_products({"name": "Snapshot Ball"})
+    first = get_catalog_snapshot(db)
+    with count_queries() as queries:
+        assert get_catalog_snapshot(db) is first
+        client.get("/api/products/")
+        client.get("/api/products/")
+    assert queries.count == 0
+
+
+def test_writes_bump_version_and_refresh_responses(client, db, admin):
+    version = get_catalog_version()
+    created = client.post("/api/products/", params=NEW_PRODUCT | {"name": "Versioned Robot"},
+                          headers=admin["headers"]).json()
+    product_id = created["id"]
+    assert get_catalog_version() > version
+    assert _listed(client)[product_id]["name"] == "Versioned Robot"
+
+    before = client.get(f"/api/products/{product_id}")
+    assert client.get(f"/api/products/{product_id}",
+                      headers={"If-None-Match": before.headers["etag"]}).status_code == 304
+
+    client.put(f"/api/products/{product_id}", params={"price": 42.0}, headers=admin["headers"])
+    after = client.get(f"/api/products/{product_id}", headers={"If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200 and after.json()["price"] == 42.0
+    assert _listed(client)[product_id]["price"] == 42.0
+    assert get_catalog_snapshot(db).get_product(product_id)["price"] == 42.0
+
+    client.delete(f"/api/products/{product_id}", headers=admin["headers"])
+    assert client.get(f"/api/products/{product_id}").status_code == 404
+    assert product_id not in _listed(client)
+
+
+def test_writes_by_other_processes_are_picked_up(client, make_products, monkeypatch):
+    product_id, = make_products({"name": "Elsewhere", "price": 3.0})
+    assert _listed(client)[str(product_id)]["price"] == 3.0
+
+    # A write this process never hears about, as from another worker
+    with engine.begin() as conn:
+        conn.execute(update(DBProduct).where(DBProduct.id == product_id)
+                     .values(price=9.0, updated_at=datetime.utcnow()))
+    monkeypatch.setattr(catalog, "CATALOG_SYNC_SECONDS", 0)
+    assert _listed(client)[str(product_id)]["price"] == 9.0
@@ -0,0 +1,119 @@
+"""
+Tests for read replica routing
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import database
+from database import Base, ReplicaSet, SessionLocal
+from db_models.product import DBProduct
+
+
+class StubLagReplicaSet(ReplicaSet):
+    """Replica set whose lag checks report fixed lags, None for an unreachable replica."""
+
+    def __init__(self, engines, lags, **kwargs):
+        super().__init__(engines, **kwargs)
+        self.lags = lags
+
+    def _lag_query(self, replica):
+        lag = self.lags[int(replica.name)]
+        return text("SELECT missing_column" if lag is None else f"SELECT {lag}")
+
+
+@pytest.fixture
+def replica_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/replica.db")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def no_recent_write(monkeypatch):
+    monkeypatch.setattr(database, "_last_primary_write", float("-inf"))
+
+
+def _engines(tmp_path, count, create=create_engine, driver="sqlite"):
+    return [create(f"{driver}:///{tmp_path}/replica{index}.db") for index in range(count)]
+
+
+def test_lagging_and_unreachable_replicas_are_skipped(tmp_path, no_recent_write):
+    engines = _engines(tmp_path, 3)
+    replica_set = StubLagReplicaSet(engines, [30, None, 0], max_lag=2)
+
+    assert {replica_set.choose() for _ in range(6)} == {engines[2]}
+    stats = replica_set.get_stats()
+    assert stats["sessions"] == {"replica": 6, "primary": 0}
+    assert [(r["healthy"], r["lag"]) for r in stats["replicas"]] == [(True, 30), (False, float("inf")), (True, 0)]
+
+
+def test_all_replicas_lagging_falls_back_to_primary(tmp_path, no_recent_write):
+    replica_set = StubLagReplicaSet(_engines(tmp_path, 2), [5, 30], max_lag=2)
+
+    assert replica_set.choose() is None
+    assert replica_set.get_stats()["sessions"] == {"replica": 0, "primary": 1}
+
+
+def test_async_choice_skips_lagging_replica(tmp_path, no_recent_write):
+    engines = _engines(tmp_path, 2, create_async_engine, "sqlite+aiosqlite")
+    replica_set = StubLagReplicaSet(engines, [30, 0], max_lag=2)
+
+    async def choose_twice():
+        try:
+            return [await replica_set.choose_async() for _ in range(2)]
+        finally:
+            for engine in engines:
+                await engine.dispose()
+
+    assert asyncio.run(choose_twice()) == [engines[1], engines[1]]
+
+
+def test_writes_go_to_primary(client, db, replica_engine):
+    session = SessionLocal(reader=replica_engine)
+    try:
+        # Reads outside a write come from the replica, which is empty
+        assert session.execute(select(DBProduct.id)).first() is None
+
+        session.add(DBProduct(name="Routed Rocket", brand="Acme", price=100, quantity=1,
+                              category="Plush Toys", description=""))
+        session.flush()
+        # Once the transaction has written it reads its own changes from the primary
+        assert session.execute(select(DBProduct.id).where(DBProduct.name == "Routed Rocket")).first()
+        session.commit()
+    finally:
+        session.close()
+
+    assert db.execute(select(DBProduct).where(DBProduct.name == "Routed Rocket")).scalar_one()
+    with replica_engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM products")).scalar() == 0
+
+
+def test_reads_stay_on_primary_after_a_write(client, replica_engine, no_recent_write):
+    replica_set = StubLagReplicaSet([replica_engine], [0], max_lag=2)
+    assert replica_set.choose() is replica_engine
+
+    session = SessionLocal()
+    try:
+        session.add(DBProduct(name="Fresh Frisbee", brand="Acme", price=100, quantity=1,
+                              category="Plush Toys", description=""))
+        session.commit()
+    finally:
+        session.close()
+
+    # Within max_lag of this process's write, replicas may not have it yet
+    assert replica_set.choose() is None
+
+    # A read-only commit does not pin reads to the primary
+    database._last_primary_write = float("-inf")
+    session = SessionLocal()
+    try:
+        session.execute(select(DBProduct.id)).all()
+        session.commit()
+    finally:
+        session.close()
+    assert replica_set.choose() is replica_engine
@@ -0,0 +1,81 @@
+"""
+Tests for ETag revalidation of cached catalog responses
+"""
+
+import pytest
+
+from utils.response_cache import etag_matches
+
+
+ETAG = '"abc123"'
+
+
+@pytest.mark.parametrize("header, matches", [
+    (None, False),
+    ("", False),
+    ('"abc123"', True),
+    ('W/"abc123"', True),
+    ('"other", W/"abc123" , "more"', True),
+    ("*", True),
+    ('"other", "more"', False),
+    ('"abc12"', False),
+    ("abc123", False),
+])
+def test_etag_matches(header, matches):
+    assert etag_matches(header, ETAG) is matches
+
+
+def test_matching_etag_returns_empty_304(client, make_products):
+    product_id, = make_products({"name": "Etag Elephant"})
+    url = f"/api/products/{product_id}"
+    first = client.get(url)
+    etag = first.headers["etag"]
+
+    for header in (etag, f"W/{etag}", f'"stale", {etag}', "*"):
+        revalidated = client.get(url, headers={"If-None-Match": header})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated.headers["etag"] == etag
+        assert revalidated.headers["cache-control"] == first.headers["cache-control"]
+
+    stale = client.get(url, headers={"If-None-Match": '"stale"'})
+    assert stale.status_code == 200
+    assert stale.json() == first.json()
+
+
+def test_each_encoding_has_its_own_etag(client, make_products):
+    make_products(*({"name": f"Variant Vulture {n}", "description": "x" * 100} for n in range(10)))
+    plain = client.get("/api/products/", headers={"Accept-Encoding": "identity"})
+    gzipped = client.get("/api/products/", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert plain.headers["etag"] != gzipped.headers["etag"]
+
+    # The identity ETag does not validate the gzip representation
+    assert client.get("/api/products/", headers={"Accept-Encoding": "gzip",
+                                                 "If-None-Match": plain.headers["etag"]}).status_code == 200
+    assert client.get("/api/products/", headers={"Accept-Encoding": "gzip",
+                                                 "If-None-Match": gzipped.headers["etag"]}).status_code == 304
+
+
+def test_no_etag_on_errors(client):
+    missing = client.get("/api/products/999999999", headers={"If-None-Match": "*"})
+    assert missing.status_code == 404
+    assert "etag" not in missing.headers
+
+    bad_cursor = client.get("/api/products/", params={"cursor": "not-a-cursor"})
+    assert bad_cursor.status_code == 400
+    assert "etag" not in bad_cursor.headers
+
+
+def test_no_etag_on_writes(client, admin, make_products):
+    product_id, = make_products({"name": "Write Walrus"})
+    etag = client.get(f"/api/products/{product_id}").headers["etag"]
+
+    updated = client.put(f"/api/products/{product_id}", params={"price": 250},
+                         headers={**admin["headers"], "If-None-Match": etag})
+    assert updated.status_code == 200
+    assert "etag" not in updated.headers
+
+    deleted = client.delete(f"/api/products/{product_id}", headers=admin["headers"])
+    assert deleted.status_code == 200
+    assert "etag" not in deleted.headers
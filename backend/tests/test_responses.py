@@ -0,0 +1,35 @@
+"""
+Tests for the fast JSON response encoding
+"""
+
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from models.plush_toy import PlushToy
+from utils.responses import dump_json
+
+
+def test_datetimes_encode_as_isoformat():
+    for value in (datetime(2024, 1, 2, 3, 4, 5), datetime(2024, 1, 2, 3, 4, 5, 678),
+                  datetime(2024, 1, 2, tzinfo=timezone.utc)):
+        assert dump_json({"at": value}) == f'{{"at":"{value.isoformat()}"}}'.encode()
+
+
+def test_decimals_and_sets_encode():
+    assert dump_json([Decimal("3"), Decimal("1.5"), {7}]) == b"[3,1.5,[7]]"
+
+
+def test_model_timestamps_in_responses(client, make_products):
+    product_id, = make_products({"name": "Clock"})
+    product = client.get(f"/api/products/{product_id}").json()
+    assert datetime.fromisoformat(product["created_at"]) <= datetime.fromisoformat(product["updated_at"])
+
+
+def test_oop_product_json_is_plain_json():
+    toy = PlushToy(id=1, name="Teddy", brand="Cuddle Co", price=1500, quantity=3,
+                   description="Soft", image_url="", material="Cotton", size="Small",
+                   created_at=datetime(2024, 1, 2, 3, 4, 5))
+    data = json.loads(json.dumps(toy.to_json()))
+    assert data["created_at"] == "2024-01-02T03:04:05"
+    assert data["material"] == "Cotton"
@@ -0,0 +1,88 @@
+"""
+Tests for the product search index: ranking, prefix matching and updates
+"""
+
+from models.product import Product
+from services.search import ProductSearchIndex, tokenize
+
+
+def _product(product_id: int, name: str, brand: str = "Acme", description: str = "",
+             category: str = "Plush Toys") -> Product:
+    return Product(id=product_id, name=name, brand=brand, price=10.0, quantity=1,
+                   description=description, image_url="", category=category)
+
+
+def _index(*products: Product) -> ProductSearchIndex:
+    index = ProductSearchIndex()
+    for product in products:
+        index.add_product(product)
+    return index
+
+
+def _ids(results):
+    return [product_id for product_id, _ in results]
+
+
+def test_tokenize_lowercases_and_splits():
+    assert tokenize("Super-Robot 3000, LEGO!") == ["super", "robot", "3000", "lego"]
+    assert tokenize("") == []
+
+
+def test_name_match_outranks_description_match():
+    index = _index(
+        _product(1, "Teddy Bear", description="A soft robot companion"),
+        _product(2, "Robot Builder", description="Snap together parts"),
+    )
+    assert _ids(index.search("robot")) == ["2", "1"]
+
+
+def test_rare_terms_weigh_more():
+    index = _index(
+        _product(1, "Wooden Train"),
+        _product(2, "Wooden Blocks"),
+        _product(3, "Wooden Dinosaur"),
+    )
+    assert _ids(index.search("wooden dinosaur")) == ["3"]
+    top, = index.search("dinosaur")
+    assert top[1] > max(score for _, score in index.search("wooden"))
+
+
+def test_every_term_must_match():
+    index = _index(_product(1, "Red Car"), _product(2, "Blue Car"))
+    assert _ids(index.search("red car")) == ["1"]
+    assert index.search("green car") == []
+
+
+def test_last_term_matches_as_prefix():
+    index = _index(_product(1, "Robot Dog"), _product(2, "Robin Puppet"), _product(3, "Rocket"))
+    assert set(_ids(index.search("rob"))) == {"1", "2"}
+    assert _ids(index.search("dog ro")) == ["1"]
+    # Only the last term is a prefix
+    assert index.search("rob dog") == []
+
+
+def test_exact_match_outranks_prefix_match():
+    index = _index(_product(1, "Car Garage"), _product(2, "Cart Racer"))
+    assert _ids(index.search("car"))[0] == "1"
+
+
+def test_updates_and_removals():
+    index = _index(_product(1, "Kite"), _product(2, "Yo-yo"))
+    index.add_product(_product(1, "Glider"))
+    assert index.search("kite") == []
+    assert _ids(index.search("glider")) == ["1"]
+
+    index.remove_product(2)
+    assert index.search("yo") == [] and len(index) == 1
+
+
+def test_search_endpoint_sees_writes(client, admin):
+    created = client.post("/api/products/", headers=admin["headers"], params={
+        "name": "Zeppelin Kit", "brand": "Skyworks", "price": 30.0, "quantity": 5,
+        "category": "Board Games", "description": "Build a flying zeppelin",
+    }).json()
+    found = client.get("/api/products/search/zepp").json()
+    assert [product["id"] for product in found["results"]] == [created["id"]]
+
+    client.delete(f"/api/products/{created['id']}", headers=admin["headers"])
+    assert client.get("/api/products/search/zeppelin").json()["count"] == 0
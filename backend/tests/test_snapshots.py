@@ -0,0 +1,101 @@
+"""
+Tests for committed-change listeners feeding the process-wide caches
+"""
+
+import asyncio
+
+from sqlalchemy import update
+
+from database import AsyncSessionLocal, SessionLocal
+from db_models.product import DBProduct
+from utils.snapshots import CommittedChanges
+
+
+applied = []
+
+
+def _collect_product_names(session, pending):
+    pending.update(obj.name for obj in list(session.new) + list(session.dirty)
+                   if isinstance(obj, DBProduct))
+
+
+_changes = CommittedChanges("test_product_names", set, _collect_product_names, applied.append)
+
+
+def _product(name):
+    return DBProduct(name=name, brand="Acme", price=100, quantity=1, category="Plush Toys", description="")
+
+
+def _applied_names():
+    return set().union(*applied) if applied else set()
+
+
+def test_changes_apply_only_after_commit(client):
+    applied.clear()
+    session = SessionLocal()
+    try:
+        session.add(_product("Committed Cube"))
+        session.flush()
+        assert applied == []
+        assert "Committed Cube" in _changes.pending(session)
+
+        session.commit()
+        assert _applied_names() == {"Committed Cube"}
+        assert _changes.key not in session.info
+    finally:
+        session.close()
+
+
+def test_rolled_back_changes_are_never_applied(client):
+    applied.clear()
+    session = SessionLocal()
+    try:
+        session.add(_product("Rolled Back Rattle"))
+        session.flush()
+        session.rollback()
+        assert applied == []
+
+        # The dropped changes do not leak into the session's next transaction
+        session.add(_product("Next Transaction Top"))
+        session.commit()
+        assert _applied_names() == {"Next Transaction Top"}
+    finally:
+        session.close()
+
+
+def test_manual_pending_changes_follow_the_transaction(client):
+    applied.clear()
+    session = SessionLocal()
+    try:
+        # As after a bulk UPDATE, which the flush listener never sees
+        session.execute(update(DBProduct).where(DBProduct.id == -1).values(quantity=0))
+        _changes.pending(session).add("Bulk Ball")
+        session.rollback()
+        session.commit()
+        assert applied == []
+
+        session.execute(update(DBProduct).where(DBProduct.id == -1).values(quantity=0))
+        _changes.pending(session).add("Bulk Ball")
+        session.commit()
+        assert _applied_names() == {"Bulk Ball"}
+    finally:
+        session.close()
+
+
+def test_async_sessions_apply_on_commit_only(client):
+    applied.clear()
+
+    async def run():
+        async with AsyncSessionLocal() as session:
+            session.add(_product("Async Abacus"))
+            await session.flush()
+            await session.rollback()
+            assert applied == []
+
+            session.add(_product("Async Accordion"))
+            await session.flush()
+            assert applied == []
+            await session.commit()
+
+    asyncio.run(run())
+    assert _applied_names() == {"Async Accordion"}
@@ -0,0 +1,58 @@
+"""
+Tests for product spec validation
+"""
+
+import pytest
+
+from services.validation import (
+    parse_age_range,
+    parse_player_count,
+    parse_voltage,
+    validate_chunk,
+    validate_product_data,
+)
+
+
+def _record(**overrides):
+    record = {"name": "Meeple Quest", "brand": "Acme", "price": "19.99", "quantity": "4",
+              "category": "BoardGame", "age_range": "8+", "number_of_players": "2-4"}
+    record.update(overrides)
+    return record
+
+
+def _error_fields(result):
+    return [error["field"] for error in result.errors]
+
+
+def test_valid_record_is_cleaned_and_parsed():
+    result = validate_product_data(_record())
+    assert result.valid
+    assert result.data["price"] == 19.99 and result.data["quantity"] == 4
+    assert result.specs == {"min_age": 8, "min_players": 2, "max_players": 4}
+
+
+def test_every_failing_field_is_reported():
+    result = validate_product_data(_record(name="", price="-1", quantity="2.5", age_range="7"))
+    assert _error_fields(result) == ["name", "price", "quantity", "age_range"]
+    assert result.specs == {}
+
+
+@pytest.mark.parametrize("price", [10 ** 400, "1e999", "nan", "inf", "cheap", None])
+def test_unrepresentable_numbers_are_field_errors(price):
+    result = validate_product_data(_record(price=price))
+    assert _error_fields(result) == ["price"]
+
+
+def test_overflowing_number_does_not_abort_the_chunk():
+    results = validate_chunk([_record(quantity=10 ** 400), _record()])
+    assert _error_fields(results[0]) == ["quantity"]
+    assert results[1].valid
+
+
+def test_spec_parsers():
+    assert parse_voltage(" 4.5 V ") == 4.5 and parse_voltage("lots") is None
+    assert parse_player_count("Solo") == (1, 1)
+    assert parse_player_count("3+") == (3, None)
+    assert parse_player_count("4-2") is None
+    assert parse_player_count("1" * 5000) is None
+    assert parse_age_range("12+") == 12
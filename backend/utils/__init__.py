@@ -1,16 +1,4 @@
 """
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-Utils package - security and dependencies.
-"""
-from .security import hash_password, verify_password, create_access_token, verify_token
-from .deps import get_db, get_current_user, get_current_admin_user
-=======
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
 Wonderland Toy Store - Utilities Package
 """
 
@@ -20,7 +8,7 @@ from utils.security import (
     create_access_token,
     decode_access_token
 )
-from utils.deps import get_db, get_current_user, get_current_admin
+from utils.deps import get_db, get_async_db, get_async_read_db, get_current_user, get_current_admin
 
 __all__ = [
     'verify_password',
@@ -28,13 +16,8 @@ __all__ = [
     'create_access_token',
     'decode_access_token',
     'get_db',
+    'get_async_db',
+    'get_async_read_db',
     'get_current_user',
     'get_current_admin'
 ]
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
@@ -0,0 +1,189 @@
+"""
+Auth Cache - Bounded TTL cache of verified tokens and their users
+
+Every authenticated request would otherwise verify the JWT signature, parse
+its claims and load the user row. Repeat callers present the same token, so
+the verified claims and a detached snapshot of the user are cached per token
+until the token expires, the TTL runs out, or the user changes.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db_models.user import User
+from utils.snapshots import CommittedChanges
+
+
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "300"))
+
+
+class UserPrincipal:
+    """
+    Lightweight, session-independent snapshot of an authenticated user.
+
+    Exposes the same read-only attributes routes use from the User model, so
+    it can be returned by the auth dependencies without holding an ORM
+    instance (and its session) across requests.
+    """
+
+    __slots__ = ("id", "email", "name", "role", "created_at")
+
+    def __init__(self, id: int, email: str, name: str, role: str,
+                 created_at: Optional[datetime] = None):
+        self.id = id
+        self.email = email
+        self.name = name
+        self.role = role
+        self.created_at = created_at
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserPrincipal":
+        """Create a principal from a User row."""
+        return cls(user.id, user.email, user.name, user.role, user.created_at)
+
+    def to_dict(self) -> dict:
+        """Convert principal to dictionary for API responses."""
+        return {
+            "id": str(self.id),
+            "email": self.email,
+            "name": self.name,
+            "role": self.role,
+            "createdAt": self.created_at
+        }
+
+    def __repr__(self):
+        return f"<UserPrincipal(id={self.id}, email={self.email}, role={self.role})>"
+
+
+class AuthCache:
+    """
+    LRU cache mapping a token to its verified claims and user principal.
+
+    Entries expire at the earlier of the cache TTL and the token's own
+    ``exp`` claim, so a cached token is never honoured past its expiry.
+    """
+
+    def __init__(self, max_size: int = AUTH_CACHE_SIZE, ttl_seconds: float = AUTH_CACHE_TTL_SECONDS):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached tokens
+            ttl_seconds: Maximum time a token stays cached
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, dict, UserPrincipal]]" = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[Tuple[dict, UserPrincipal]]:
+        """
+        Look up a token.
+
+        Args:
+            token: Raw bearer token
+
+        Returns:
+            tuple: (claims, principal), or None if not cached or expired
+        """
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, claims, principal = entry
+            if expires_at <= time.monotonic():
+                self._discard(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return claims, principal
+
+    def put(self, token: str, claims: dict, principal: UserPrincipal) -> None:
+        """
+        Cache a verified token.
+
+        Args:
+            token: Raw bearer token
+            claims: Decoded token payload
+            principal: User the token resolved to
+        """
+        ttl = self.ttl_seconds
+        exp = claims.get("exp")
+        if exp is not None:
+            ttl = min(ttl, float(exp) - time.time())
+        if ttl <= 0 or self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._discard(token)
+            self._entries[token] = (time.monotonic() + ttl, claims, principal)
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+            while len(self._entries) > self.max_size:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int) -> None:
+        """
+        Drop every cached token belonging to a user.
+
+        Args:
+            user_id: ID of the user that changed
+        """
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._discard(token)
+
+    def clear(self) -> None:
+        """Drop every cached token."""
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _discard(self, token: str) -> None:
+        """Remove a token; caller must hold the lock."""
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        user_id = entry[2].id
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+auth_cache = AuthCache()
+
+
+def _collect_changed_users(session: Session, changed: set) -> None:
+    for instance in list(session.dirty) + list(session.deleted):
+        if isinstance(instance, User) and instance.id is not None:
+            changed.add(instance.id)
+
+
+def _invalidate_changed_users(changed: set) -> None:
+    for user_id in changed:
+        auth_cache.invalidate_user(user_id)
+
+
+# Invalidate cached principals whenever a user row is updated or deleted.
+# IDs are collected at flush time but only invalidated after the commit, so a
+# concurrent request cannot re-cache the pre-commit row. Bulk query.update()
+# and query.delete() bypass these events and must call invalidate_user().
+_changes = CommittedChanges("auth_cache_user_ids", set, _collect_changed_users, _invalidate_changed_users)
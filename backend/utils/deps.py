@@ -1,42 +1,21 @@
 """
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-FastAPI dependencies for authentication and database sessions.
-"""
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from typing import Optional
-
-from database import SessionLocal
-from .security import verify_token
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
-
-
-def get_db():
-    """Get database session dependency."""
-=======
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
 Dependencies - FastAPI dependency injection for auth and database
 """
 
-from typing import Generator, Optional
+from typing import AsyncGenerator, Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import SessionLocal
+from database import SessionLocal, AsyncSessionLocal, async_replicas
 from db_models.user import User
 from utils.security import decode_access_token
+from utils.auth_cache import auth_cache, UserPrincipal
 
 
 # OAuth2 scheme for token authentication
@@ -51,13 +30,6 @@ def get_db() -> Generator:
     Yields:
         Session: SQLAlchemy database session
     """
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
     db = SessionLocal()
     try:
         yield db
@@ -65,61 +37,83 @@ def get_db() -> Generator:
         db.close()
 
 
-async def get_current_user(
-    token: Optional[str] = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-):
-    """Get the current authenticated user."""
-    from db_models import User
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function to get an async database session.
+    Use this from async route handlers so queries don't block the event loop.
     
-    if not token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    Yields:
+        AsyncSession: SQLAlchemy async database session
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function to get an async session for read-only endpoints.
+    Reads go to a read replica when one is configured and current, and to
+    the primary otherwise; any write still goes to the primary.
     
-    payload = verify_token(token)
+    Yields:
+        AsyncSession: SQLAlchemy async database session
+    """
+    replica = await async_replicas.choose_async()
+    async with AsyncSessionLocal(reader=replica.sync_engine if replica is not None else None) as db:
+        yield db
+
+
+async def _resolve_user(token: str, db: AsyncSession) -> Optional[UserPrincipal]:
+    """
+    Resolve a bearer token to a user, consulting the auth cache first.
+    
+    Args:
+        token: JWT token from Authorization header
+        db: Database session, only used on a cache miss
+        
+    Returns:
+        UserPrincipal or None: The user, or None if the token is invalid
+    """
+    cached = auth_cache.get(token)
+    if cached is not None:
+        return cached[1]
+    
+    # Decode the token
+    payload = decode_access_token(token)
     if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        return None
     
-    user_id = payload.get("sub")
+    # Get user_id from token
+    user_id: Optional[int] = payload.get("user_id")
     if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token payload",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        return None
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    # Fetch user from database
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-=======
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
-) -> User:
+        return None
+    
+    principal = UserPrincipal.from_user(user)
+    auth_cache.put(token, payload, principal)
+    return principal
+
+
+async def get_current_user(
+    token: Optional[str] = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> UserPrincipal:
     """
     Dependency to get the current authenticated user from JWT token.
+    Repeat callers are served from the auth cache without re-verifying
+    the token or querying the database.
     
     Args:
         token: JWT token from Authorization header
         db: Database session
         
     Returns:
-        User: The authenticated user
+        UserPrincipal: The authenticated user
         
     Raises:
         HTTPException: If token is invalid or user not found
@@ -133,47 +127,17 @@ async def get_current_user(
     if not token:
         raise credentials_exception
     
-    # Decode the token
-    payload = decode_access_token(token)
-    if payload is None:
-        raise credentials_exception
-    
-    # Get user_id from token
-    user_id: Optional[int] = payload.get("user_id")
-    if user_id is None:
-        raise credentials_exception
-    
-    # Fetch user from database
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
+    principal = await _resolve_user(token, db)
+    if principal is None:
         raise credentials_exception
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
     
-    return user
+    return principal
 
 
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-async def get_current_admin_user(
-    current_user = Depends(get_current_user)
-):
-    """Get the current user and verify they are an admin."""
-=======
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
 async def get_current_user_optional(
     token: Optional[str] = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> Optional[User]:
+    db: AsyncSession = Depends(get_async_db)
+) -> Optional[UserPrincipal]:
     """
     Dependency to optionally get the current authenticated user.
     Returns None if no token or invalid token.
@@ -183,26 +147,17 @@ async def get_current_user_optional(
         db: Database session
         
     Returns:
-        User or None: The authenticated user or None
+        UserPrincipal or None: The authenticated user or None
     """
     if not token:
         return None
     
-    payload = decode_access_token(token)
-    if payload is None:
-        return None
-    
-    user_id: Optional[int] = payload.get("user_id")
-    if user_id is None:
-        return None
-    
-    user = db.query(User).filter(User.id == user_id).first()
-    return user
+    return await _resolve_user(token, db)
 
 
 async def get_current_admin(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: UserPrincipal = Depends(get_current_user)
+) -> UserPrincipal:
     """
     Dependency to get the current user and verify they are an admin.
     
@@ -210,51 +165,14 @@ async def get_current_admin(
         current_user: The authenticated user
         
     Returns:
-        User: The authenticated admin user
+        UserPrincipal: The authenticated admin user
         
     Raises:
         HTTPException: If user is not an admin
     """
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required"
         )
     return current_user
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-
-
-async def get_optional_user(
-    token: Optional[str] = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
-    """Get the current user if authenticated, otherwise return None."""
-    from db_models import User
-    
-    if not token:
-        return None
-    
-    payload = verify_token(token)
-    if payload is None:
-        return None
-    
-    user_id = payload.get("sub")
-    if user_id is None:
-        return None
-    
-    return db.query(User).filter(User.id == int(user_id)).first()
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
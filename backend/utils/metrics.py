@@ -0,0 +1,475 @@
+"""
+Metrics - Request, database and cache instrumentation in Prometheus format
+
+``MetricsMiddleware`` times every request per route template and tracks how
+many are in flight; SQLAlchemy engine events time every statement and
+attribute it to the request that ran it. Password hashing, cache and
+connection pool figures are collected from their owners when ``/metrics``
+is scraped, so the hot paths pay nothing extra for them.
+
+Latency is exported both as Prometheus histograms (for
+``histogram_quantile`` across instances) and as p50/p95/p99 summaries over a
+sliding window of recent requests per route.
+"""
+
+import bisect
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from database import async_engine, async_replicas, async_writer_engine, engine, writer_engine
+from utils.auth_cache import auth_cache
+from utils.response_cache import catalog_response_cache
+from utils.security import password_hash_pool
+
+
+# Prometheus text exposition format
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SUMMARY_QUANTILES = (0.5, 0.95, 0.99)
+# Recent observations per label set used for the summary quantiles
+SUMMARY_WINDOW = 1024
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    """Render a label set as {name="value",...}."""
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value."""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base class holding a metric's name, help text and lock."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(labels)} {_format_value(value)}" for labels, value in values
+        ]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down per label set."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(labels)} {_format_value(value)}" for labels, value in values
+        ]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count], sum
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = [(labels, list(counts), total[0]) for labels, (counts, total) in self._values.items()]
+        lines = self.header()
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(labels, ('le', _format_value(float(bound))))} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+class Summary(_Metric):
+    """Quantiles over a sliding window of recent observations per label set."""
+
+    kind = "summary"
+
+    def __init__(self, name: str, documentation: str, quantiles: Iterable[float] = SUMMARY_QUANTILES,
+                 window: int = SUMMARY_WINDOW):
+        super().__init__(name, documentation)
+        self.quantiles = tuple(quantiles)
+        self.window = window
+        self._values: Dict[Labels, Tuple[Deque[float], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = (deque(maxlen=self.window), [0, 0.0])
+            entry[0].append(value)
+            entry[1][0] += 1
+            entry[1][1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = [(labels, sorted(window), list(totals)) for labels, (window, totals) in self._values.items()]
+        lines = self.header()
+        for labels, window, (count, total) in values:
+            for quantile in self.quantiles:
+                value = window[min(len(window) - 1, int(quantile * len(window)))]
+                lines.append(
+                    f"{self.name}{_format_labels(labels, ('quantile', str(quantile)))} {_format_value(value)}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Set of metrics and scrape-time collectors rendered together."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        """
+        Register a function producing exposition lines at scrape time.
+
+        Args:
+            collector: Callable returning Prometheus text lines
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text format.
+
+        Returns:
+            str: Exposition text
+        """
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP requests by method, route and status code."))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route.", LATENCY_BUCKETS))
+http_request_latency_seconds = registry.register(Summary(
+    "http_request_latency_seconds", "Recent HTTP request latency quantiles by method and route."))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served."))
+db_query_duration_seconds = registry.register(Histogram(
+    "db_query_duration_seconds", "SQL statement execution time.", QUERY_BUCKETS))
+db_queries_per_request = registry.register(Histogram(
+    "db_queries_per_request", "SQL statements executed per HTTP request by route.", QUERY_COUNT_BUCKETS))
+db_time_per_request_seconds = registry.register(Histogram(
+    "db_time_per_request_seconds", "Time spent in SQL per HTTP request by route.", QUERY_BUCKETS))
+
+
+def counter_lines(name: str, documentation: str, value: float, kind: str = "counter") -> List[str]:
+    """
+    Render a single unlabelled sample, for scrape-time collectors.
+
+    Args:
+        name: Metric name
+        documentation: HELP text
+        value: Sample value
+        kind: Prometheus metric type
+
+    Returns:
+        list: Exposition lines
+    """
+    return [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}", f"{name} {_format_value(value)}"]
+
+
+class RequestStats:
+    """SQL statements and time attributed to one request."""
+
+    __slots__ = ("scope", "queries", "db_seconds")
+
+    def __init__(self, scope: Scope):
+        self.scope = scope
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_route() -> Optional[str]:
+    """
+    Get the method and route template of the request being served.
+
+    Returns:
+        str: e.g. "GET /api/products/{product_id}", or None outside a request
+    """
+    stats = _request_stats.get()
+    if stats is None:
+        return None
+    return f"{stats.scope['method']} {route_template(stats.scope)}"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    starts = conn.info.get("metrics_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    db_query_duration_seconds.observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_query_timer(exception_context) -> None:
+    connection = exception_context.connection
+    if connection is not None:
+        starts = connection.info.get("metrics_query_start")
+        if starts:
+            starts.pop()
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Get the path template of the route that served a request.
+
+    Routes on an included router only know their path relative to the
+    router, so the full template (prefix included) is taken from the
+    effective route context FastAPI records when it resolves the route.
+
+    Args:
+        scope: ASGI scope after the router has run
+
+    Returns:
+        str: Template such as "/api/products/{product_id}", or "unmatched"
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    path_format = getattr(context, "path_format", None)
+    if path_format:
+        return path_format
+    return scope.get("root_path", "") + getattr(route, "path_format", scope["path"])
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency, status codes, in-flight
+    requests and per-request SQL usage, labelled by route template (e.g.
+    ``/api/products/{product_id}``) to keep label cardinality bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        stats = RequestStats(scope)
+        token = _request_stats.set(stats)
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec()
+            _request_stats.reset(token)
+            route = route_template(scope)
+            http_requests_total.inc(method=method, route=route, status=str(status_code))
+            http_request_duration_seconds.observe(elapsed, method=method, route=route)
+            http_request_latency_seconds.observe(elapsed, method=method, route=route)
+            db_queries_per_request.observe(stats.queries, route=route)
+            db_time_per_request_seconds.observe(stats.db_seconds, route=route)
+
+
+def _collect_password_hashing() -> List[str]:
+    stats = password_hash_pool.get_stats()
+    lines = []
+    lines += counter_lines("password_hash_operations_total",
+                           "bcrypt hash/verify operations completed.", stats["completed"])
+    lines += counter_lines("password_hash_rejected_total",
+                           "bcrypt operations rejected because the queue was full.", stats["rejected"])
+    lines += counter_lines("password_hash_seconds_total",
+                           "Time spent inside bcrypt.", stats["hash_seconds"])
+    lines += counter_lines("password_hash_wait_seconds_total",
+                           "Time bcrypt operations spent queued for a worker.", stats["wait_seconds"])
+    lines += counter_lines("password_hash_in_flight",
+                           "bcrypt operations currently running.", stats["in_flight"], kind="gauge")
+    lines += counter_lines("password_hash_queued",
+                           "bcrypt operations waiting for a worker.", stats["queued"], kind="gauge")
+    return lines
+
+
+def _collect_caches() -> List[str]:
+    lines = []
+    for name, cache in (("auth", auth_cache), ("catalog_response", catalog_response_cache)):
+        hits, misses = cache.hits, cache.misses
+        total = hits + misses
+        lines += counter_lines(f"{name}_cache_hits_total", f"{name} cache hits.", hits)
+        lines += counter_lines(f"{name}_cache_misses_total", f"{name} cache misses.", misses)
+        lines += counter_lines(f"{name}_cache_hit_ratio", f"{name} cache hits over lookups.",
+                               hits / total if total else 0.0, kind="gauge")
+    return lines
+
+
+def _collect_db_pools() -> List[str]:
+    pools = {"sync": engine.pool, "async": async_engine.pool}
+    if writer_engine is not engine:
+        pools["sync_writer"] = writer_engine.pool
+    if async_writer_engine is not async_engine:
+        pools["async_writer"] = async_writer_engine.pool
+    samples = {name: pool.get_stats() for name, pool in pools.items() if hasattr(pool, "get_stats")}
+
+    lines = []
+    for metric, key, documentation, kind in (
+        ("db_pool_checkouts_total", "checkouts", "Connections checked out of the pool.", "counter"),
+        ("db_pool_checkout_timeouts_total", "timeouts",
+         "Checkouts that gave up waiting for a free connection.", "counter"),
+        ("db_pool_checkout_wait_seconds_total", "wait_seconds",
+         "Time spent waiting to check out a connection.", "counter"),
+        ("db_pool_checkout_max_wait_seconds", "max_wait_seconds",
+         "Longest wait to check out a connection.", "gauge"),
+        ("db_pool_size", "size", "Connections the pool keeps open.", "gauge"),
+        ("db_pool_checked_out", "checked_out", "Connections currently checked out.", "gauge"),
+        ("db_pool_overflow", "overflow", "Connections open beyond the pool size.", "gauge"),
+        ("db_pool_max_overflow", "max_overflow", "Overflow connections the pool may open.", "gauge"),
+    ):
+        lines += [f"# HELP {metric} {documentation}", f"# TYPE {metric} {kind}"]
+        lines += [
+            f"{metric}{_format_labels((('pool', name),))} {_format_value(stats[key])}"
+            for name, stats in samples.items()
+        ]
+    return lines
+
+
+def _collect_replicas() -> List[str]:
+    if not len(async_replicas):
+        return []
+    stats = async_replicas.get_stats()
+    lines = [
+        "# HELP db_read_sessions_total Read-only sessions by where their reads went.",
+        "# TYPE db_read_sessions_total counter",
+    ]
+    lines += [
+        f"db_read_sessions_total{_format_labels((('target', target),))} {count}"
+        for target, count in stats["sessions"].items()
+    ]
+    for metric, key, documentation in (
+        ("db_replica_lag_seconds", "lag", "Replication lag at the last check."),
+        ("db_replica_healthy", "healthy", "Whether the last lag check succeeded."),
+    ):
+        lines += [f"# HELP {metric} {documentation}", f"# TYPE {metric} gauge"]
+        lines += [
+            f"{metric}{_format_labels((('replica', replica['name']),))} {_format_value(float(replica[key]))}"
+            for replica in stats["replicas"]
+        ]
+    return lines
+
+
+registry.register_collector(_collect_password_hashing)
+registry.register_collector(_collect_caches)
+registry.register_collector(_collect_db_pools)
+registry.register_collector(_collect_replicas)
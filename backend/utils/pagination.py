@@ -0,0 +1,85 @@
+"""
+Pagination Utilities - Opaque cursors for keyset pagination
+
+Listings that page with skip/limit make the database walk past every skipped
+row, so deep pages get linearly slower. Keyset pagination instead remembers
+the sort key of the last row returned and asks for rows strictly after it,
+which an index on the sort key answers in constant time per page.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Encode the sort key of the last row on a page as an opaque cursor.
+
+    Args:
+        values: Sort key values (ints, strings or datetimes)
+
+    Returns:
+        str: URL-safe cursor string
+    """
+    payload = [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_value(value: Any, expected: type) -> Any:
+    """Decode one cursor value, checking it has the expected type."""
+    if expected is datetime:
+        if not isinstance(value, dict) or not isinstance(value.get("dt"), str):
+            raise ValueError("expected a datetime")
+        return datetime.fromisoformat(value["dt"])
+    # bool is an int subclass, but never a valid sort key
+    if type(value) is not expected:
+        raise ValueError(f"expected {expected.__name__}")
+    return value
+
+
+def decode_cursor(cursor: str, *types: type) -> Optional[List[Any]]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    An empty cursor means "first page" and decodes to None.
+
+    Args:
+        cursor: Cursor string from a previous page's next_cursor
+        types: Expected type of each sort key value (int, str or datetime)
+
+    Returns:
+        list: Sort key values, or None for the first page
+
+    Raises:
+        HTTPException: If the cursor is malformed or holds values of the
+            wrong number or type
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError("unexpected cursor shape")
+        return [_decode_value(value, expected) for value, expected in zip(payload, types)]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def cursor_page(items: list, next_cursor: Optional[str]) -> dict:
+    """Build the response envelope for a cursor-paginated listing."""
+    return {
+        "items": items,
+        "next_cursor": next_cursor
+    }
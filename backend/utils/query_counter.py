@@ -0,0 +1,103 @@
+"""
+Query Counter - Count the SQL statements a block of code executes
+
+Serializing a list of orders through a lazy relationship issues one query
+per order (the N+1 problem), which is easy to reintroduce and invisible in
+small test databases. The counter hooks every engine's cursor execution and
+attributes statements to the enclosing ``count_queries()`` block, so a check
+or test can assert that a code path stays within a fixed query budget:
+
+    with query_budget(ORDER_LISTING_QUERY_BUDGET):
+        client.get("/api/orders/orders/my-orders", headers=headers)
+
+Counts are tracked per context (task or thread), so concurrent requests do
+not inflate each other's totals.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Most queries an order listing may run: one for the orders and one batched
+# selectin load for all of their items
+ORDER_LISTING_QUERY_BUDGET = 2
+
+
+class QueryCounter:
+    """
+    Statements executed inside a count_queries() block.
+
+    Attributes:
+        count (int): Number of statements executed
+        statements (list): SQL text of each statement, in order
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.statements: List[str] = []
+
+    def __repr__(self):
+        return f"<QueryCounter(count={self.count})>"
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block runs more queries than its budget allows."""
+
+
+_active_counters: ContextVar[Optional[List[QueryCounter]]] = ContextVar(
+    "active_query_counters", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    counters = _active_counters.get()
+    if counters:
+        for counter in counters:
+            counter.count += 1
+            counter.statements.append(statement)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """
+    Count the statements executed inside the block.
+
+    Blocks can be nested; each counter sees every statement run inside it.
+
+    Yields:
+        QueryCounter: Counter updated as statements execute
+    """
+    counter = QueryCounter()
+    token = _active_counters.set((_active_counters.get() or []) + [counter])
+    try:
+        yield counter
+    finally:
+        _active_counters.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int) -> Iterator[QueryCounter]:
+    """
+    Fail if the block executes more than max_queries statements.
+
+    Args:
+        max_queries: Number of statements the block may execute
+
+    Yields:
+        QueryCounter: Counter updated as statements execute
+
+    Raises:
+        QueryBudgetExceeded: If the block exceeded its budget
+    """
+    with count_queries() as counter:
+        yield counter
+    if counter.count > max_queries:
+        statements = "\n".join(f"  {statement}" for statement in counter.statements)
+        raise QueryBudgetExceeded(
+            f"Expected at most {max_queries} queries, executed {counter.count}:\n{statements}"
+        )
@@ -0,0 +1,225 @@
+"""
+Response Cache - Pre-encoded JSON responses with ETag revalidation
+
+Catalog responses only change when the catalog version does, yet every
+request would re-encode the same data to JSON. Encoded bodies are cached per
+(route, query parameters, data version) along with a content hash used as
+the ETag, so a repeat request costs a dictionary lookup, and a client that
+already holds the body gets an empty ``304 Not Modified``. Compressed
+variants are stored alongside the raw body, so each body is compressed once
+per encoding rather than once per request.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Iterable, Optional, Tuple
+
+from fastapi import Request, Response, status
+
+from utils.compression import COMPRESSION_MINIMUM_SIZE, compress, negotiate_encoding
+from utils.responses import dump_json
+
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+
+# Seconds clients may reuse a catalog response without revalidating. The
+# default of 0 makes them revalidate every time, which costs a 304 at most.
+CATALOG_CACHE_MAX_AGE = int(os.getenv("CATALOG_CACHE_MAX_AGE", "0"))
+
+
+class CachedResponse:
+    """
+    An encoded response body, its ETag and its compressed variants.
+
+    Attributes:
+        body (bytes): Encoded JSON body
+        etag (str): Quoted content hash of the body
+        tags (frozenset): Items the body was built from, or None if unknown
+    """
+
+    __slots__ = ("body", "etag", "tags", "_variants")
+
+    def __init__(self, body: bytes, tags: Optional[FrozenSet[Hashable]] = None):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self.tags = tags
+        self._variants: Dict[str, Tuple[bytes, str]] = {}
+
+    def variant(self, encoding: Optional[str]) -> Tuple[bytes, str]:
+        """
+        Get the body and ETag for a content encoding, compressing on first use.
+
+        Args:
+            encoding: "br", "gzip", or None for the uncompressed body
+
+        Returns:
+            tuple: (body, ETag) of the variant
+        """
+        if encoding is None:
+            return self.body, self.etag
+        variant = self._variants.get(encoding)
+        if variant is None:
+            # Each representation needs its own strong ETag
+            variant = (compress(self.body, encoding), f'{self.etag[:-1]}-{encoding}"')
+            self._variants[encoding] = variant
+        return variant
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag (weak comparison).
+
+    Args:
+        if_none_match: Header value, possibly a comma-separated list or "*"
+        etag: Quoted ETag of the current representation
+
+    Returns:
+        bool: True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    LRU cache of encoded responses for a single versioned data source.
+
+    Entries from an older version are never served: the first lookup at a
+    newer version drops them all, unless carry_forward() has moved the
+    entries unaffected by the change to the new version.
+    """
+
+    def __init__(self, max_size: int = RESPONSE_CACHE_SIZE, max_age: int = CATALOG_CACHE_MAX_AGE):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached responses
+            max_age: Cache-Control max-age sent to clients, in seconds
+        """
+        self.max_size = max_size
+        self.cache_control = f"public, max-age={max_age}, must-revalidate"
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: Hashable, version: int, build: Callable[[], Any],
+                     tags: Optional[Callable[[Any], Iterable[Hashable]]] = None) -> CachedResponse:
+        """
+        Get the cached response for a key, encoding it on a miss.
+
+        Args:
+            key: Route and query parameters identifying the response
+            version: Version of the data the response is built from
+            build: Produces the response content on a miss
+            tags: Lists the items a response's content was built from, so
+                carry_forward() can keep it when other items change
+
+        Returns:
+            CachedResponse: The encoded response
+        """
+        with self._lock:
+            outdated = self._version is not None and version < self._version
+            if not outdated:
+                if self._version != version:
+                    self._entries.clear()
+                    self._version = version
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+            self.misses += 1
+
+        if outdated:
+            # A request still holding an older snapshot; serve it uncached
+            return CachedResponse(dump_json(build()))
+
+        content = build()
+        entry = CachedResponse(dump_json(content), frozenset(tags(content)) if tags else None)
+        with self._lock:
+            if self._version == version and self.max_size > 0:
+                self._entries[key] = entry
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def respond(self, request: Request, key: Hashable, version: int,
+                build: Callable[[], Any],
+                tags: Optional[Callable[[Any], Iterable[Hashable]]] = None) -> Response:
+        """
+        Serve a cached response, or 304 if the client's copy is current.
+
+        The body is sent precompressed when the client accepts gzip or
+        brotli, which the compression middleware then leaves alone.
+
+        Args:
+            request: Incoming request, checked for If-None-Match and
+                Accept-Encoding
+            key: Route and query parameters identifying the response
+            version: Version of the data the response is built from
+            build: Produces the response content on a miss
+            tags: Lists the items the content was built from (see get_or_build)
+
+        Returns:
+            Response: 200 with the encoded body, or an empty 304
+        """
+        entry = self.get_or_build(key, version, build, tags)
+        encoding = None
+        if len(entry.body) >= COMPRESSION_MINIMUM_SIZE:
+            encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        body, etag = entry.variant(encoding)
+
+        headers = {"ETag": etag, "Cache-Control": self.cache_control, "Vary": "Accept-Encoding"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def carry_forward(self, version: int, new_version: int, changed: Iterable[Hashable]) -> None:
+        """
+        Move the cache to a new version when only a few items changed.
+
+        Entries tagged with none of the changed items keep their encoded and
+        compressed bodies; entries built from a changed item, or without
+        tags, are dropped. Nothing happens unless the cache is at
+        ``version``, since its entries are otherwise dropped anyway.
+
+        Args:
+            version: Version the new one was derived from
+            new_version: Version the remaining entries are valid for
+            changed: Tags of the items that differ between the versions
+        """
+        changed = set(changed)
+        with self._lock:
+            if self._version != version:
+                return
+            self._version = new_version
+            stale = [
+                key for key, entry in self._entries.items()
+                if entry.tags is None or not entry.tags.isdisjoint(changed)
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Responses built from the catalog snapshot, keyed by its version
+catalog_response_cache = ResponseCache()
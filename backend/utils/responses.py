@@ -0,0 +1,131 @@
+"""
+Responses - Fast JSON encoding for API responses
+
+FastAPI's default path runs every returned value through ``jsonable_encoder``
+(a recursive, pure-Python walk that copies the whole structure) and then
+``json.dumps``. Route handlers here already return plain dicts and lists, so
+``FastJSONRoute`` hands them straight to ``FastJSONResponse``, which encodes
+with orjson when it is installed. Datetimes, dates, UUIDs and enums are
+encoded natively; Decimals become numbers; anything else falls back to
+``jsonable_encoder``. The database models' ``to_dict()`` therefore leave
+datetimes as they are: orjson writes the same ISO 8601 text ``isoformat()``
+would, and the fallback encoder calls ``isoformat()`` itself.
+"""
+
+import functools
+import inspect
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Encode values the JSON encoder does not handle natively."""
+    if isinstance(value, Decimal):
+        # Same rule as jsonable_encoder: integral decimals stay integers
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return jsonable_encoder(value)
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dump_json(content: Any) -> bytes:
+        """
+        Encode content as compact UTF-8 JSON.
+
+        Args:
+            content: Value to encode
+
+        Returns:
+            bytes: Encoded JSON
+        """
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+else:
+    def dump_json(content: Any) -> bytes:
+        """
+        Encode content as compact UTF-8 JSON.
+
+        Args:
+            content: Value to encode
+
+        Returns:
+            bytes: Encoded JSON
+        """
+        return json.dumps(
+            content,
+            default=_default,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with dump_json."""
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+def _takes_response(endpoint: Callable) -> bool:
+    """Check whether an endpoint declares a Response parameter."""
+    for parameter in inspect.signature(endpoint).parameters.values():
+        annotation = parameter.annotation
+        if inspect.isclass(annotation) and issubclass(annotation, Response):
+            return True
+    return False
+
+
+def _render_results(endpoint: Callable, status_code: int) -> Callable:
+    """Wrap an endpoint so plain return values become FastJSONResponses."""
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+            return FastJSONResponse(result, status_code=status_code)
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            result = endpoint(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+            return FastJSONResponse(result, status_code=status_code)
+    return wrapper
+
+
+class FastJSONRoute(APIRoute):
+    """
+    Route that encodes plain dict/list results with FastJSONResponse,
+    skipping jsonable_encoder.
+
+    Only routes without a response model are affected, since those have no
+    validation or filtering step to preserve. Endpoints that take a
+    ``Response`` parameter to set headers are left on the default path.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        response_model = kwargs.get("response_model")
+        annotated = "return" in getattr(endpoint, "__annotations__", {})
+        if ((response_model is None or isinstance(response_model, DefaultPlaceholder))
+                and not annotated and not _takes_response(endpoint)):
+            endpoint = _render_results(endpoint, kwargs.get("status_code") or 200)
+        super().__init__(path, endpoint, **kwargs)
@@ -1,42 +1,16 @@
 """
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-Security utilities for password hashing and JWT tokens.
-"""
-import os
-=======
-Security Utilities - Password hashing and JWT token management
-"""
-
->>>>>>> Stashed changes
-=======
 Security Utilities - Password hashing and JWT token management
 """
 
->>>>>>> Stashed changes
-=======
-Security Utilities - Password hashing and JWT token management
-"""
-
->>>>>>> Stashed changes
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
+import re
+import threading
+import time
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-from dotenv import load_dotenv
-
-load_dotenv()
-
-SECRET_KEY = os.getenv("SECRET_KEY", "wonderland-secret-key")
-=======
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
 import os
 from dotenv import load_dotenv
 
@@ -45,34 +19,21 @@ load_dotenv()
 
 # JWT Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "wonderland-toy-store-secret-key")
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))
 
+# Password hashing configuration
+# bcrypt cost factor; each +1 doubles hashing time. Existing hashes with a
+# different cost are upgraded transparently on the next successful login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Threads dedicated to hashing; bcrypt releases the GIL while it works
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Hash requests allowed to wait for a free worker before new ones are refused
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
 
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt."""
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+_BCRYPT_COST_PATTERN = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
-=======
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a plain password against a hashed password.
@@ -84,30 +45,12 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         bool: True if password matches, False otherwise
     """
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
     return bcrypt.checkpw(
         plain_password.encode('utf-8'),
         hashed_password.encode('utf-8')
     )
 
 
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Create a JWT access token."""
-    to_encode = data.copy()
-=======
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
 def get_password_hash(password: str) -> str:
     """
     Hash a password using bcrypt.
@@ -118,11 +61,185 @@ def get_password_hash(password: str) -> str:
     Returns:
         str: The hashed password
     """
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 
+def needs_rehash(hashed_password: str) -> bool:
+    """
+    Check whether a stored hash was made with a different cost factor.
+    
+    Args:
+        hashed_password: The hashed password from database
+        
+    Returns:
+        bool: True if the hash should be regenerated with BCRYPT_ROUNDS
+    """
+    match = _BCRYPT_COST_PATTERN.match(hashed_password or "")
+    return match is None or int(match.group(1)) != BCRYPT_ROUNDS
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when the password hash queue is full."""
+
+
+class PasswordHashPool:
+    """
+    Bounded worker pool for bcrypt hashing and verification.
+    
+    bcrypt is deliberately slow, so running it inline in an async handler
+    stalls every other request on the event loop. Work is dispatched to a
+    fixed set of threads instead; once every worker is busy and the queue is
+    full, further requests are refused rather than piling up.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        """
+        Initialize the pool. Threads are started on first use.
+        
+        Args:
+            workers: Number of hashing threads
+            max_queue: Requests allowed to wait for a free worker
+        """
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "rejected": 0,
+            "max_pending": 0,
+            "hash_seconds": 0.0,
+            "wait_seconds": 0.0,
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the executor, creating it on first use."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix="bcrypt"
+                    )
+        return self._executor
+
+    def _reserve(self) -> None:
+        """Claim a slot in the pool or raise if it is saturated."""
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self._stats["rejected"] += 1
+                raise PasswordHasherBusyError("Password hashing queue is full")
+            self._pending += 1
+            self._stats["submitted"] += 1
+            self._stats["max_pending"] = max(self._stats["max_pending"], self._pending)
+
+    def _timed(self, queued_at: float, fn, *args):
+        """Run fn on a worker, recording queue wait and hashing time."""
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self._stats["wait_seconds"] += started - queued_at
+                self._stats["hash_seconds"] += finished - started
+
+    async def run(self, fn, *args):
+        """
+        Run a blocking hash function on the pool.
+        
+        Args:
+            fn: Function to run, e.g. get_password_hash
+            args: Arguments for fn
+            
+        Returns:
+            The result of fn
+            
+        Raises:
+            PasswordHasherBusyError: If the pool and its queue are full
+        """
+        self._reserve()
+        try:
+            future = self._get_executor().submit(self._timed, time.perf_counter(), fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        # The slot is released when the work finishes, not when the caller
+        # stops waiting: a disconnected client's hash still occupies a worker
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future: Optional[Future]) -> None:
+        """Free the slot claimed by _reserve once its work is done."""
+        with self._lock:
+            self._pending -= 1
+            if future is not None and not future.cancelled():
+                self._stats["completed"] += 1
+
+    def get_stats(self) -> dict:
+        """
+        Get pool metrics.
+        
+        Returns:
+            dict: Worker count, current queue depth and cumulative counters
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            pending = self._pending
+        stats["workers"] = self.workers
+        stats["max_queue"] = self.max_queue
+        stats["in_flight"] = min(pending, self.workers)
+        stats["queued"] = max(0, pending - self.workers)
+        return stats
+
+    def shutdown(self) -> None:
+        """Stop the worker threads."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_hash_pool = PasswordHashPool()
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password on the password hash pool.
+    
+    Args:
+        password: The plain text password
+        
+    Returns:
+        str: The hashed password
+        
+    Raises:
+        PasswordHasherBusyError: If the pool is saturated
+    """
+    return await password_hash_pool.run(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password on the password hash pool.
+    
+    Args:
+        plain_password: The plain text password
+        hashed_password: The hashed password from database
+        
+    Returns:
+        bool: True if password matches, False otherwise
+        
+    Raises:
+        PasswordHasherBusyError: If the pool is saturated
+    """
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
@@ -136,13 +253,6 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     """
     to_encode = data.copy()
     
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
@@ -150,19 +260,6 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
-    return encoded_jwt
-
-
-def verify_token(token: str) -> Optional[dict]:
-    """Verify and decode a JWT token."""
-=======
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
     
     return encoded_jwt
 
@@ -177,13 +274,6 @@ def decode_access_token(token: str) -> Optional[dict]:
     Returns:
         dict: Decoded token payload if valid, None if invalid
     """
-<<<<<<< Updated upstream
-<<<<<<< Updated upstream
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
-=======
->>>>>>> Stashed changes
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
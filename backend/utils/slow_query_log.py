@@ -0,0 +1,172 @@
+"""
+Slow Query Log - Structured log of SQL statements over a time threshold
+
+Every statement run through a SQLAlchemy engine (sync or async) is timed.
+Statements slower than ``SLOW_QUERY_THRESHOLD_MS`` are written as one JSON
+object per line to a rotating log file, with the SQL, the shape of its bound
+parameters (types only, never values), duration, row count and the route
+that issued it; failed statements are logged with their error whatever
+their duration. With ``SLOW_QUERY_EXPLAIN`` enabled, the plan of slow
+SELECTs is captured too: ``EXPLAIN QUERY PLAN`` on SQLite and
+``EXPLAIN ANALYZE`` on PostgreSQL. The latter runs the query again, so it is
+meant for diagnosing a slow endpoint rather than for leaving on.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from typing import Any, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from utils.metrics import current_route
+
+
+# Statements taking at least this long are logged; a negative value disables the log
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "false").lower() in ("1", "true", "yes")
+SLOW_QUERY_LOG_FILE = os.getenv("SLOW_QUERY_LOG_FILE", "slow_queries.log")
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "5"))
+
+# Plan statements per database backend
+_EXPLAIN_PREFIXES = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN (ANALYZE, BUFFERS, FORMAT TEXT) ",
+}
+
+logger = logging.getLogger("wonderland.slow_queries")
+logger.propagate = False
+
+
+def _ensure_handler() -> None:
+    """Attach the rotating file handler on first use, so importing creates no file."""
+    if logger.handlers:
+        return
+    handler = RotatingFileHandler(
+        SLOW_QUERY_LOG_FILE,
+        maxBytes=SLOW_QUERY_LOG_MAX_BYTES,
+        backupCount=SLOW_QUERY_LOG_BACKUPS,
+        encoding="utf-8",
+        delay=True,
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> Any:
+    """
+    Describe bound parameters by type, without their values.
+
+    Args:
+        parameters: DBAPI parameters (dict, sequence, or a list of either)
+        executemany: Whether parameters hold one entry per row
+
+    Returns:
+        Type names in the structure of the parameters, e.g.
+        ``{"id_1": "int"}`` or ``{"rows": 3, "row": ["str", "int"]}``
+    """
+    if executemany and isinstance(parameters, (list, tuple)):
+        return {
+            "rows": len(parameters),
+            "row": parameter_shape(parameters[0]) if parameters else None,
+        }
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+def _explain(conn, statement: str, parameters: Any) -> Optional[List[str]]:
+    """Capture the query plan of a SELECT on the connection that ran it."""
+    prefix = _EXPLAIN_PREFIXES.get(conn.dialect.name)
+    # EXPLAIN ANALYZE executes the statement, and a WITH query may hold a
+    # data-modifying CTE, so only plain SELECTs are explained
+    if prefix is None or not statement.lstrip().upper().startswith("SELECT"):
+        return None
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [" ".join(str(column) for column in row) for row in cursor.fetchall()]
+    except Exception as exc:  # plan capture must never fail the request
+        return [f"EXPLAIN failed: {exc}"]
+    finally:
+        cursor.close()
+
+
+def record_slow_query(statement: str, parameters: Any, duration_ms: float,
+                      rows: Optional[int] = None, executemany: bool = False,
+                      plan: Optional[List[str]] = None, error: Optional[str] = None) -> None:
+    """
+    Write a slow or failed statement to the log.
+
+    Args:
+        statement: SQL text
+        parameters: Bound parameters, logged by shape only
+        duration_ms: Execution time in milliseconds
+        rows: Rows affected or returned, when known
+        executemany: Whether parameters hold one entry per row
+        plan: Query plan lines, if captured
+        error: Error raised by the statement, if it failed
+    """
+    _ensure_handler()
+    entry = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "duration_ms": round(duration_ms, 3),
+        "threshold_ms": SLOW_QUERY_THRESHOLD_MS,
+        "route": current_route(),
+        "statement": " ".join(statement.split()),
+        "parameters": parameter_shape(parameters, executemany),
+        "rows": rows,
+    }
+    if plan is not None:
+        entry["plan"] = plan
+    if error is not None:
+        entry["error"] = error
+    logger.warning(json.dumps(entry))
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_slow_query_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _check_slow_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    starts = conn.info.get("slow_query_start")
+    if not starts:
+        return
+    duration_ms = (time.perf_counter() - starts.pop()) * 1000
+    if SLOW_QUERY_THRESHOLD_MS < 0 or duration_ms < SLOW_QUERY_THRESHOLD_MS:
+        return
+    rows = cursor.rowcount if cursor.rowcount >= 0 else None
+    plan = None
+    if SLOW_QUERY_EXPLAIN and not executemany:
+        plan = _explain(conn, statement, parameters)
+    record_slow_query(statement, parameters, duration_ms, rows, executemany, plan)
+
+
+@event.listens_for(Engine, "handle_error")
+def _log_failed_query(exception_context) -> None:
+    connection = exception_context.connection
+    starts = connection.info.get("slow_query_start") if connection is not None else None
+    if not starts or exception_context.statement is None:
+        return
+    duration_ms = (time.perf_counter() - starts.pop()) * 1000
+    if SLOW_QUERY_THRESHOLD_MS < 0:
+        return
+    error = exception_context.original_exception
+    record_slow_query(
+        exception_context.statement,
+        exception_context.parameters,
+        duration_ms,
+        executemany=bool(exception_context.execution_context
+                         and exception_context.execution_context.executemany),
+        error=f"{type(error).__name__}: {error}",
+    )
@@ -0,0 +1,232 @@
+"""
+Snapshots - Shared plumbing for process-wide caches built from the database
+
+The catalog snapshot, search index, dashboard stats and sales rollups all
+follow the same pattern: one in-memory value per process, rebuilt from the
+database on demand, and kept current from committed ORM changes in between.
+SharedSnapshot coalesces the rebuilds and CommittedChanges registers the
+session listeners that feed changes in once a transaction commits.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Generic, Optional, Tuple, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+T = TypeVar("T")
+
+
+class SharedSnapshot(Generic[T]):
+    """
+    A process-wide value rebuilt from the database when it is missing or
+    no longer current.
+
+    Concurrent readers that find the value outdated wait for a single
+    rebuild instead of each running their own. Sync readers coalesce on a
+    threading lock and async readers on an asyncio lock, since waiting on a
+    threading lock would block the event loop.
+
+    A generation counter is advanced on every change the value cannot
+    absorb. Loads are handed the generation they started at, so a load
+    that raced with a change can be detected when it is installed.
+
+    Attributes:
+        generation (int): Advanced by advance() on every change
+        lock (threading.Lock): Guards the value and generation; hooks run
+            with it held
+    """
+
+    def __init__(self, is_current: Optional[Callable[[T, int], bool]] = None,
+                 on_install: Optional[Callable[[T, bool], bool]] = None):
+        """
+        Initialize an empty snapshot.
+
+        Args:
+            is_current: Whether an installed value can be served at the
+                current generation (default: always, once installed)
+            on_install: Called with a loaded value and whether a change
+                raced its load; returns False to serve the value once
+                without installing it
+        """
+        self.generation = 0
+        self.lock = threading.Lock()
+        self._value: Optional[T] = None
+        self._is_current = is_current
+        self._on_install = on_install
+        self._load_lock = threading.Lock()
+        self._async_load_lock = asyncio.Lock()
+
+    @property
+    def value(self) -> Optional[T]:
+        """The installed value, current or not."""
+        return self._value
+
+    def current(self) -> Optional[T]:
+        """Get the installed value if it can be served as is."""
+        value = self._value
+        if value is not None and (self._is_current is None or self._is_current(value, self.generation)):
+            return value
+        return None
+
+    def install(self, value: T, generation: int) -> T:
+        """
+        Install a freshly loaded value.
+
+        Args:
+            value: Loaded value
+            generation: Generation the load started at
+
+        Returns:
+            The value, for the reader that loaded it
+        """
+        with self.lock:
+            raced = generation != self.generation
+            if self._on_install is None or self._on_install(value, raced):
+                self._value = value
+        return value
+
+    def get(self, load: Callable[[int], T]) -> T:
+        """
+        Get the value, loading it if needed.
+
+        Args:
+            load: Builds the value; called with the starting generation
+
+        Returns:
+            The current value
+        """
+        value = self.current()
+        if value is not None:
+            return value
+        with self._load_lock:
+            value = self.current()
+            if value is not None:
+                return value
+            generation = self.generation
+            return self.install(load(generation), generation)
+
+    async def get_async(self, load: Callable[[int], Awaitable[T]]) -> T:
+        """
+        Async variant of get for route handlers.
+
+        Args:
+            load: Coroutine function building the value; called with the
+                starting generation
+
+        Returns:
+            The current value
+        """
+        value = self.current()
+        if value is not None:
+            return value
+        async with self._async_load_lock:
+            value = self.current()
+            if value is not None:
+                return value
+            generation = self.generation
+            return self.install(await load(generation), generation)
+
+    def advance(self, drop: bool = False,
+                patch: Optional[Callable[[T, int], Optional[T]]] = None) -> Tuple[int, Optional[T]]:
+        """
+        Record a change.
+
+        Args:
+            drop: Also discard the installed value
+            patch: Called with the installed value and the new generation;
+                the value it returns, if not None, replaces the installed
+                one, so a change can be absorbed without a reload
+
+        Returns:
+            tuple: (new generation, value installed before the change)
+        """
+        with self.lock:
+            self.generation += 1
+            value = self._value
+            if drop:
+                self._value = None
+            elif patch is not None and value is not None:
+                patched = patch(value, self.generation)
+                if patched is not None:
+                    self._value = patched
+            return self.generation, value
+
+
+class CommittedChanges:
+    """
+    Session listeners that collect changes at flush time and apply them
+    once the transaction commits.
+
+    Changes are collected in ``after_flush``, while attribute history still
+    shows the previous values, into a pending object kept in
+    ``session.info``. ``after_commit`` hands it to ``apply`` and
+    ``after_rollback`` drops it, so rolled back changes are never applied
+    and a concurrent reader never sees changes before they are committed.
+    """
+
+    def __init__(self, key: str, new_pending: Callable[[], Any],
+                 collect: Callable[[Session, Any], None], apply: Callable[[Any], None]):
+        """
+        Register the listeners on every Session.
+
+        Args:
+            key: session.info key for the pending changes
+            new_pending: Creates an empty pending object
+            collect: Adds a flush's changes to the pending object
+            apply: Applies a committed transaction's pending object
+        """
+        self.key = key
+        self._new_pending = new_pending
+        self._collect = collect
+        self._apply = apply
+        event.listen(Session, "after_flush", self._after_flush)
+        event.listen(Session, "after_commit", self._after_commit)
+        event.listen(Session, "after_rollback", self._after_rollback)
+
+    def pending(self, session: Session) -> Any:
+        """
+        Get the pending changes of a session's transaction, for changes made
+        outside the ORM unit of work (such as bulk UPDATE statements).
+
+        Args:
+            session: Session (sync, or the sync_session of an AsyncSession)
+        """
+        pending = session.info.get(self.key)
+        if pending is None:
+            pending = session.info[self.key] = self._new_pending()
+        return pending
+
+    def _after_flush(self, session: Session, flush_context) -> None:
+        self._collect(session, self.pending(session))
+
+    def _after_commit(self, session: Session) -> None:
+        pending = session.info.pop(self.key, None)
+        if pending is not None:
+            self._apply(pending)
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(self.key, None)
+
+
+def _is_fresh(value, generation: int) -> bool:
+    return value.is_fresh()
+
+
+def _flag_if_raced(value, raced: bool) -> bool:
+    if raced:
+        value.stale = True
+    return True
+
+
+def resyncing_snapshot() -> SharedSnapshot:
+    """
+    SharedSnapshot for summaries kept current from committed changes, which
+    have an ``is_fresh()`` method and a ``stale`` flag (the dashboard stats
+    and sales rollups). Callers advance the generation for every commit they
+    apply, so a summary whose load raced with a commit is installed but
+    flagged stale, and reloaded on the next read.
+    """
+    return SharedSnapshot(is_current=_is_fresh, on_install=_flag_if_raced)
@@ -5,9 +5,23 @@ Handles PostgreSQL connections and queries
 
 import psycopg2
 from psycopg2 import sql, Error
-from psycopg2.pool import SimpleConnectionPool
+from psycopg2.pool import ThreadedConnectionPool, PoolError
+from psycopg2.extras import execute_values
+import configparser
+import json
+import logging
 import os
-from typing import Optional, List, Dict, Any
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from typing import Optional, List, Dict, Any, Callable, Iterator
+
+
+# database.ini next to this module
+DEFAULT_CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "database.ini")
 
 
 class DatabaseConfig:
@@ -18,7 +32,13 @@ class DatabaseConfig:
                  port: int = 5432,
                  database: str = "wonderland_toy_store",
                  user: str = "postgres",
-                 password: str = ""):
+                 password: str = "",
+                 min_size: int = 5,
+                 max_size: int = 20,
+                 timeout: float = 30.0,
+                 slow_query_ms: float = 200.0,
+                 explain_slow_queries: bool = False,
+                 slow_query_log: str = "slow_queries.log"):
         """
         Initialize database configuration
 
@@ -28,12 +48,58 @@ class DatabaseConfig:
             database: Database name
             user: Database user
             password: Database password
+            min_size: Connections the pool opens up front
+            max_size: Maximum connections the pool may hold open
+            timeout: Seconds to wait for a free connection before giving up
+            slow_query_ms: Queries taking at least this long are logged;
+                negative disables the slow-query log
+            explain_slow_queries: Capture EXPLAIN ANALYZE for slow SELECTs
+            slow_query_log: File the slow-query log rotates through
         """
         self.host = host
         self.port = port
         self.database = database
         self.user = user
         self.password = password
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.slow_query_ms = slow_query_ms
+        self.explain_slow_queries = explain_slow_queries
+        self.slow_query_log = slow_query_log
+
+    @classmethod
+    def from_ini(cls, path: str = DEFAULT_CONFIG_FILE,
+                 section: str = "Database Connection") -> "DatabaseConfig":
+        """
+        Load configuration from an INI file such as database.ini
+
+        Args:
+            path: INI file to read
+            section: Section holding the connection settings, e.g.
+                "development" or "production"
+
+        Returns:
+            DatabaseConfig: Settings from the file, defaults for missing keys
+        """
+        parser = configparser.ConfigParser()
+        if not parser.read(path):
+            raise FileNotFoundError(f"Database config not found: {path}")
+        defaults = cls()
+        return cls(
+            host=parser.get(section, "host", fallback=defaults.host),
+            port=parser.getint(section, "port", fallback=defaults.port),
+            database=parser.get(section, "database", fallback=defaults.database),
+            user=parser.get(section, "user", fallback=defaults.user),
+            password=parser.get(section, "password", fallback=defaults.password),
+            min_size=parser.getint("Connection Pool", "min_size", fallback=defaults.min_size),
+            max_size=parser.getint("Connection Pool", "max_size", fallback=defaults.max_size),
+            timeout=parser.getfloat("Connection Pool", "timeout", fallback=defaults.timeout),
+            slow_query_ms=parser.getfloat("Logging", "slow_query_ms", fallback=defaults.slow_query_ms),
+            explain_slow_queries=parser.getboolean("Logging", "explain_slow_queries",
+                                                   fallback=defaults.explain_slow_queries),
+            slow_query_log=parser.get("Logging", "slow_query_log", fallback=defaults.slow_query_log),
+        )
 
     def get_connection_string(self) -> str:
         """Get PostgreSQL connection string"""
@@ -50,44 +116,310 @@ class DatabaseConfig:
         }
 
 
+class PoolTimeoutError(PoolError):
+    """Raised when no pooled connection frees up within the configured timeout"""
+
+
+slow_query_logger = logging.getLogger("wonderland.db.slow_queries")
+slow_query_logger.propagate = False
+
+
+def _parameter_shape(params: Any, many: bool = False) -> Any:
+    """Describe query parameters by type, never by value; many=True for one entry per row"""
+    if many and isinstance(params, (list, tuple)):
+        return {'rows': len(params), 'row': _parameter_shape(params[0]) if params else None}
+    if isinstance(params, dict):
+        return {name: type(value).__name__ for name, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [type(value).__name__ for value in params]
+    return None
+
+
+# Frames skipped when attributing a logged query to its caller
+_QUERY_HELPERS = {
+    '_calling_method', '_log_query', '_timed', '_execute', '_execute_values', '<lambda>',
+    'execute_query', 'execute_query_single', 'execute_update',
+}
+
+
+def _calling_method() -> Optional[str]:
+    """Name the first caller outside the query helpers, e.g. 'get_products'"""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_name in _QUERY_HELPERS:
+        frame = frame.f_back
+    return frame.f_code.co_name if frame is not None else None
+
+
+
 class DatabaseConnection:
-    """Database connection manager"""
+    """
+    Pooled, thread-safe database connection manager
+
+    Connections are held in a psycopg2 ThreadedConnectionPool and checked out
+    per operation, so worker threads run queries in parallel instead of
+    sharing one connection and cursor. When every connection is busy,
+    callers wait up to ``config.timeout`` seconds for one to be returned.
+    """
+
+    # Connections idle longer than this are pinged before being handed out
+    STALE_AFTER_SECONDS = 30.0
 
     def __init__(self, config: DatabaseConfig):
         """
-        Initialize database connection
+        Initialize database connection manager
 
         Args:
             config: DatabaseConfig instance
         """
         self.config = config
-        self.connection = None
-        self.cursor = None
+        self.pool: Optional[ThreadedConnectionPool] = None
+        # psycopg2 pools fail immediately when exhausted; the semaphore makes
+        # callers queue for a free connection instead
+        self._slots = threading.BoundedSemaphore(config.max_size)
+        self._last_used: Dict[int, float] = {}
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'replaced_connections': 0,
+            'in_use': 0,
+            'total_wait_seconds': 0.0,
+            'max_wait_seconds': 0.0,
+        }
 
     def connect(self) -> bool:
         """
-        Establish database connection
+        Open the connection pool
 
         Returns:
             bool: True if connection successful
         """
         try:
-            self.connection = psycopg2.connect(**self.config.get_psycopg2_dict())
-            self.cursor = self.connection.cursor()
-            print(f"✓ Connected to database: {self.config.database}")
+            self.pool = ThreadedConnectionPool(
+                self.config.min_size,
+                self.config.max_size,
+                **self.config.get_psycopg2_dict()
+            )
+            print(f"✓ Connected to database: {self.config.database} "
+                  f"(pool {self.config.min_size}-{self.config.max_size})")
             return True
         except Error as e:
             print(f"✗ Connection Error: {e}")
             return False
 
     def disconnect(self) -> None:
-        """Close database connection"""
-        if self.cursor:
-            self.cursor.close()
-        if self.connection:
-            self.connection.close()
+        """Close every pooled connection"""
+        if self.pool:
+            self.pool.closeall()
+            self.pool = None
         print("✓ Disconnected from database")
 
+    def _ping(self, conn) -> bool:
+        """Check that a connection is still usable"""
+        if conn.closed:
+            return False
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1;")
+            conn.rollback()
+            return True
+        except Error:
+            return False
+
+    @contextmanager
+    def get_connection(self) -> Iterator[Any]:
+        """
+        Check a connection out of the pool for the duration of a block
+
+        Stale connections are health-checked and transparently replaced.
+        Any transaction left open by the block is rolled back on checkin.
+
+        Yields:
+            A psycopg2 connection
+
+        Raises:
+            PoolTimeoutError: If no connection frees up within the timeout
+        """
+        if self.pool is None:
+            raise PoolError("connection pool is not open; call connect() first")
+
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.config.timeout):
+            with self._stats_lock:
+                self._stats['timeouts'] += 1
+            raise PoolTimeoutError(
+                f"no database connection available after {self.config.timeout}s"
+            )
+        waited = time.perf_counter() - started
+
+        conn = None
+        try:
+            conn = self.pool.getconn()
+            last_used = self._last_used.get(id(conn), 0.0)
+            if time.monotonic() - last_used > self.STALE_AFTER_SECONDS and not self._ping(conn):
+                self._last_used.pop(id(conn), None)
+                self.pool.putconn(conn, close=True)
+                conn = self.pool.getconn()
+                with self._stats_lock:
+                    self._stats['replaced_connections'] += 1
+
+            with self._stats_lock:
+                self._stats['checkouts'] += 1
+                self._stats['in_use'] += 1
+                self._stats['total_wait_seconds'] += waited
+                self._stats['max_wait_seconds'] = max(self._stats['max_wait_seconds'], waited)
+            try:
+                yield conn
+            finally:
+                with self._stats_lock:
+                    self._stats['in_use'] -= 1
+        finally:
+            if conn is not None:
+                try:
+                    if not conn.closed:
+                        conn.rollback()
+                except Error:
+                    conn.close()
+                if conn.closed:
+                    self._last_used.pop(id(conn), None)
+                else:
+                    self._last_used[id(conn)] = time.monotonic()
+                self.pool.putconn(conn, close=bool(conn.closed))
+            self._slots.release()
+
+    @contextmanager
+    def get_cursor(self) -> Iterator[Any]:
+        """
+        Check out a connection and open a cursor on it
+
+        Yields:
+            A psycopg2 cursor; use cursor.connection to commit
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                yield cursor
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        Get connection pool usage metrics
+
+        Returns:
+            dict: Checkout counts, wait times, timeouts and pool sizing
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        checkouts = stats['checkouts']
+        stats['avg_wait_seconds'] = stats['total_wait_seconds'] / checkouts if checkouts else 0.0
+        stats['min_size'] = self.config.min_size
+        stats['max_size'] = self.config.max_size
+        return stats
+
+    def _configure_slow_query_log(self) -> None:
+        """Attach the rotating slow-query log file, once per process"""
+        if slow_query_logger.handlers:
+            return
+        handler = RotatingFileHandler(
+            self.config.slow_query_log,
+            maxBytes=10 * 1024 * 1024,
+            backupCount=5,
+            encoding="utf-8",
+            delay=True
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        slow_query_logger.addHandler(handler)
+        slow_query_logger.setLevel(logging.INFO)
+
+    def _log_query(self, cursor, query: str, params: Any, duration_ms: float,
+                   error: Optional[Exception] = None, many: bool = False) -> None:
+        """
+        Write a slow or failed query to the slow-query log as one JSON line
+
+        Args:
+            cursor: Cursor the query ran on
+            query: SQL query
+            params: Query parameters, logged by type only
+            duration_ms: Execution time in milliseconds
+            error: Error the query raised, if any
+            many: Whether params hold one entry per row
+        """
+        entry = {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'duration_ms': round(duration_ms, 3),
+            'threshold_ms': self.config.slow_query_ms,
+            'caller': _calling_method(),
+            'statement': " ".join(query.split()),
+            'parameters': _parameter_shape(params, many),
+            'rows': cursor.rowcount if error is None and cursor.rowcount >= 0 else None,
+        }
+        if error is not None:
+            entry['error'] = f"{type(error).__name__}: {error}".strip()
+        elif self.config.explain_slow_queries and query.lstrip().upper().startswith("SELECT"):
+            # EXPLAIN ANALYZE runs the query again, so only plain SELECTs are
+            # explained; a WITH query may hold a data-modifying CTE
+            try:
+                with cursor.connection.cursor() as explain_cursor:
+                    explain_cursor.execute("EXPLAIN ANALYZE " + query, params)
+                    entry['plan'] = [row[0] for row in explain_cursor.fetchall()]
+            except Error as e:
+                entry['plan'] = [f"EXPLAIN failed: {e}".strip()]
+        self._configure_slow_query_log()
+        slow_query_logger.warning(json.dumps(entry, default=str))
+
+    def _timed(self, cursor, query: str, params: Any, run: Callable[[], Any],
+               many: bool = False) -> Any:
+        """
+        Time a query, logging it if it is slow or fails
+
+        Args:
+            cursor: Cursor the query runs on
+            query: SQL query
+            params: Query parameters
+            run: Callable that executes the query
+            many: Whether params hold one entry per row
+
+        Returns:
+            Whatever run returns
+        """
+        threshold = self.config.slow_query_ms
+        started = time.perf_counter()
+        try:
+            result = run()
+        except Error as e:
+            if threshold >= 0:
+                self._log_query(cursor, query, params, (time.perf_counter() - started) * 1000, e, many)
+            raise
+        duration_ms = (time.perf_counter() - started) * 1000
+        if 0 <= threshold <= duration_ms:
+            self._log_query(cursor, query, params, duration_ms, many=many)
+        return result
+
+    def _execute(self, cursor, query: str, params: Any = None) -> None:
+        """
+        Run a query on a cursor, logging it if it is slow or fails
+
+        Args:
+            cursor: Cursor to run the query on
+            query: SQL query
+            params: Query parameters
+        """
+        self._timed(cursor, query, params, lambda: cursor.execute(query, params))
+
+    def _execute_values(self, cursor, query: str, rows: List[tuple], **kwargs) -> Optional[List[tuple]]:
+        """
+        Run a multi-row VALUES query with execute_values, logging it if it is slow or fails
+
+        Args:
+            cursor: Cursor to run the query on
+            query: SQL query with a single VALUES %s placeholder
+            rows: Row tuples to expand into the VALUES list
+            **kwargs: Passed on to execute_values (template, page_size, fetch)
+
+        Returns:
+            list: Returned rows when fetch=True, else None
+        """
+        return self._timed(cursor, query, rows,
+                           lambda: execute_values(cursor, query, rows, **kwargs), many=True)
+
     def execute_query(self, query: str, params: tuple = None) -> List[tuple]:
         """
         Execute SELECT query
@@ -100,11 +432,9 @@ class DatabaseConnection:
             List of results
         """
         try:
-            if params:
-                self.cursor.execute(query, params)
-            else:
-                self.cursor.execute(query)
-            return self.cursor.fetchall()
+            with self.get_cursor() as cursor:
+                self._execute(cursor, query, params)
+                return cursor.fetchall()
         except Error as e:
             print(f"✗ Query Error: {e}")
             return []
@@ -121,11 +451,9 @@ class DatabaseConnection:
             Single result row or None
         """
         try:
-            if params:
-                self.cursor.execute(query, params)
-            else:
-                self.cursor.execute(query)
-            return self.cursor.fetchone()
+            with self.get_cursor() as cursor:
+                self._execute(cursor, query, params)
+                return cursor.fetchone()
         except Error as e:
             print(f"✗ Query Error: {e}")
             return None
@@ -142,14 +470,11 @@ class DatabaseConnection:
             bool: True if successful
         """
         try:
-            if params:
-                self.cursor.execute(query, params)
-            else:
-                self.cursor.execute(query)
-            self.connection.commit()
+            with self.get_cursor() as cursor:
+                self._execute(cursor, query, params)
+                cursor.connection.commit()
             return True
         except Error as e:
-            self.connection.rollback()
             print(f"✗ Update Error: {e}")
             return False
 
@@ -277,7 +602,12 @@ class DatabaseConnection:
 
     def create_order(self, user_id: int, total_amount: float, items: List[Dict]) -> bool:
         """
-        Create a new order
+        Create a new order in a single transaction
+
+        Stock for every line item is decremented by one set-based UPDATE that
+        only matches products with enough quantity, and all order items are
+        written with one multi-row INSERT. If any product is short, the whole
+        order is rolled back, so stock can never be oversold.
 
         Args:
             user_id: User ID
@@ -287,67 +617,87 @@ class DatabaseConnection:
         Returns:
             bool: True if successful
         """
+        if not items:
+            print("✗ Order Creation Error: order has no items")
+            return False
+
+        # Merge duplicate lines so each product is decremented once
+        requested: Dict[int, int] = {}
+        for item in items:
+            requested[item['product_id']] = requested.get(item['product_id'], 0) + item['quantity']
+
         try:
-            # Generate order number
-            order_number = f"ORD-{user_id}-{int(__import__('time').time())}"
-
-            # Insert order
-            insert_order = """
-                INSERT INTO orders (order_number, user_id, total_amount, status)
-                VALUES (%s, %s, %s, 'Pending')
-                RETURNING id;
-            """
-            self.cursor.execute(insert_order, (order_number, user_id, total_amount))
-            order_id = self.cursor.fetchone()[0]
-
-            # Insert order items
-            for item in items:
-                insert_item = """
-                    INSERT INTO order_items (order_id, product_id, quantity, price)
-                    VALUES (%s, %s, %s, %s);
-                """
-                self.cursor.execute(insert_item, (
-                    order_id,
-                    item['product_id'],
-                    item['quantity'],
-                    item['price']
-                ))
-
-                # Reduce product stock
+            # Uncommitted work is rolled back when the connection is checked in
+            with self.get_cursor() as cursor:
+                # Reserve stock; sorted by product ID so concurrent orders lock rows
+                # in the same order
                 update_stock = """
-                    UPDATE products
-                    SET quantity = quantity - %s
-                    WHERE id = %s;
+                    UPDATE products AS p
+                    SET quantity = p.quantity - v.requested,
+                        updated_at = CURRENT_TIMESTAMP
+                    FROM (VALUES %s) AS v(product_id, requested)
+                    WHERE p.id = v.product_id
+                      AND p.is_active = TRUE
+                      AND p.quantity >= v.requested
+                    RETURNING p.id;
                 """
-                self.cursor.execute(update_stock, (item['quantity'], item['product_id']))
+                reserved = self._execute_values(
+                    cursor,
+                    update_stock,
+                    sorted(requested.items()),
+                    template="(%s::int, %s::int)",
+                    page_size=len(requested),
+                    fetch=True
+                )
+                if len(reserved) != len(requested):
+                    short = sorted(set(requested) - {row[0] for row in reserved})
+                    print(f"✗ Order Creation Error: insufficient stock for products {short}")
+                    return False
+
+                # Generate order number
+                order_number = f"ORD-{user_id}-{int(time.time())}"
+
+                # Insert order
+                insert_order = """
+                    INSERT INTO orders (order_number, user_id, total_amount, status)
+                    VALUES (%s, %s, %s, 'Pending')
+                    RETURNING id;
+                """
+                self._execute(cursor, insert_order, (order_number, user_id, total_amount))
+                order_id = cursor.fetchone()[0]
 
-            self.connection.commit()
-            print(f"✓ Order created: {order_number}")
-            return True
+                # Insert all order items in one statement
+                insert_items = """
+                    INSERT INTO order_items (order_id, product_id, quantity, price)
+                    VALUES %s;
+                """
+                self._execute_values(
+                    cursor,
+                    insert_items,
+                    [(order_id, item['product_id'], item['quantity'], item['price']) for item in items],
+                    page_size=len(items)
+                )
+
+                cursor.connection.commit()
+                print(f"✓ Order created: {order_number}")
+                return True
         except Error as e:
-            self.connection.rollback()
             print(f"✗ Order Creation Error: {e}")
             return False
 
     def health_check(self) -> bool:
-        """Check database connection health"""
+        """Check database connection health on a pooled connection"""
         try:
-            result = self.execute_query_single("SELECT 1;")
-            return result is not None
-        except:
+            with self.get_connection() as conn:
+                return self._ping(conn)
+        except Error:
             return False
 
 
 # Example usage
 if __name__ == "__main__":
     # Create configuration
-    config = DatabaseConfig(
-        host="localhost",
-        port=5432,
-        database="wonderland_toy_store",
-        user="postgres",
-        password="your_password"
-    )
+    config = DatabaseConfig.from_ini()
 
     # Connect to database
     db = DatabaseConnection(config)
@@ -373,5 +723,9 @@ if __name__ == "__main__":
         is_healthy = db.health_check()
         print(f"Database Health: {'✓ Healthy' if is_healthy else '✗ Unhealthy'}")
 
+        # Pool usage
+        stats = db.get_pool_stats()
+        print(f"Pool Checkouts: {stats['checkouts']} (avg wait {stats['avg_wait_seconds'] * 1000:.2f} ms)")
+
         db.disconnect()
 
@@ -181,6 +181,9 @@ def create_database():
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_order_number ON orders(order_number);")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_id ON orders(user_id);")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_status ON orders(status);")
+        # Keyset pagination: newest-first listings seek on (created_at, id)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_created_at_id ON orders(created_at DESC, id DESC);")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_status_created_at_id ON orders(status, created_at DESC, id DESC);")
 
         # Order items table
         cursor.execute("""